@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # coding: utf-8
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
 import logging
 import sys
 import os
@@ -14,10 +14,13 @@ sys.path.append(str(project_dir))
 # Import our custom modules
 import config
 from nlu_parser import parse_query
-from recipe_matcher import find_matching_recipes, get_detailed_recipe
+from recipe_matcher import find_matching_recipes, get_detailed_recipe, get_recipe_details_by_id, result_cache_stats
 from data_loader import load_recipe_data, preprocess_ingredients
 from data_cleaner import apply_cleaning_to_dataframe
 from main import process_user_input, load_and_prepare_data
+from session_store import create_session_store
+from worker_pool import BoundedWorkerPool, PoolSaturatedError, DeadlineExceededError
+from metrics import render_prometheus, timed
 
 # Set up logging
 logging.basicConfig(
@@ -36,53 +39,123 @@ app = Flask(__name__)
 # Load and prepare recipe data at startup
 recipes_df, canonical_ingredients = load_and_prepare_data()
 
-# Initialize session context
-session_contexts = {}
+# Initialize the session store and start removing idle sessions
+session_store = create_session_store(config)
+session_store.start_sweeper(config.SESSION_SWEEP_INTERVAL)
+
+# Bounded pool for parsing and matching; requests beyond its capacity get a 503
+chat_pool = BoundedWorkerPool(config.CHAT_POOL_WORKERS, config.CHAT_QUEUE_SIZE, name='chat')
 
 @app.route('/')
 def index():
     """Render the main page of the web application."""
     return render_template('index.html')
 
+@timed('chat')
+def answer_chat_message(user_input, session_id):
+    """
+    Answer a chat message and update the session; runs on the chat pool.
+    
+    Parameters:
+    -----------
+    user_input : str
+        Message typed by the user
+    session_id : str
+        Session identifier
+        
+    Returns:
+    --------
+    str
+        Response to show to the user
+    """
+    # Get the session context, starting a new session if it doesn't exist or expired
+    session_context = session_store.get_or_create(session_id)
+    
+    # Process the user input
+    response, updated_context = process_user_input(
+        user_input, 
+        recipes_df, 
+        canonical_ingredients, 
+        session_context
+    )
+    
+    # Update the session context
+    session_store.set(session_id, updated_context)
+    return response
+
+def busy_response(session_id):
+    """Build the 503 response returned when the chat pool sheds a request."""
+    response = jsonify({
+        'response': "Sorry, I'm handling too many requests right now. Please try again in a moment.",
+        'session_id': session_id
+    })
+    response.status_code = 503
+    response.headers['Retry-After'] = str(config.CHAT_RETRY_AFTER_SECONDS)
+    return response
+
+def error_response(session_id):
+    """Build the response returned when answering a chat message fails."""
+    return jsonify({
+        'response': "Sorry, I encountered an error. Please try again.",
+        'session_id': session_id
+    })
+
 @app.route('/chat', methods=['POST'])
 def chat():
     """Process chat messages from the user."""
+    session_id = 'default_session'
     try:
         # Get the user input from the request
         user_input = request.json.get('message', '').strip()
         session_id = request.json.get('session_id', 'default_session')
         
-        # Initialize session context if it doesn't exist
-        if session_id not in session_contexts:
-            session_contexts[session_id] = {
-                'last_search_results': None,
-                'current_page': 0,
-                'recipes_per_page': 5
-            }
-        
-        # Process the user input
-        response, updated_context = process_user_input(
-            user_input, 
-            recipes_df, 
-            canonical_ingredients, 
-            session_contexts[session_id]
+        response = chat_pool.run(
+            answer_chat_message, user_input, session_id, timeout=config.CHAT_DEADLINE_SECONDS
         )
-        
-        # Update the session context
-        session_contexts[session_id] = updated_context
-        
-        # Return the response
-        return jsonify({
-            'response': response,
-            'session_id': session_id
-        })
+        return jsonify({'response': response, 'session_id': session_id})
     
+    except (PoolSaturatedError, DeadlineExceededError) as e:
+        logger.warning(f"Shedding chat request: {e}")
+        return busy_response(session_id)
     except Exception as e:
         logger.error(f"Error processing chat: {e}", exc_info=True)
-        return jsonify({
-            'response': "Sorry, I encountered an error. Please try again.",
-            'session_id': request.json.get('session_id', 'default_session')
-        })
+        return error_response(session_id)
+
+@app.route('/status', methods=['GET'])
+def status():
+    """Report the load of the chat pool, the session store and the search result cache."""
+    return jsonify({
+        'chat_pool': chat_pool.stats(),
+        'sessions': session_store.stats(),
+        'result_cache': result_cache_stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Expose stage latency histograms, load gauges and cache counters in the Prometheus text format."""
+    pool_stats = chat_pool.stats()
+    session_stats = session_store.stats()
+    cache_stats = result_cache_stats()
+    samples = [
+        ('recipe_bot_chat_queue_depth', 'gauge', 'Chat messages waiting for the chat pool.', pool_stats['queue_depth']),
+        ('recipe_bot_chat_running', 'gauge', 'Chat messages being answered.', pool_stats['running']),
+        ('recipe_bot_chat_rejected_total', 'counter', 'Chat messages shed because the chat pool was full.',
+         pool_stats['rejected']),
+        ('recipe_bot_chat_expired_total', 'counter', 'Chat messages dropped after their deadline.',
+         pool_stats['expired']),
+        ('recipe_bot_chat_queue_wait_p95_seconds', 'gauge', '95th percentile of recent chat queue waits.',
+         pool_stats['wait_ms']['p95'] / 1000),
+        ('recipe_bot_sessions', 'gauge', 'Sessions in the session store.', session_stats['sessions']),
+        ('recipe_bot_result_cache_hits_total', 'counter', 'Searches answered from the result cache.',
+         cache_stats['hits']),
+        ('recipe_bot_result_cache_misses_total', 'counter', 'Searches ranked because they were not cached.',
+         cache_stats['misses']),
+        ('recipe_bot_result_cache_hit_ratio', 'gauge', 'Share of searches answered from the result cache.',
+         cache_stats['hit_ratio']),
+        ('recipe_bot_result_cache_entries', 'gauge', 'Searches in the result cache.', cache_stats['size']),
+        ('recipe_bot_result_cache_bytes', 'gauge', 'Approximate memory used by the result cache.', cache_stats['bytes']),
+    ]
+    return Response(render_prometheus(samples), mimetype='text/plain; version=0.0.4')
 
 @app.route('/recipe/<recipe_index>', methods=['GET'])
 def get_recipe(recipe_index):
@@ -90,32 +163,26 @@ def get_recipe(recipe_index):
     try:
         session_id = request.args.get('session_id', 'default_session')
         
-        if session_id not in session_contexts:
+        session_context = session_store.get(session_id)
+        if session_context is None:
             return jsonify({'error': 'Invalid session ID'})
         
         # Convert recipe_index to integer
         recipe_idx = int(recipe_index)
         
         # Check if we have search results and if the index is valid
-        if (session_contexts[session_id]['last_search_results'] is None or 
+        if (session_context['last_search_results'] is None or 
             recipe_idx < 0 or 
-            recipe_idx >= len(session_contexts[session_id]['last_search_results'])):
+            recipe_idx >= len(session_context['last_search_results'])):
             return jsonify({'error': 'Invalid recipe index'})
         
         # Get the recipe ID
-        recipe_id = session_contexts[session_id]['last_search_results'][recipe_idx]
+        recipe_id = session_context['last_search_results'][recipe_idx]
         
-        # Use 'id' column for lookup if available
-        if 'id' in recipes_df.columns:
-            recipe_row = recipes_df[recipes_df['id'] == recipe_id]
-            if not recipe_row.empty:
-                recipe_details = get_detailed_recipe(recipe_row.iloc[0]['name'], recipes_df, config)
-                return jsonify({'recipe': recipe_details})
-        else:
-            # Fallback to index lookup
-            if recipe_id in recipes_df.index:
-                recipe_details = get_detailed_recipe(recipes_df.loc[recipe_id]['name'], recipes_df, config)
-                return jsonify({'recipe': recipe_details})
+        # Look the recipe up by id ('id' column, or index label if there is none)
+        recipe_details = get_recipe_details_by_id(recipe_id, recipes_df, config)
+        if recipe_details:
+            return jsonify({'recipe': recipe_details})
         
         return jsonify({'error': 'Recipe not found'})
     
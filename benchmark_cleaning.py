@@ -0,0 +1,79 @@
+"""
+Benchmark script for ingredient line cleaning.
+This compares removing UNITS and PREP_TERMS with one regex per term against
+the precompiled alternations used by data_cleaner, and checks that both give
+the same output.
+"""
+
+import random
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from data_cleaner import UNITS, PREP_TERMS, remove_units_and_prep_terms
+
+# Building blocks for generated ingredient lines
+QUANTITIES = ['', '1 ', '2 ', '1/2 ', '3/4 ', '1.5 ', '12 ']
+INGREDIENT_NAMES = [
+    'chicken breast', 'onion', 'garlic', 'olive oil', 'flour', 'brown sugar', 'butter', 'tomatoes',
+    'fresh basil', 'parmesan cheese', 'black pepper', 'carrots', 'celery', 'eggs', 'milk', 'cinnamon',
+    'beef chuck', 'lemon zest', 'red bell pepper', 'sautéed mushrooms', 'kosher salt', 'heavy cream'
+]
+
+
+def generate_ingredient_lines(num_lines=20000, seed=0):
+    """Generate ingredient lines with quantities, units and preparation terms."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(num_lines):
+        parts = [rng.choice(QUANTITIES) + rng.choice(UNITS)]
+        if rng.random() < 0.5:
+            parts.append(rng.choice(PREP_TERMS))
+        parts.append(rng.choice(INGREDIENT_NAMES))
+        if rng.random() < 0.3:
+            parts.append(f"({rng.choice(PREP_TERMS)}, {rng.choice(PREP_TERMS)})")
+        lines.append(' '.join(parts).lower())
+    return lines
+
+
+def remove_terms_one_by_one(ingredient):
+    """Previous implementation: one re.sub per unit and per preparation term."""
+    for unit in UNITS:
+        ingredient = re.sub(r'\b' + unit + r'\b', '', ingredient)
+    for prep in PREP_TERMS:
+        ingredient = re.sub(r'\b' + prep + r'\b', '', ingredient)
+    return ingredient
+
+
+def time_cleaner(clean_function, lines, repeats=3):
+    """Return the best lines-per-second rate over a few runs, plus the output."""
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        output = [clean_function(line) for line in lines]
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best, output
+
+
+if __name__ == "__main__":
+    lines = generate_ingredient_lines()
+    print(f"Benchmarking UNITS/PREP_TERMS removal on {len(lines)} ingredient lines")
+    print("=" * 50)
+
+    per_term_rate, per_term_output = time_cleaner(remove_terms_one_by_one, lines)
+    compiled_rate, compiled_output = time_cleaner(remove_units_and_prep_terms, lines)
+
+    print(f"One regex per term:     {per_term_rate:12,.0f} lines/s")
+    print(f"Compiled alternations:  {compiled_rate:12,.0f} lines/s")
+    print(f"Speedup:                {compiled_rate / per_term_rate:12.1f}x")
+
+    mismatches = sum(1 for a, b in zip(per_term_output, compiled_output) if a != b)
+    print(f"Lines with different output: {mismatches}")
+    if mismatches:
+        sys.exit(1)
@@ -0,0 +1,100 @@
+"""
+Benchmark script for fuzzy ingredient matching.
+This compares difflib.get_close_matches over every canonical ingredient
+against the trigram index used by find_closest_ingredient, and checks that
+both return the same ingredient.
+"""
+
+import random
+import string
+import sys
+from difflib import get_close_matches
+from pathlib import Path
+from time import perf_counter
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from fuzzy_index import TrigramIndex
+
+# Building blocks for generated ingredient names
+MODIFIERS = ['red', 'green', 'smoked', 'sweet', 'wild', 'baby', 'dark', 'whole', 'sea', 'spicy', 'aged', 'fresh']
+BASES = [
+    'pepper', 'onion', 'paprika', 'potato', 'rice', 'mushroom', 'spinach', 'chocolate', 'salt', 'sausage',
+    'cheddar', 'garlic', 'tomato', 'lentil', 'basil', 'salmon', 'chicken', 'almond', 'vinegar', 'cabbage'
+]
+
+
+def generate_ingredients(num_ingredients=20000, seed=0):
+    """Generate distinct ingredient names of one to three words."""
+    rng = random.Random(seed)
+    ingredients = set(BASES)
+    while len(ingredients) < num_ingredients:
+        words = rng.sample(MODIFIERS, rng.randint(0, 2)) + [rng.choice(BASES)]
+        # Random suffixes keep the vocabulary large, like a real scraped dataset
+        if rng.random() < 0.7:
+            words.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))))
+        ingredients.add(' '.join(words))
+    return sorted(ingredients)
+
+
+def make_typo(word, rng):
+    """Apply one random character edit to a word."""
+    position = rng.randrange(len(word))
+    edit = rng.choice(['delete', 'replace', 'insert', 'swap'])
+    letter = rng.choice(string.ascii_lowercase)
+    if edit == 'delete':
+        return word[:position] + word[position + 1:]
+    if edit == 'replace':
+        return word[:position] + letter + word[position + 1:]
+    if edit == 'insert':
+        return word[:position] + letter + word[position:]
+    position = min(position, len(word) - 2)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+def generate_queries(ingredients, num_queries=300, seed=1):
+    """Generate misspelled ingredients and query words that match nothing."""
+    rng = random.Random(seed)
+    queries = [make_typo(rng.choice(ingredients), rng) for _ in range(num_queries // 2)]
+    queries += [make_typo(rng.choice(BASES), rng) for _ in range(num_queries // 4)]
+    queries += [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+                for _ in range(num_queries // 4)]
+    return queries
+
+
+def time_matcher(match_function, queries):
+    """Return the queries-per-second rate and the matches found."""
+    start = perf_counter()
+    matches = [match_function(query) for query in queries]
+    return len(queries) / (perf_counter() - start), matches
+
+
+if __name__ == "__main__":
+    cutoff = 0.8
+    ingredients = generate_ingredients()
+    queries = generate_queries(ingredients)
+    print(f"Benchmarking fuzzy matching of {len(queries)} queries against {len(ingredients)} ingredients")
+    print("=" * 50)
+
+    start = perf_counter()
+    index = TrigramIndex(ingredients)
+    print(f"Trigram index built in {perf_counter() - start:.2f} seconds")
+
+    def difflib_match(query):
+        matches = get_close_matches(query, ingredients, n=1, cutoff=cutoff)
+        return matches[0] if matches else None
+
+    difflib_rate, difflib_matches = time_matcher(difflib_match, queries)
+    index_rate, index_matches = time_matcher(lambda query: index.best_match(query, cutoff=cutoff), queries)
+
+    print(f"difflib.get_close_matches: {difflib_rate:10,.1f} queries/s")
+    print(f"Trigram index:             {index_rate:10,.1f} queries/s")
+    print(f"Speedup:                   {index_rate / difflib_rate:10.1f}x")
+
+    mismatches = sum(1 for a, b in zip(difflib_matches, index_matches) if a != b)
+    print(f"Queries with a different match: {mismatches} "
+          f"({sum(match is not None for match in index_matches)} queries matched)")
+    if mismatches:
+        sys.exit(1)
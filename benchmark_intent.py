@@ -0,0 +1,76 @@
+"""
+Benchmark script for intent identification.
+This compares searching every raw pattern in INTENT_PATTERNS with re.search
+against the precompiled per-intent alternations used by identify_intent, and
+checks that both pick the same intent.
+"""
+
+import random
+import re
+import sys
+from pathlib import Path
+from time import perf_counter
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from nlu_parser import INTENT_PATTERNS, identify_intent
+
+# Sample chat messages covering every intent and the default
+MESSAGES = [
+    "find me a recipe for chicken curry", "What can I make with eggs, spinach and feta?",
+    "I have tomatoes and basil", "recipes with salmon but no dill", "suggest a recipe for dinner",
+    "help", "what can you do?", "How does this work", "show me the commands",
+    "quit", "bye", "let's exit", "I want to end the chat", "shut down please",
+    "show me the details", "tell me more about the lasagna", "what are the ingredients for pancakes",
+    "ingredients for banana bread", "view recipe", "show me recipe 7", "3", "get recipe #12",
+    "chicken, rice and broccoli", "something vegetarian and quick", "gluten free pasta ideas",
+    "Can I have a vegan dessert?", "how do I prepare risotto", "instructions for the soup"
+]
+
+
+def identify_intent_uncompiled(query):
+    """Previous implementation: re.search of each raw pattern on a freshly lowercased query."""
+    recipe_number_patterns = [
+        r'(?:show|get|view|see|display)(?:\s+me)?(?:\s+recipe)?(?:\s+#)?(?:\s+number)?\s+(\d+)',
+        r'^(\d+)$'
+    ]
+    for pattern in recipe_number_patterns:
+        if re.search(pattern, query.lower()):
+            return 'get_recipe_details'
+    for candidate_intent, patterns in INTENT_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, query.lower()):
+                return candidate_intent
+    return 'find_recipe'
+
+
+def time_identifier(identify_function, messages, repeats=5):
+    """Return the best per-message latency in microseconds over a few runs, plus the intents."""
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        intents = [identify_function(message) for message in messages]
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(messages) * 1e6, intents
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    messages = [rng.choice(MESSAGES) for _ in range(20000)]
+    print(f"Benchmarking intent identification on {len(messages)} messages")
+    print("=" * 50)
+
+    raw_latency, raw_intents = time_identifier(identify_intent_uncompiled, messages)
+    compiled_latency, compiled_intents = time_identifier(identify_intent, messages)
+
+    print(f"Raw patterns with re.search:   {raw_latency:8.2f} us/message")
+    print(f"Compiled intent alternations:  {compiled_latency:8.2f} us/message")
+    print(f"Speedup:                       {raw_latency / compiled_latency:8.1f}x")
+
+    mismatches = sum(1 for a, b in zip(raw_intents, compiled_intents) if a != b)
+    print(f"Messages with a different intent: {mismatches}")
+    if mismatches:
+        sys.exit(1)
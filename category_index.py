@@ -0,0 +1,440 @@
+"""
+Category index module for Recipe Bot.
+This module contains the recipe categories the bot understands and the
+category filters of the recipe matcher. Filtering a search by a category
+mentions every search term in the recipe text, so the categories the parser
+can produce are precomputed once as bitmaps over the whole corpus.
+"""
+
+import logging
+from time import time
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Search terms of the special categories (qualifiers such as "quick" that
+# describe a recipe rather than name its type)
+SPECIAL_CATEGORY_TERMS = {
+    'quick': ['quick', 'fast', 'rapid', 'ready in', 'minutes', '30 min', '15 min'],
+    'easy': ['easy', 'simple', 'basic', 'beginner', 'effortless'],
+    'fancy': ['fancy', 'gourmet', 'elegant', 'sophisticated', 'impressive', 'special'],
+    'party': ['party', 'gathering', 'entertaining', 'celebrate', 'celebration', 'guests'],
+    'dinner party': ['dinner party', 'entertaining', 'guests', 'gathering', 'formal dinner'],
+    'spicy': ['spicy', 'spice', 'hot', 'chili', 'pepper', 'jalapeño', 'cayenne'],
+    'bbq': ['bbq', 'barbecue', 'grill', 'grilled', 'cookout', 'outdoor cooking'],
+    'healthy': ['healthy', 'nutritious', 'light', 'low-fat', 'low-calorie', 'fitness', 'diet']
+}
+
+# Words in a user query that ask for a special category, and the category they ask for
+SPECIAL_CATEGORY_MODIFIERS = {
+    'quick': 'quick',
+    'fast': 'quick',
+    'easy': 'easy',
+    'simple': 'easy',
+    'fancy': 'fancy',
+    'elegant': 'fancy',
+    'gourmet': 'fancy',
+    'party': 'party',
+    'celebration': 'party',
+    'holiday': 'holiday',
+    'spicy': 'spicy',
+    'hot': 'spicy',
+    'dinner party': 'dinner party',
+    'picnic': 'picnic',
+    'bbq': 'bbq',
+    'barbecue': 'bbq',
+    'grilled': 'grilled',
+    'baked': 'baked',
+    'roasted': 'roasted',
+    'fried': 'fried',
+    'healthy': 'healthy',
+    'light': 'healthy'
+}
+
+# Meal types that can follow a special category, as in "quick breakfast"
+PRIMARY_CATEGORIES = ['breakfast', 'lunch', 'dinner', 'dessert', 'soup', 'salad', 'appetizer']
+
+# Recipe categories and the words in a user query that ask for them
+RECIPE_CATEGORY_TERMS = {
+    'dessert': ['dessert', 'desserts', 'sweet', 'cake', 'cookies', 'pie', 'pastry', 'pastries', 'baked goods'],
+    'breakfast': ['breakfast', 'morning meal', 'brunch'],
+    'lunch': ['lunch', 'midday meal'],
+    'dinner': ['dinner', 'supper', 'evening meal'],
+    'appetizer': ['appetizer', 'appetizers', 'starter', 'starters', 'hors d\'oeuvre', 'hors d\'oeuvres', 'snack', 'snacks'],
+    'main': ['main course', 'main dish', 'entree', 'entrée', 'main'],
+    'side': ['side', 'side dish', 'sides', 'accompaniment'],
+    'soup': ['soup', 'soups', 'stew', 'stews', 'broth', 'bisque', 'chowder'],
+    'salad': ['salad', 'salads'],
+    'bread': ['bread', 'breads', 'roll', 'rolls', 'bun', 'buns'],
+    'drink': ['drink', 'drinks', 'beverage', 'beverages', 'cocktail', 'cocktails', 'smoothie', 'smoothies', 'juice', 'juices'],
+    'seafood': ['seafood', 'fish', 'shrimp', 'crab', 'lobster', 'scallop', 'scallops', 'oyster', 'oysters'],
+    'meat': ['meat', 'beef', 'pork', 'lamb', 'chicken', 'turkey', 'duck', 'goose'],
+    'pasta': ['pasta', 'noodle', 'spaghetti', 'lasagna', 'macaroni']
+}
+
+# Columns that hold a recipe's category, in order of preference
+CATEGORY_COLUMNS = ['category', 'categories', 'type', 'dish_type', 'meal_type', 'recipe_type']
+
+
+def find_category_column(columns):
+    """
+    Get the first dedicated category column of a DataFrame.
+
+    Parameters:
+    -----------
+    columns : pandas.Index
+        Columns of the recipe DataFrame
+
+    Returns:
+    --------
+    str or None
+        Name of the category column, or None if there is none
+    """
+    for column in CATEGORY_COLUMNS:
+        if column in columns:
+            return column
+    return None
+
+
+def special_category_of(recipe_category):
+    """
+    Get the special category a recipe category starts with.
+
+    Parameters:
+    -----------
+    recipe_category : str
+        Category of recipes to search for, such as 'quick' or 'quick breakfast'
+
+    Returns:
+    --------
+    str or None
+        Key of SPECIAL_CATEGORY_TERMS, or None for an ordinary category
+    """
+    for special in SPECIAL_CATEGORY_TERMS:
+        if recipe_category == special or recipe_category.startswith(f"{special} "):
+            return special
+    return None
+
+
+class RecipeColumns:
+    """
+    Columns of the recipes being filtered, lowercased on first use.
+
+    Columns covered by a text index are looked up in its posting lists
+    instead of being lowercased and scanned.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    positions : numpy.ndarray, optional
+        Row positions of the recipes to filter. Default is all recipes.
+    text_index : TextIndex, optional
+        Index over the normalized text of some of the columns
+    """
+
+    def __init__(self, df_recipes, positions=None, text_index=None):
+        self._df = df_recipes
+        self._positions = positions if positions is not None and len(positions) != len(df_recipes) else None
+        self._text_index = text_index
+        self.columns = df_recipes.columns
+        self.num_rows = len(df_recipes) if self._positions is None else len(self._positions)
+        self._lowered = {}
+
+    def values(self, column):
+        """Get the values of a column for the recipes being filtered."""
+        if self._positions is None:
+            return self._df[column]
+        return self._df[column].iloc[self._positions]
+
+    def contains(self, column, text):
+        """Check which recipes have text (a regular expression) in a column, ignoring case."""
+        if self._text_index is not None and self._text_index.has_column(column):
+            # Indexed columns treat the text as a literal phrase, ignoring punctuation
+            return self._text_index.contains(column, text, self._positions)
+        lowered = self._lowered.get(column)
+        if lowered is None:
+            lowered = self._lowered[column] = self.values(column).str.lower()
+        return lowered.str.contains(text, na=False).to_numpy(dtype=bool, copy=True)
+
+
+def special_term_mask(recipe_columns, term, config):
+    """
+    Check which recipes mention a special category search term.
+
+    The name, instructions, description, tags, keywords and notes are searched.
+
+    Parameters:
+    -----------
+    recipe_columns : RecipeColumns
+        Recipes to check
+    term : str
+        Lowercased search term
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array, True for recipes mentioning the term
+    """
+    columns = recipe_columns.columns
+    mask = recipe_columns.contains(config.RECIPE_NAME_COLUMN, term)
+    if config.INSTRUCTIONS_COLUMN in columns:
+        mask |= recipe_columns.contains(config.INSTRUCTIONS_COLUMN, term)
+    if 'description' in columns:
+        mask |= recipe_columns.contains('description', term)
+
+    for column in ['tags', 'keywords', 'notes']:
+        if column not in columns:
+            continue
+        try:
+            values = recipe_columns.values(column)
+            if values.dtype == 'object':
+                if isinstance(values.iloc[0], list):
+                    # Handle list type columns
+                    mask |= values.apply(
+                        lambda x: any(term.lower() in str(tag).lower() for tag in x) if isinstance(x, list) else False
+                    ).to_numpy(dtype=bool)
+                else:
+                    mask |= recipe_columns.contains(column, term)
+        except Exception as e:
+            logger.warning(f"Error searching in {column} column: {e}")
+    return mask
+
+
+def special_category_mask(recipe_columns, special_category, config):
+    """
+    Check which recipes mention any search term of a special category.
+
+    Parameters:
+    -----------
+    recipe_columns : RecipeColumns
+        Recipes to check
+    special_category : str
+        Key of SPECIAL_CATEGORY_TERMS
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array, True for recipes in the special category
+    """
+    mask = np.zeros(recipe_columns.num_rows, dtype=bool)
+    for term in SPECIAL_CATEGORY_TERMS[special_category]:
+        mask |= special_term_mask(recipe_columns, term, config)
+    return mask
+
+
+def primary_category_mask(recipe_columns, primary_category, config):
+    """
+    Check which recipes belong to the meal type following a special category.
+
+    The category column is searched if there is one, otherwise the name and
+    the instructions.
+
+    Parameters:
+    -----------
+    recipe_columns : RecipeColumns
+        Recipes to check
+    primary_category : str
+        Meal type, such as 'breakfast' in 'quick breakfast'
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array, True for recipes of the meal type
+    """
+    text = primary_category.lower()
+    category_column = find_category_column(recipe_columns.columns)
+    if category_column:
+        return recipe_columns.contains(category_column, text)
+
+    mask = recipe_columns.contains(config.RECIPE_NAME_COLUMN, text)
+    if config.INSTRUCTIONS_COLUMN in recipe_columns.columns:
+        mask |= recipe_columns.contains(config.INSTRUCTIONS_COLUMN, text)
+    return mask
+
+
+def category_mask(recipe_columns, recipe_category, config):
+    """
+    Check which recipes belong to an ordinary (not special) category.
+
+    The category column is searched if there is one, otherwise the name,
+    tags, keywords, description and instructions.
+
+    Parameters:
+    -----------
+    recipe_columns : RecipeColumns
+        Recipes to check
+    recipe_category : str
+        Category of recipes to search for
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array, True for recipes in the category
+    """
+    text = recipe_category.lower()
+    columns = recipe_columns.columns
+    category_column = find_category_column(columns)
+    if category_column:
+        return recipe_columns.contains(category_column, text)
+
+    mask = recipe_columns.contains(config.RECIPE_NAME_COLUMN, text)
+
+    if 'tags' in columns:
+        try:
+            values = recipe_columns.values('tags')
+            if values.dtype == 'object':
+                mask |= values.apply(
+                    lambda x: any(text in tag.lower() for tag in x) if isinstance(x, list) else False
+                ).to_numpy(dtype=bool)
+        except Exception as e:
+            logger.warning(f"Error searching in tags column: {e}")
+
+    for column in ['keywords', 'description', config.INSTRUCTIONS_COLUMN]:
+        if column in columns:
+            try:
+                mask |= recipe_columns.contains(column, text)
+            except Exception as e:
+                logger.warning(f"Error searching in {column} column: {e}")
+    return mask
+
+
+def recipe_category_mask(recipe_columns, recipe_category, config):
+    """
+    Check which recipes belong to a category as understood by the matcher.
+
+    A special category followed by a meal type, such as 'quick breakfast',
+    needs both the special category and the meal type.
+
+    Parameters:
+    -----------
+    recipe_columns : RecipeColumns
+        Recipes to check
+    recipe_category : str
+        Category of recipes to search for
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array, True for recipes in the category
+    """
+    special_category = special_category_of(recipe_category)
+    if special_category is None:
+        return category_mask(recipe_columns, recipe_category, config)
+
+    mask = special_category_mask(recipe_columns, special_category, config)
+    if ' ' in recipe_category:
+        mask &= primary_category_mask(recipe_columns, recipe_category.split(' ', 1)[1], config)
+    return mask
+
+
+class CategoryIndex:
+    """
+    Bitmaps of the recipes in each category the query parser can produce.
+
+    Special categories and the meal types that may follow them are stored
+    separately, so 'quick breakfast' is the AND of two bitmaps. Each bitmap
+    holds one bit per recipe, in row order.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    config : module
+        Configuration module
+    text_index : TextIndex, optional
+        Index over the normalized name and instructions
+    """
+
+    def __init__(self, df_recipes, config, text_index=None):
+        start_time = time()
+        self.num_recipes = len(df_recipes)
+        recipe_columns = RecipeColumns(df_recipes, text_index=text_index)
+        if config.RECIPE_NAME_COLUMN not in recipe_columns.columns:
+            logger.warning(f"Column '{config.RECIPE_NAME_COLUMN}' not found, category index will be empty")
+            self._bitmaps = {}
+            return
+
+        # The parser's modifiers that the matcher does not treat as special
+        # are searched as ordinary categories
+        ordinary = set(RECIPE_CATEGORY_TERMS)
+        ordinary.update(category for category in SPECIAL_CATEGORY_MODIFIERS.values()
+                        if category not in SPECIAL_CATEGORY_TERMS)
+        primary = set(PRIMARY_CATEGORIES)
+        primary.update(special.split(' ', 1)[1] for special in SPECIAL_CATEGORY_TERMS if ' ' in special)
+
+        self._bitmaps = {}
+        for special_category in SPECIAL_CATEGORY_TERMS:
+            self._bitmaps[('special', special_category)] = self._pack(
+                special_category_mask(recipe_columns, special_category, config)
+            )
+        for primary_category in sorted(primary):
+            self._bitmaps[('primary', primary_category)] = self._pack(
+                primary_category_mask(recipe_columns, primary_category, config)
+            )
+        for recipe_category in sorted(ordinary):
+            self._bitmaps[('category', recipe_category)] = self._pack(
+                category_mask(recipe_columns, recipe_category, config)
+            )
+
+        logger.info(f"Built category index with {len(self._bitmaps)} bitmaps "
+                    f"in {time() - start_time:.2f} seconds")
+
+    @staticmethod
+    def _pack(mask):
+        """Pack a boolean array into a bitmap, bit i of byte j standing for recipe 8 * j + i."""
+        return np.packbits(mask, bitorder='little')
+
+    def _bits(self, key, positions):
+        """Read the bits of some recipes from a bitmap."""
+        bitmap = self._bitmaps[key]
+        return ((bitmap[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1).astype(bool)
+
+    def _keys(self, recipe_category):
+        """Get the bitmaps whose AND gives a category, or None if one is missing."""
+        special_category = special_category_of(recipe_category)
+        if special_category is None:
+            keys = [('category', recipe_category)]
+        else:
+            keys = [('special', special_category)]
+            if ' ' in recipe_category:
+                keys.append(('primary', recipe_category.split(' ', 1)[1]))
+        return keys if all(key in self._bitmaps for key in keys) else None
+
+    def contains(self, recipe_category, positions):
+        """
+        Check which recipes belong to a category.
+
+        Parameters:
+        -----------
+        recipe_category : str
+            Category of recipes to search for
+        positions : numpy.ndarray
+            Row positions of the recipes to check
+
+        Returns:
+        --------
+        numpy.ndarray or None
+            Boolean array aligned with positions, or None if the category
+            is not in the index
+        """
+        keys = self._keys(recipe_category)
+        if keys is None:
+            return None
+        positions = np.asarray(positions, dtype=np.int64)
+        mask = self._bits(keys[0], positions)
+        for key in keys[1:]:
+            mask &= self._bits(key, positions)
+        return mask
@@ -13,11 +13,27 @@ DATASET_PATH = 'D:/chatbot-project/recipe_bot_project/data/recipes_raw_nosource_
 # Limit the number of recipes to load (set to None for all recipes)
 LIMIT_RECIPES = None
 
+# Cache the loaded and cleaned corpus so later startups skip parsing and cleaning
+USE_CORPUS_CACHE = True
+
+# Directory for the corpus cache files
+CORPUS_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
 # ----- DATA PROCESSING CONFIGURATION -----
 
 # Remove quantities and units from ingredients during preprocessing
 REMOVE_QUANTITIES = True
 
+# Worker processes used to clean ingredients (1 cleans serially, None uses all CPUs)
+CLEANING_WORKERS = 1
+
+# Number of recipes sent to a cleaning worker at a time
+CLEANING_CHUNK_SIZE = 2000
+
+# Maximum number of distinct ingredient lines and tokens whose cleaned form is cached
+CLEANING_CACHE_SIZE = 100000
+LEMMA_CACHE_SIZE = 50000
+
 # ----- COLUMN NAME CONFIGURATION -----
 # Standardized column names used after loading/cleaning
 RECIPE_NAME_COLUMN = "name"
@@ -36,6 +52,14 @@ EXACT_MATCH_BOOST = 2.0
 # Penalty for recipes containing excluded ingredients
 EXCLUDED_INGREDIENT_PENALTY = 5.0
 
+# Scoring engine used by find_matching_recipes:
+# 'python' scores recipes one at a time, 'sparse' scores all recipes at once
+# with sparse matrix products over the ingredient vocabulary (requires scipy)
+MATCH_ENGINE = 'python'
+
+# Number of requested ingredients whose fuzzy matches in the recipe vocabulary are cached
+FUZZY_TERM_CACHE_SIZE = 1024
+
 # ----- DIETARY PREFERENCE CONFIGURATION -----
 
 # Define non-vegetarian ingredients
@@ -87,6 +111,13 @@ RESULTS_LIMIT = 10
 # Minimum ratio of matched ingredients to total ingredients in recipe
 MIN_MATCH_RATIO = 0.3
 
+# Number of searches whose ranked results are cached, keyed on the normalized
+# search parameters (0 disables the cache)
+RESULT_CACHE_SIZE = 1024
+
+# Approximate memory cap of the search result cache, in bytes
+RESULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
 # ----- DISPLAY CONFIGURATION -----
 
 # Number of recipes to display per page
@@ -112,6 +143,9 @@ USE_NLTK = True
 # Path to NLP model (if applicable)
 NLP_MODEL_PATH = None
 
+# Number of parsed user queries to cache, keyed on the exact query text (0 disables the cache)
+PARSE_CACHE_SIZE = 0
+
 # ----- UI CONFIGURATION -----
 
 # Enable/disable ASCII art for console UI
@@ -120,6 +154,47 @@ USE_ASCII_ART = True
 # Enable/disable colorized output (if supported by terminal)
 USE_COLORS = True
 
+# ----- SESSION CONFIGURATION -----
+
+# Where chat sessions are kept: 'memory' (per process) or 'sqlite' (shared by all server processes)
+SESSION_BACKEND = 'memory'
+
+# Path to the SQLite session database used by the 'sqlite' backend
+SESSION_DB_PATH = os.path.join(CORPUS_CACHE_DIR, 'sessions.sqlite3')
+
+# Idle time in seconds after which a session expires (None keeps sessions until evicted)
+SESSION_TTL_SECONDS = 3600
+
+# Maximum number of sessions kept; the least recently used are evicted first (None for no limit)
+MAX_SESSIONS = 10000
+
+# Seconds between sweeps that remove expired sessions
+SESSION_SWEEP_INTERVAL = 60
+
+# ----- SERVER CONFIGURATION -----
+
+# Address and port of the production server (server.py)
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 5000
+
+# Worker processes forked by server.py; they share the corpus loaded by the master
+SERVER_WORKERS = 2
+
+# Seconds between worker memory reports in server.py (0 reports once at startup)
+MEMORY_REPORT_INTERVAL = 0
+
+# ----- CHAT SERVING CONFIGURATION -----
+
+# Chat messages answered at the same time, and how many more may wait for a free slot
+CHAT_POOL_WORKERS = 2
+CHAT_QUEUE_SIZE = 16
+
+# Seconds a chat message may take, queueing included, before a 503 is returned
+CHAT_DEADLINE_SECONDS = 10
+
+# Retry-After value sent with 503 responses, in seconds
+CHAT_RETRY_AFTER_SECONDS = 2
+
 # ----- OTHER CONFIGURATION -----
 
 # Application version
@@ -0,0 +1,308 @@
+"""
+Corpus cache module for Recipe Bot.
+This module stores the loaded and cleaned recipe corpus in a binary .npz file
+so that later startups can skip JSON parsing and ingredient cleaning.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from pathlib import Path
+from time import time
+
+import numpy as np
+import pandas as pd
+
+from data_cleaner import CLEANER_VERSION
+from data_loader import LOADER_VERSION
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Version of the cache file layout; bump it when the stored arrays change
+CACHE_FORMAT_VERSION = 2
+
+# Columns stored as one string per recipe
+STRING_COLUMNS = ['name', 'instructions']
+
+# Columns stored as a list of strings per recipe
+LIST_COLUMNS = ['ingredients', 'cleaned_ingredients']
+
+
+def dataset_fingerprint(dataset_path):
+    """
+    Compute the SHA-256 hash of a dataset file.
+
+    Parameters:
+    -----------
+    dataset_path : str or Path
+        Path to the dataset file
+
+    Returns:
+    --------
+    str
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(dataset_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def corpus_cache_path(config):
+    """
+    Get the cache file for the current dataset and configuration.
+
+    The file name is derived from the dataset contents, the configuration
+    values that change loading or cleaning, and the loader and cleaner
+    versions, so a change to any of them selects a different cache file.
+
+    Parameters:
+    -----------
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    Path or None
+        Path of the cache file, or None if the dataset file does not exist
+    """
+    dataset_path = Path(config.DATASET_PATH)
+    if not dataset_path.exists():
+        return None
+
+    key = {
+        'dataset_sha256': dataset_fingerprint(dataset_path),
+        'remove_quantities': config.REMOVE_QUANTITIES,
+        'use_nltk': config.USE_NLTK,
+        'limit_recipes': config.LIMIT_RECIPES,
+        'cleaned_column': config.CLEANED_INGREDIENTS_COLUMN,
+        'cleaner_version': CLEANER_VERSION,
+        'loader_version': LOADER_VERSION,
+        'format_version': CACHE_FORMAT_VERSION
+    }
+    key_hash = hashlib.sha256(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+    return Path(config.CORPUS_CACHE_DIR) / f"corpus_{key_hash[:24]}.npz"
+
+
+def _encode_strings(values):
+    """Pack strings into one UTF-8 buffer plus offsets; None entries are flagged as missing."""
+    encoded = [value.encode('utf-8') if value is not None else b'' for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    missing = np.array([value is None for value in values], dtype=bool)
+    return data, offsets, missing
+
+
+def _decode_strings(data, offsets):
+    """Unpack strings stored by _encode_strings."""
+    buffer = data.tobytes()
+    return [buffer[start:end].decode('utf-8') for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def _as_string(value):
+    """Normalize a string column value, returning None for missing values."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if not isinstance(value, str):
+        raise TypeError(f"Cannot cache non-string value of type {type(value).__name__}")
+    return value
+
+
+# Kinds of the values of an object id column, stored per recipe
+_ID_MISSING, _ID_INT, _ID_FLOAT, _ID_STRING = 0, 1, 2, 3
+
+
+def _encode_ids(ids):
+    """
+    Store an id column so that it is read back with the same values and types.
+
+    Integer and float columns are stored as int64 and float64 arrays (NaN
+    stays NaN). Other columns are stored value by value as ints, floats,
+    strings or None, with the kind of each value alongside.
+
+    Raises:
+    -------
+    TypeError
+        If an id is not an int, float, string or None
+    """
+    if pd.api.types.is_integer_dtype(ids):
+        return {'id_int': ids.to_numpy(dtype=np.int64)}
+    if pd.api.types.is_float_dtype(ids):
+        return {'id_float': ids.to_numpy(dtype=np.float64)}
+
+    values = ids.tolist()
+    kinds = np.zeros(len(values), dtype=np.uint8)
+    ints = np.zeros(len(values), dtype=np.int64)
+    floats = np.zeros(len(values), dtype=np.float64)
+    strings = [None] * len(values)
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        if isinstance(value, str):
+            kinds[position] = _ID_STRING
+            strings[position] = value
+        elif isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+            kinds[position] = _ID_INT
+            ints[position] = value
+        elif isinstance(value, (float, np.floating)):
+            kinds[position] = _ID_FLOAT
+            floats[position] = value
+        else:
+            raise TypeError(f"Cannot cache id of type {type(value).__name__}")
+    arrays = {'id_kind': kinds, 'id_ints': ints, 'id_floats': floats}
+    arrays['id_data'], arrays['id_offsets'], _ = _encode_strings(strings)
+    return arrays
+
+
+def _decode_ids(arrays):
+    """Read back an id column stored by _encode_ids."""
+    if 'id_int' in arrays:
+        return arrays['id_int']
+    if 'id_float' in arrays:
+        return arrays['id_float']
+
+    strings = _decode_strings(arrays['id_data'], arrays['id_offsets'])
+    columns = {_ID_INT: arrays['id_ints'].tolist(), _ID_FLOAT: arrays['id_floats'].tolist(), _ID_STRING: strings}
+    return [None if kind == _ID_MISSING else columns[kind][position]
+            for position, kind in enumerate(arrays['id_kind'].tolist())]
+
+
+def save_corpus_cache(df_recipes, canonical_ingredients, config):
+    """
+    Write the prepared recipe corpus to the cache.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        Loaded recipes with the cleaned ingredients column
+    canonical_ingredients : set
+        Canonical ingredients extracted from the recipes
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    bool
+        True if the cache file was written, False otherwise
+    """
+    start_time = time()
+    cache_path = corpus_cache_path(config)
+    if cache_path is None:
+        return False
+
+    columns = {
+        'name': config.RECIPE_NAME_COLUMN,
+        'instructions': config.INSTRUCTIONS_COLUMN,
+        'ingredients': config.RAW_INGREDIENTS_COLUMN,
+        'cleaned_ingredients': config.CLEANED_INGREDIENTS_COLUMN
+    }
+    missing_columns = [column for column in list(columns.values()) + ['id'] if column not in df_recipes.columns]
+    if missing_columns:
+        logger.warning(f"Not caching corpus, missing columns: {missing_columns}")
+        return False
+
+    arrays = {
+        'format_version': np.array(CACHE_FORMAT_VERSION),
+        'num_recipes': np.array(len(df_recipes))
+    }
+    try:
+        for field in STRING_COLUMNS:
+            values = [_as_string(value) for value in df_recipes[columns[field]]]
+            arrays[f'{field}_data'], arrays[f'{field}_offsets'], arrays[f'{field}_missing'] = _encode_strings(values)
+
+        for field in LIST_COLUMNS:
+            lists = [value if isinstance(value, list) else [] for value in df_recipes[columns[field]]]
+            items = [_as_string(item) or '' for value in lists for item in value]
+            arrays[f'{field}_data'], arrays[f'{field}_offsets'], _ = _encode_strings(items)
+            list_offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+            np.cumsum([len(value) for value in lists], out=list_offsets[1:])
+            arrays[f'{field}_lists'] = list_offsets
+
+        # Ids are stored with their types, as sessions keep them across restarts
+        arrays.update(_encode_ids(df_recipes['id']))
+
+        arrays['canonical_data'], arrays['canonical_offsets'], _ = _encode_strings(sorted(canonical_ingredients))
+    except TypeError as e:
+        logger.warning(f"Not caching corpus: {e}")
+        return False
+
+    # Write to a temporary file first so readers never see a partial cache
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write corpus cache {cache_path}: {e}")
+        if temp_path.exists():
+            temp_path.unlink()
+        return False
+
+    logger.info(f"Saved corpus cache to {cache_path} in {time() - start_time:.2f} seconds")
+    return True
+
+
+def load_corpus_cache(config):
+    """
+    Load the prepared recipe corpus from the cache if it is valid.
+
+    Parameters:
+    -----------
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    tuple or None
+        (recipes DataFrame, canonical ingredients set), or None if there is
+        no valid cache for the current dataset and configuration
+    """
+    start_time = time()
+    cache_path = corpus_cache_path(config)
+    if cache_path is None or not cache_path.exists():
+        logger.info("No corpus cache found for the current dataset and configuration")
+        return None
+
+    try:
+        with np.load(cache_path, allow_pickle=False) as arrays:
+            if int(arrays['format_version']) != CACHE_FORMAT_VERSION:
+                logger.info(f"Ignoring corpus cache {cache_path} with an old format")
+                return None
+
+            data = {}
+            for field in STRING_COLUMNS:
+                values = _decode_strings(arrays[f'{field}_data'], arrays[f'{field}_offsets'])
+                data[field] = [None if missing else value
+                               for value, missing in zip(values, arrays[f'{field}_missing'].tolist())]
+
+            for field in LIST_COLUMNS:
+                items = _decode_strings(arrays[f'{field}_data'], arrays[f'{field}_offsets'])
+                list_offsets = arrays[f'{field}_lists'].tolist()
+                data[field] = [items[start:end] for start, end in zip(list_offsets[:-1], list_offsets[1:])]
+
+            data['id'] = _decode_ids(arrays)
+
+            canonical_ingredients = set(_decode_strings(arrays['canonical_data'], arrays['canonical_offsets']))
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile) as e:
+        # A truncated or corrupt file is treated like a missing one
+        logger.warning(f"Could not read corpus cache {cache_path}: {e}")
+        return None
+
+    # Same column order as load_recipe_data followed by the cleaned column
+    df_recipes = pd.DataFrame({
+        config.RECIPE_NAME_COLUMN: data['name'],
+        config.RAW_INGREDIENTS_COLUMN: data['ingredients'],
+        config.INSTRUCTIONS_COLUMN: data['instructions'],
+        'id': data['id'],
+        config.CLEANED_INGREDIENTS_COLUMN: data['cleaned_ingredients']
+    })
+
+    logger.info(f"Loaded {len(df_recipes)} recipes from corpus cache {cache_path} "
+                f"in {time() - start_time:.2f} seconds")
+    return df_recipes, canonical_ingredients
@@ -9,9 +9,17 @@ from collections import Counter
 import config
 import logging
 import os
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from phrase_matcher import PhraseMatcher
 
 logger = logging.getLogger(__name__)
 
+# Version of the cleaning rules; bump it whenever the cleaned output changes
+# so that cached corpora built with the old rules are not reused
+CLEANER_VERSION = 2
+
 # If using NLTK
 if config.USE_NLTK:
     import nltk
@@ -83,6 +91,147 @@ IMPORTANT_INGREDIENTS = [
     'oregano', 'thyme', 'rosemary', 'cilantro', 'parsley', 'mint', 'salt', 'pepper'
 ]
 
+def _whole_word_alternation(terms):
+    """Compile one whole-word pattern matching any of the terms, longest first."""
+    ordered = sorted(set(terms), key=lambda term: (-len(term), term))
+    return re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in ordered) + r')\b')
+
+# Automaton finding every compound ingredient in a line in one pass
+COMPOUND_MATCHER = PhraseMatcher(COMPOUND_INGREDIENTS)
+
+# Precompiled patterns for removing units and preparation terms in one pass each
+UNITS_PATTERN = _whole_word_alternation(UNITS)
+PREP_TERMS_PATTERN = _whole_word_alternation(PREP_TERMS)
+
+def remove_units_and_prep_terms(ingredient):
+    """
+    Remove units of measurement and preparation terms from an ingredient line.
+    
+    Parameters:
+    -----------
+    ingredient : str
+        Lowercased ingredient text.
+        
+    Returns:
+    --------
+    str
+        Ingredient text with whole-word units and preparation terms removed.
+    """
+    ingredient = UNITS_PATTERN.sub('', ingredient)
+    return PREP_TERMS_PATTERN.sub('', ingredient)
+
+@lru_cache(maxsize=config.LEMMA_CACHE_SIZE)
+def lemmatize_token(token):
+    """Lemmatize a single token with WordNet, caching the result."""
+    return lemmatizer.lemmatize(token)
+
+@lru_cache(maxsize=config.CLEANING_CACHE_SIZE)
+def clean_ingredient_line(ingredient):
+    """
+    Clean a single ingredient line down to its main ingredient name.
+    
+    Results are cached, so the line should be normalized (lowercased and
+    stripped) before calling this to get the most cache hits.
+    
+    Parameters:
+    -----------
+    ingredient : str
+        Lowercased, stripped ingredient line (e.g., "1 cup chopped onion").
+        
+    Returns:
+    --------
+    str or None
+        Main ingredient name, or None if nothing usable is left.
+    """
+    # Check for compound ingredients first, keeping the longest one found
+    compound = COMPOUND_MATCHER.longest_match(ingredient)
+            
+    # If a compound ingredient was found, skip the rest of processing for this ingredient
+    if compound:
+        return compound
+    
+    # Remove quantities (numbers, fractions, etc.)
+    ingredient = re.sub(r'\d+\s*\/\s*\d+', '', ingredient)  # Remove fractions like 1/2
+    ingredient = re.sub(r'\d+\s*\.\s*\d+', '', ingredient)  # Remove decimals like 0.5
+    ingredient = re.sub(r'\d+', '', ingredient)  # Remove integers
+    
+    # Remove units of measurement and preparation instructions
+    ingredient = remove_units_and_prep_terms(ingredient)
+        
+    # Remove additional parenthetical information
+    ingredient = re.sub(r'\([^)]*\)', '', ingredient)
+    
+    # Remove extra spaces and punctuation
+    ingredient = re.sub(r'[^\w\s]', ' ', ingredient)
+    ingredient = re.sub(r'\s+', ' ', ingredient).strip()
+    
+    if not ingredient:
+        return None
+    
+    # Process with NLTK or spaCy
+    if config.USE_NLTK:
+        tokens = word_tokenize(ingredient)
+        # Lemmatize tokens
+        lemmas = [lemmatize_token(token) for token in tokens 
+                 if token.isalpha() and token not in STOP_WORDS]
+    elif hasattr(config, 'nlp') and config.nlp:
+        # Using spaCy
+        # This part requires spaCy to be installed and a model loaded
+        # Assuming config.nlp is a loaded spaCy model if USE_NLTK is False
+        doc = config.nlp(ingredient)
+        lemmas = [token.lemma_ for token in doc 
+                 if token.is_alpha and not token.is_stop]
+    else:
+        logger.warning("config.USE_NLTK is False, but spaCy model (config.nlp) not loaded. Skipping spaCy processing.")
+        # Fallback or simply skip if spaCy isn't configured
+        return ingredient # Use the minimally cleaned ingredient as fallback
+    
+    # Filter out descriptive terms
+    core_lemmas = [lemma for lemma in lemmas if lemma not in DESCRIPTIVE_TERMS]
+    if not core_lemmas:
+        # Every lemma is a descriptor (or there are none), so there is no main ingredient
+        return None
+    
+    # Try to find an important ingredient first
+    for lemma in core_lemmas:
+        if lemma in IMPORTANT_INGREDIENTS:
+            return lemma
+    
+    # If no important ingredient was found, use the longest non-descriptive lemma
+    return max(core_lemmas, key=len)
+
+def cleaning_cache_stats():
+    """
+    Get hit and miss counts for the ingredient line and lemma caches.
+    
+    Returns:
+    --------
+    dict
+        Hits and misses for the 'line' and 'lemma' caches.
+    """
+    line_info = clean_ingredient_line.cache_info()
+    lemma_info = lemmatize_token.cache_info()
+    return {
+        'line': {'hits': line_info.hits, 'misses': line_info.misses},
+        'lemma': {'hits': lemma_info.hits, 'misses': lemma_info.misses}
+    }
+
+def _log_cache_stats(stats):
+    """Log the hit rates of the cleaning caches."""
+    for name, counts in stats.items():
+        lookups = counts['hits'] + counts['misses']
+        hit_rate = counts['hits'] / lookups if lookups else 0.0
+        logger.info(f"Ingredient {name} cache: {counts['hits']} hits, {counts['misses']} misses "
+                    f"({hit_rate:.1%} hit rate)")
+
+def _cache_stats_since(before):
+    """Cache hits and misses counted since an earlier cleaning_cache_stats() snapshot."""
+    after = cleaning_cache_stats()
+    return {
+        name: {key: after[name][key] - before[name][key] for key in ('hits', 'misses')}
+        for name in after
+    }
+
 def clean_and_extract_ingredients(raw_ingredients_data):
     """
     Clean and extract ingredient names from raw ingredient data.
@@ -129,112 +278,42 @@ def clean_and_extract_ingredients(raw_ingredients_data):
         if not isinstance(ingredient, str):
             ingredient = str(ingredient)
             
-        # Convert to lowercase
-        ingredient = ingredient.lower()
-        
-        # Check for compound ingredients first
-        compound_found = False
-        for compound in COMPOUND_INGREDIENTS:
-            if compound in ingredient:
-                cleaned_ingredients.append(compound)
-                compound_found = True
-                break
-                
-        # If a compound ingredient was found, skip the rest of processing for this ingredient
-        if compound_found:
-            continue
-        
-        # Remove quantities (numbers, fractions, etc.)
-        ingredient = re.sub(r'\d+\s*\/\s*\d+', '', ingredient)  # Remove fractions like 1/2
-        ingredient = re.sub(r'\d+\s*\.\s*\d+', '', ingredient)  # Remove decimals like 0.5
-        ingredient = re.sub(r'\d+', '', ingredient)  # Remove integers
-        
-        # Remove units of measurement
-        for unit in UNITS:
-            ingredient = re.sub(r'\b' + unit + r'\b', '', ingredient)
-        
-        # Remove preparation instructions
-        for prep in PREP_TERMS:
-            ingredient = re.sub(r'\b' + prep + r'\b', '', ingredient)
-            
-        # Remove additional parenthetical information
-        ingredient = re.sub(r'\([^)]*\)', '', ingredient)
-        
-        # Remove extra spaces and punctuation
-        ingredient = re.sub(r'[^\w\s]', ' ', ingredient)
-        ingredient = re.sub(r'\s+', ' ', ingredient).strip()
-        
-        if ingredient:
-            # Process with NLTK or spaCy
-            if config.USE_NLTK:
-                tokens = word_tokenize(ingredient)
-                # Lemmatize tokens
-                lemmas = [lemmatizer.lemmatize(token) for token in tokens 
-                         if token.isalpha() and token not in STOP_WORDS]
-                
-                if lemmas:
-                    # Filter out descriptive terms
-                    core_lemmas = [lemma for lemma in lemmas if lemma not in DESCRIPTIVE_TERMS]
-                    if not core_lemmas:
-                        # If all terms were filtered out, use original lemmas but try to avoid descriptors
-                        for lemma in lemmas:
-                            if lemma not in DESCRIPTIVE_TERMS:
-                                cleaned_ingredients.append(lemma)
-                                break
-                    else:
-                        # Try to find an important ingredient first
-                        important_found = False
-                        for lemma in core_lemmas:
-                            if lemma in IMPORTANT_INGREDIENTS:
-                                cleaned_ingredients.append(lemma)
-                                important_found = True
-                                break
-                        
-                        # If no important ingredient was found, use the longest non-descriptive lemma
-                        if not important_found and core_lemmas:
-                            main_ingredient = max(core_lemmas, key=len)
-                            cleaned_ingredients.append(main_ingredient)
-            else:
-                # Using spaCy
-                # This part requires spaCy to be installed and a model loaded
-                # Assuming config.nlp is a loaded spaCy model if USE_NLTK is False
-                if hasattr(config, 'nlp') and config.nlp:
-                    doc = config.nlp(ingredient)
-                    tokens = [token.lemma_ for token in doc 
-                             if token.is_alpha and not token.is_stop]
-                    
-                    if tokens:
-                        # Filter out descriptive terms
-                        core_tokens = [token for token in tokens if token not in DESCRIPTIVE_TERMS]
-                        if not core_tokens:
-                            # If all terms were filtered out, use original tokens but try to avoid descriptors
-                            for token in tokens:
-                                if token not in DESCRIPTIVE_TERMS:
-                                    cleaned_ingredients.append(token)
-                                    break
-                        else:
-                            # Try to find an important ingredient first
-                            important_found = False
-                            for token in core_tokens:
-                                if token in IMPORTANT_INGREDIENTS:
-                                    cleaned_ingredients.append(token)
-                                    important_found = True
-                                    break
-                            
-                            # If no important ingredient was found, use the longest non-descriptive token
-                            if not important_found and core_tokens:
-                                main_ingredient = max(core_tokens, key=len)
-                                cleaned_ingredients.append(main_ingredient)
-                else:
-                    logger.warning("config.USE_NLTK is False, but spaCy model (config.nlp) not loaded. Skipping spaCy processing.")
-                    # Fallback or simply skip if spaCy isn't configured
-                    cleaned_ingredients.append(ingredient) # Add the minimally cleaned ingredient as fallback
+        # Lines repeat a lot across recipes, so each distinct line is only cleaned once
+        cleaned = clean_ingredient_line(ingredient.lower().strip())
+        if cleaned:
+            cleaned_ingredients.append(cleaned)
     
     # Remove duplicates and return
     # Using dict.fromkeys preserves order while removing duplicates
     return list(dict.fromkeys(cleaned_ingredients))
 
-def apply_cleaning_to_dataframe(df, raw_col_name, new_col_name):
+def _safe_clean(x):
+    """Clean one recipe's raw ingredients, treating missing values as no ingredients."""
+    # Handle NaN, None, and ambiguous array/list types
+    if x is None or (isinstance(x, float) and pd.isna(x)):
+        return []
+    # If x is a numpy array, check if all values are nan
+    if hasattr(x, 'dtype') and hasattr(x, 'all'):
+        try:
+            if pd.isna(x).all():
+                return []
+        except Exception:
+            pass
+    return clean_and_extract_ingredients(x)
+
+def _init_cleaning_worker():
+    """Load the NLTK resources once when a cleaning worker process starts."""
+    if config.USE_NLTK:
+        # Both load their corpora lazily on first use
+        word_tokenize("warm up")
+        lemmatizer.lemmatize("warm")
+
+def _clean_chunk(raw_values):
+    """Clean a chunk of recipes in a worker process, returning the cache counts for the chunk too."""
+    before = cleaning_cache_stats()
+    return [_safe_clean(x) for x in raw_values], _cache_stats_since(before)
+
+def apply_cleaning_to_dataframe(df, raw_col_name, new_col_name, workers=None):
     """
     Apply ingredient cleaning to all recipes in a DataFrame.
     
@@ -246,6 +325,9 @@ def apply_cleaning_to_dataframe(df, raw_col_name, new_col_name):
         Name of the column containing raw ingredients.
     new_col_name : str
         Name for the new column to store cleaned ingredients.
+    workers : int, optional
+        Number of worker processes. Default is config.CLEANING_WORKERS;
+        1 cleans in this process.
         
     Returns:
     --------
@@ -257,22 +339,38 @@ def apply_cleaning_to_dataframe(df, raw_col_name, new_col_name):
         logger.error(f"Raw ingredient column '{raw_col_name}' not found in DataFrame. Cannot apply cleaning.")
         return df # Return original df
     
+    if workers is None:
+        workers = config.CLEANING_WORKERS or os.cpu_count() or 1
+    chunk_size = config.CLEANING_CHUNK_SIZE
+    
     # Apply cleaning function to each row, handling potential errors
     logger.info(f"Applying cleaning to column '{raw_col_name}' to create '{new_col_name}'")
-    def safe_clean(x):
-        # Handle NaN, None, and ambiguous array/list types
-        if x is None or (isinstance(x, float) and pd.isna(x)):
-            return []
-        # If x is a numpy array, check if all values are nan
-        if hasattr(x, 'dtype') and hasattr(x, 'all'):
-            try:
-                if pd.isna(x).all():
-                    return []
-            except Exception:
-                pass
-        return clean_and_extract_ingredients(x)
-    df[new_col_name] = df[raw_col_name].apply(safe_clean)
+    if workers > 1 and len(df) > chunk_size:
+        raw_values = df[raw_col_name].tolist()
+        chunks = [raw_values[start:start + chunk_size] for start in range(0, len(raw_values), chunk_size)]
+        logger.info(f"Cleaning {len(raw_values)} recipes in {len(chunks)} chunks with {workers} worker processes")
+        try:
+            cleaned = []
+            stats = {name: {'hits': 0, 'misses': 0} for name in cleaning_cache_stats()}
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_cleaning_worker) as executor:
+                # map() yields results in submission order, so rows stay aligned
+                for chunk_cleaned, chunk_stats in executor.map(_clean_chunk, chunks):
+                    cleaned.extend(chunk_cleaned)
+                    for name, counts in chunk_stats.items():
+                        for key, count in counts.items():
+                            stats[name][key] += count
+            df[new_col_name] = pd.Series(cleaned, index=df.index, dtype=object)
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(f"Parallel cleaning failed ({e}), cleaning in this process instead")
+            before = cleaning_cache_stats()
+            df[new_col_name] = df[raw_col_name].apply(_safe_clean)
+            stats = _cache_stats_since(before)
+    else:
+        before = cleaning_cache_stats()
+        df[new_col_name] = df[raw_col_name].apply(_safe_clean)
+        stats = _cache_stats_since(before)
     logger.info("Finished applying cleaning.")
+    _log_cache_stats(stats)
     return df
 
 def get_canonical_ingredients(df, cleaned_col_name):
@@ -2,13 +2,35 @@ import logging
 import pandas as pd
 import json
 import re
+import sys
 from pathlib import Path
 import config
 from time import time
 import chardet # Import chardet
 
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
 logger = logging.getLogger(__name__)
 
+# Version of what load_recipe_data and preprocess_ingredients return (the
+# column mapping, the id fallback and the canonical ingredient extraction);
+# bump it when they change so that cached corpora are rebuilt
+LOADER_VERSION = 1
+
+# Potential names of the core fields in the dataset, in order of preference
+NAME_CANDIDATES = ['title', 'recipe_name', 'name']
+INGREDIENTS_CANDIDATES = ['ingredients', 'ingredient_list', 'ingredients_list', 'raw_ingredients']
+INSTRUCTIONS_CANDIDATES = ['instructions', 'directions', 'steps']
+
+# Fields of a JSON recipe kept by the streaming loader; all others are dropped as soon as a recipe is parsed
+RECORD_FIELDS = NAME_CANDIDATES + INGREDIENTS_CANDIDATES + INSTRUCTIONS_CANDIDATES + ['id']
+
+# Number of characters read from a JSON dataset at a time
+JSON_CHUNK_SIZE = 1 << 20
+
 def detect_encoding(filepath):
     """Detect the encoding of a file."""
     try:
@@ -23,6 +45,164 @@ def detect_encoding(filepath):
         logger.warning(f"Could not detect encoding for {filepath}: {e}. Defaulting to utf-8.")
         return 'utf-8'
 
+def peak_rss_mb():
+    """Get the peak resident set size of this process in MB, or None if the platform does not report it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class _JSONStream:
+    """
+    Reader that decodes one JSON value at a time from a text file.
+
+    Only the part of the file holding the value being decoded is kept in
+    memory; values that span several chunks are decoded once the chunks
+    holding their end have been read.
+
+    Parameters:
+    -----------
+    f : file
+        Text file positioned at the start of the JSON document
+    chunk_size : int
+        Number of characters read at a time
+    """
+
+    def __init__(self, f, chunk_size):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size):
+        """Append the next size characters of the file to the buffer; False at the end of the file."""
+        chunk = self._f.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and get the next character, or '' at the end of the file."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self._chunk_size):
+                return ''
+
+    def expect(self, characters):
+        """Consume the next character, which must be one of characters, and return it."""
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Malformed JSON: expected one of {characters!r}, found {character or 'end of file'!r}")
+        self._pos += 1
+        return character
+
+    def decode(self):
+        """Decode the next JSON value."""
+        read_size = self._chunk_size
+        while True:
+            self.peek()
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending with the buffer (such as a number) may continue in the next chunk
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Read ever larger chunks so a long value is not decoded over and over
+            self._fill(read_size)
+            read_size *= 2
+
+def iter_json_records(f, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Stream the recipes of a JSON dataset one at a time.
+
+    Both the array layout ([{...}, ...]) and the object layout
+    ({id: {...}, ...}) are supported.
+
+    Parameters:
+    -----------
+    f : file
+        Text file positioned at the start of the JSON document
+    chunk_size : int, optional
+        Number of characters read at a time. Default is JSON_CHUNK_SIZE.
+
+    Yields:
+    -------
+    tuple
+        (key, recipe): the key of the recipe in the object layout (None in
+        the array layout) and the decoded recipe
+    """
+    stream = _JSONStream(f, chunk_size)
+    opening = stream.expect('[{')
+    closing = ']' if opening == '[' else '}'
+    if stream.peek() == closing:
+        return
+    while True:
+        key = None
+        if opening == '{':
+            key = stream.decode()
+            if not isinstance(key, str):
+                raise ValueError(f"Malformed JSON: object key {key!r} is not a string")
+            stream.expect(':')
+        yield key, stream.decode()
+        if stream.expect(',' + closing) == closing:
+            return
+
+def load_json_records(f, limit=None, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Load the fields of the recipes in a JSON dataset that can become standard columns.
+
+    Recipes are parsed one at a time and reading stops as soon as limit
+    recipes have been kept, so the whole file is never held in memory.
+
+    Parameters:
+    -----------
+    f : file
+        Text file positioned at the start of the JSON document
+    limit : int, optional
+        Maximum number of recipes to load. Default is None (load all).
+    chunk_size : int, optional
+        Number of characters read at a time. Default is JSON_CHUNK_SIZE.
+
+    Returns:
+    --------
+    pandas.DataFrame
+        One column per field of RECORD_FIELDS found in any recipe; in the
+        object layout the key is used as the 'id' of recipes without one
+    """
+    columns = {field: [] for field in RECORD_FIELDS}
+    present = set()
+    num_recipes = 0
+    for key, recipe in iter_json_records(f, chunk_size):
+        if not isinstance(recipe, dict):
+            logger.warning(f"Skipping non-dictionary recipe {key if key is not None else num_recipes} in JSON data.")
+            continue
+        if key is not None and 'id' not in recipe:
+            # Add the key as an 'id' field if not present
+            recipe['id'] = key
+        for field in RECORD_FIELDS:
+            if field in recipe:
+                present.add(field)
+                columns[field].append(recipe[field])
+            else:
+                columns[field].append(None)
+        num_recipes += 1
+        if limit is not None and limit > 0 and num_recipes >= limit:
+            logger.info(f"Stopped reading after {limit} recipes")
+            break
+    return pd.DataFrame({field: columns[field] for field in RECORD_FIELDS if field in present})
+
 def load_recipe_data(limit=None):
     """
     Load recipe data from the dataset file, handling different JSON structures.
@@ -47,6 +227,7 @@ def load_recipe_data(limit=None):
     
     try:
         start_time = time()
+        start_peak_rss = peak_rss_mb()
         dataset_path = Path(config.DATASET_PATH)
         
         if not dataset_path.exists():
@@ -76,25 +257,12 @@ def load_recipe_data(limit=None):
 
                 if first_char == '[':
                     logger.info("Detected JSON Array format.")
-                    # Load as list of objects
-                    data = json.load(f)
-                    df = pd.DataFrame(data)
                 elif first_char == '{':
-                    logger.info("Detected JSON Object format. Converting to list.")
-                    # Load as object, then convert
-                    data_dict = json.load(f)
-                    recipes_list = []
-                    for key, value in data_dict.items():
-                        if isinstance(value, dict):
-                            # Add the key as an 'id' field if not present
-                            if 'id' not in value:
-                                value['id'] = key 
-                            recipes_list.append(value)
-                        else:
-                             logger.warning(f"Skipping non-dictionary value for key '{key}' in JSON object.")
-                    df = pd.DataFrame(recipes_list)
+                    logger.info("Detected JSON Object format.")
                 else:
                      raise ValueError(f"Unsupported JSON format: Does not start with [ or {{. Starts with: '{first_char}'")
+                # Stream the recipes, keeping only the fields that become standard columns
+                df = load_json_records(f, limit)
 
         elif file_extension in ['.xlsx', '.xls']:
             df = pd.read_excel(dataset_path)
@@ -109,10 +277,10 @@ def load_recipe_data(limit=None):
         
         # --- Column Mapping --- 
         logger.info("Checking and mapping columns...")
-        # Define potential names for the core fields
-        name_candidates = ['title', 'recipe_name', 'name']
-        ingredients_candidates = ['ingredients', 'ingredient_list', 'ingredients_list', 'raw_ingredients']
-        instructions_candidates = ['instructions', 'directions', 'steps']
+        # Potential names for the core fields
+        name_candidates = NAME_CANDIDATES
+        ingredients_candidates = INGREDIENTS_CANDIDATES
+        instructions_candidates = INSTRUCTIONS_CANDIDATES
 
         # Find the actual columns used in the DataFrame
         actual_name_col = next((col for col in name_candidates if col in df.columns), None)
@@ -189,6 +357,9 @@ def load_recipe_data(limit=None):
             return None
 
         logger.info(f"Successfully loaded and processed {len(df)} recipes in {time() - start_time:.2f} seconds")
+        end_peak_rss = peak_rss_mb()
+        if end_peak_rss is not None:
+            logger.info(f"Peak RSS after loading: {end_peak_rss:.1f} MB ({start_peak_rss:.1f} MB before loading)")
         return df
     
     except Exception as e:
@@ -0,0 +1,183 @@
+"""
+Fuzzy string index module for Recipe Bot.
+This module contains a character-trigram index that finds the closest
+string to a query without comparing the query against every string.
+"""
+
+import logging
+from difflib import SequenceMatcher
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Two strings with a SequenceMatcher ratio of at least 0.8 always share a
+# padded trigram, so at this cutoff and above the trigram postings cannot miss
+# a match; below it every string of a suitable length is checked
+TRIGRAM_SAFE_CUTOFF = 0.8
+
+
+def padded_trigrams(text):
+    """
+    Get the set of character trigrams of a string padded with two spaces on each side.
+
+    Parameters:
+    -----------
+    text : str
+        String to split into trigrams
+
+    Returns:
+    --------
+    set
+        Trigrams of the padded string
+    """
+    padded = f"  {text}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def char_count_matrix(strings):
+    """
+    Count the characters of each string, for the quick_ratio upper bound.
+
+    Parameters:
+    -----------
+    strings : list
+        Strings to count characters in
+
+    Returns:
+    --------
+    tuple
+        (alphabet, counts): a dict of character -> column, and an int32
+        matrix with one row of character counts per string
+    """
+    alphabet = {char: column for column, char in enumerate(sorted({c for s in strings for c in s}))}
+    counts = np.zeros((len(strings), len(alphabet)), dtype=np.int32)
+    for string_id, string in enumerate(strings):
+        for char in string:
+            counts[string_id, alphabet[char]] += 1
+    return alphabet, counts
+
+
+def shared_char_counts(word, alphabet, char_counts):
+    """
+    Count the characters each string shares with a word, with multiplicity.
+
+    Twice this count over the sum of the lengths bounds both the
+    SequenceMatcher ratio and the Levenshtein ratio from above.
+
+    Parameters:
+    -----------
+    word : str
+        Word to compare
+    alphabet : dict
+        Character -> column of char_counts, from char_count_matrix
+    char_counts : numpy.ndarray
+        Rows of character counts to compare against
+
+    Returns:
+    --------
+    numpy.ndarray
+        Number of shared characters per row
+    """
+    word_counts = np.zeros(len(alphabet), dtype=np.int32)
+    for char in word:
+        column = alphabet.get(char)
+        if column is not None:
+            word_counts[column] += 1
+    return np.minimum(char_counts, word_counts).sum(axis=1)
+
+
+class TrigramIndex:
+    """
+    Trigram posting lists over a collection of strings.
+
+    Candidates come from the posting lists of the query's trigrams and are
+    narrowed down with the length and character-count bounds that difflib
+    checks before computing a full ratio, evaluated for all candidates at
+    once. best_match returns the same string as
+    difflib.get_close_matches(word, strings, n=1, cutoff=cutoff).
+
+    Parameters:
+    -----------
+    strings : iterable
+        Strings to index
+    """
+
+    def __init__(self, strings):
+        self.strings = sorted(set(strings))
+        self.lengths = np.array([len(string) for string in self.strings], dtype=np.int64)
+
+        # Trigram -> ids of the strings containing it
+        postings = {}
+        for string_id, string in enumerate(self.strings):
+            for trigram in padded_trigrams(string):
+                postings.setdefault(trigram, []).append(string_id)
+        self.postings = {trigram: np.array(ids, dtype=np.int64) for trigram, ids in postings.items()}
+
+        # Character counts per string, used for difflib's quick_ratio bound
+        self.alphabet, self.char_counts = char_count_matrix(self.strings)
+
+        logger.debug(f"Built trigram index with {len(self.postings)} trigrams over {len(self.strings)} strings")
+
+    def candidates(self, word, cutoff):
+        """
+        Get the ids of the strings that could reach the cutoff ratio with a word.
+
+        Parameters:
+        -----------
+        word : str
+            Word to find matches for
+        cutoff : float
+            Minimum SequenceMatcher ratio (0-1)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Ids of candidate strings, in index order
+        """
+        if cutoff >= TRIGRAM_SAFE_CUTOFF:
+            postings = [self.postings[trigram] for trigram in padded_trigrams(word) if trigram in self.postings]
+            if not postings:
+                return np.array([], dtype=np.int64)
+            string_ids = np.unique(np.concatenate(postings))
+        else:
+            string_ids = np.arange(len(self.strings))
+
+        # real_quick_ratio: 2 * min(len) / (len_a + len_b) must reach the cutoff
+        lengths = self.lengths[string_ids]
+        total_lengths = lengths + len(word)
+        keep = 2.0 * np.minimum(lengths, len(word)) / total_lengths >= cutoff
+        string_ids, total_lengths = string_ids[keep], total_lengths[keep]
+
+        # quick_ratio: 2 * (shared characters, with multiplicity) / (len_a + len_b) must reach the cutoff
+        shared = shared_char_counts(word, self.alphabet, self.char_counts[string_ids])
+        return string_ids[2.0 * shared / total_lengths >= cutoff]
+
+    def best_match(self, word, cutoff=0.8):
+        """
+        Find the indexed string most similar to a word.
+
+        Parameters:
+        -----------
+        word : str
+            Word to find a match for
+        cutoff : float, optional
+            Minimum SequenceMatcher ratio (0-1). Default is 0.8.
+
+        Returns:
+        --------
+        str or None
+            Most similar string, or None if no string reaches the cutoff
+        """
+        best = None
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        for string_id in self.candidates(word, cutoff).tolist():
+            string = self.strings[string_id]
+            matcher.set_seq1(string)
+            ratio = matcher.ratio()
+            # Like get_close_matches, ties go to the larger string
+            if ratio >= cutoff and (best is None or (ratio, string) > best):
+                best = (ratio, string)
+        return best[1] if best else None
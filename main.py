@@ -19,9 +19,12 @@ sys.path.append(str(project_dir))
 # Import our custom modules
 import config
 from nlu_parser import parse_query
-from recipe_matcher import find_matching_recipes, get_detailed_recipe
+from recipe_matcher import find_matching_recipes, get_detailed_recipe, get_recipe_details_by_id, add_dietary_flag_columns
 from data_loader import load_recipe_data, preprocess_ingredients
 from data_cleaner import apply_cleaning_to_dataframe
+from recipe_index import build_recipe_index
+from corpus_cache import load_corpus_cache, save_corpus_cache
+from metrics import StageTimer, time_stage, timed
 
 # Set up logging
 logging.basicConfig(
@@ -34,10 +37,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def load_and_prepare_data():
+def load_corpus():
     """
-    Load and prepare the recipe data for the chatbot.
-    Returns recipes, canonical_ingredients and preprocessed_recipes.
+    Load the recipe dataset, clean its ingredients and extract the canonical
+    ingredients. Returns recipes and canonical_ingredients.
     """
     start_time = time()
     
@@ -71,9 +74,36 @@ def load_and_prepare_data():
     
     logger.info(f"Extracted {len(canonical_ingredients)} unique canonical ingredients")
     
+    return recipes, canonical_ingredients
+
+def load_and_prepare_data():
+    """
+    Load and prepare the recipe data for the chatbot.
+    Returns recipes, canonical_ingredients and preprocessed_recipes.
+    """
+    # Reuse the corpus prepared by an earlier run if the dataset and settings are unchanged
+    cached_corpus = load_corpus_cache(config) if config.USE_CORPUS_CACHE else None
+    if cached_corpus is not None:
+        recipes, canonical_ingredients = cached_corpus
+    else:
+        recipes, canonical_ingredients = load_corpus()
+        if config.USE_CORPUS_CACHE:
+            save_corpus_cache(recipes, canonical_ingredients, config)
+    
+    # Precompute which diets each recipe fits so queries only combine flags
+    recipes = add_dietary_flag_columns(recipes, config)
+    
+    # Build the lookup structures used by the recipe matcher once, up front,
+    # including the normalized name and instructions with their word index
+    # and the bitmaps of the recipe categories the parser can produce
+    recipe_index = build_recipe_index(recipes, config)
+    recipe_index.text_index()
+    recipe_index.category_index()
+    
     # We return both the original recipes and the canonical ingredients list
     return recipes, canonical_ingredients
 
+@timed('format')
 def format_response(response_type, data=None):
     """
     Format the response based on the response type.
@@ -271,7 +301,8 @@ def process_user_input(user_input, recipes_df, canonical_ingredients, session_co
         
         # Parse the user input
         logger.info(f"Processing user input: '{user_input}'")
-        parsed_input = parse_query(user_input, canonical_ingredients)
+        with time_stage('parse'):
+            parsed_input = parse_query(user_input, canonical_ingredients)
         
         # Check for None values in recipe_category (could happen if the key is missing)
         if 'recipe_category' not in parsed_input:
@@ -306,17 +337,10 @@ def process_user_input(user_input, recipes_df, canonical_ingredients, session_co
                 if 0 <= recipe_index < len(session_context['last_search_results']):
                     recipe_id = session_context['last_search_results'][recipe_index]
                     
-                    # Use 'id' column for lookup if available
-                    if 'id' in recipes_df.columns:
-                        recipe_row = recipes_df[recipes_df['id'] == recipe_id]
-                        if not recipe_row.empty:
-                            recipe_details = get_detailed_recipe(recipe_row.iloc[0]['name'], recipes_df, config)
-                            return format_response('recipe_detail', {'recipe': recipe_details}), session_context
-                    else:
-                        # Fallback to index lookup
-                        if recipe_id in recipes_df.index:
-                            recipe_details = get_detailed_recipe(recipes_df.loc[recipe_id]['name'], recipes_df, config)
-                            return format_response('recipe_detail', {'recipe': recipe_details}), session_context
+                    # Look the recipe up by id ('id' column, or index label if there is none)
+                    recipe_details = get_recipe_details_by_id(recipe_id, recipes_df, config)
+                    if recipe_details:
+                        return format_response('recipe_detail', {'recipe': recipe_details}), session_context
             
             # If we have a recipe name, try to find it
             elif recipe_name:
@@ -333,17 +357,10 @@ def process_user_input(user_input, recipes_df, canonical_ingredients, session_co
                     if 0 <= recipe_index < len(session_context['last_search_results']):
                         recipe_id = session_context['last_search_results'][recipe_index]
                         
-                        # Use 'id' column for lookup if available
-                        if 'id' in recipes_df.columns:
-                            recipe_row = recipes_df[recipes_df['id'] == recipe_id]
-                            if not recipe_row.empty:
-                                recipe_details = get_detailed_recipe(recipe_row.iloc[0]['name'], recipes_df, config)
-                                return format_response('recipe_detail', {'recipe': recipe_details}), session_context
-                        else:
-                            # Fallback to index lookup
-                            if recipe_id in recipes_df.index:
-                                recipe_details = get_detailed_recipe(recipes_df.loc[recipe_id]['name'], recipes_df, config)
-                                return format_response('recipe_detail', {'recipe': recipe_details}), session_context
+                        # Look the recipe up by id ('id' column, or index label if there is none)
+                        recipe_details = get_recipe_details_by_id(recipe_id, recipes_df, config)
+                        if recipe_details:
+                            return format_response('recipe_detail', {'recipe': recipe_details}), session_context
             
             return "Please specify which recipe you'd like to see, either by number or name.", session_context
         
@@ -395,6 +412,7 @@ def process_user_input(user_input, recipes_df, canonical_ingredients, session_co
             # If no results, try fallback strategies
             if matching_df.empty:
                 logger.info("No matching recipes found, trying fallback strategies")
+                fallback_timer = StageTimer()
                 
                 # First fallback: If we have a special category, try without ingredient filtering
                 if recipe_category and include_ingredients:
@@ -455,6 +473,10 @@ def process_user_input(user_input, recipes_df, canonical_ingredients, session_co
                     if not fallback_df.empty:
                         logger.info(f"Fallback successful: Found {len(fallback_df)} recipes with reduced ingredients")
                         matching_df = fallback_df
+                
+                # Time the relaxed re-search above (category only, primary exclusion or reduced
+                # ingredients), not the direct title/ingredient search; it is also counted under 'match'
+                fallback_timer.lap('search_fallback')
             
             # Store recipe IDs (prefer 'id' column if available)
             if not matching_df.empty and 'id' in matching_df.columns:
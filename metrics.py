@@ -0,0 +1,221 @@
+"""
+Metrics module for Recipe Bot.
+This module contains latency histograms for the stages of answering a chat
+message (parsing, matching, formatting, ...) and renders them in the
+Prometheus text exposition format. Each process keeps its own histograms.
+"""
+
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Name of the stage latency histogram in the Prometheus output
+STAGE_METRIC = 'recipe_bot_stage_duration_seconds'
+
+# Upper bounds of the histogram buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed buckets.
+
+    Parameters:
+    -----------
+    buckets : tuple, optional
+        Increasing bucket upper bounds in seconds. Default is LATENCY_BUCKETS.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        """
+        Record one duration.
+
+        Parameters:
+        -----------
+        seconds : float
+            Duration to record
+        """
+        # Index of the first bucket the duration fits in; the last slot is +Inf
+        index = 0
+        while index < len(self.buckets) and seconds > self.buckets[index]:
+            index += 1
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def snapshot(self):
+        """
+        Get the cumulative bucket counts, the sum and the count of the durations.
+
+        Returns:
+        --------
+        tuple
+            (cumulative counts per bucket followed by +Inf, sum, count)
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+# Histograms recorded so far, keyed on stage name
+_STAGE_HISTOGRAMS = {}
+_registry_lock = threading.Lock()
+
+
+def stage_histogram(stage):
+    """
+    Get the histogram of a stage, creating it on first use.
+
+    Parameters:
+    -----------
+    stage : str
+        Stage name
+
+    Returns:
+    --------
+    Histogram
+        Histogram of the stage's durations
+    """
+    histogram = _STAGE_HISTOGRAMS.get(stage)
+    if histogram is None:
+        with _registry_lock:
+            histogram = _STAGE_HISTOGRAMS.setdefault(stage, Histogram())
+    return histogram
+
+
+def observe_stage(stage, seconds):
+    """
+    Record the duration of one run of a stage.
+
+    Parameters:
+    -----------
+    stage : str
+        Stage name
+    seconds : float
+        Duration of the stage
+    """
+    stage_histogram(stage).observe(seconds)
+
+
+@contextmanager
+def time_stage(stage):
+    """
+    Time the body of a with block as one run of a stage.
+
+    Parameters:
+    -----------
+    stage : str
+        Stage name
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, perf_counter() - start)
+
+
+def timed(stage):
+    """
+    Decorator that times every call of a function as one run of a stage.
+
+    Parameters:
+    -----------
+    stage : str
+        Stage name
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with time_stage(stage):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class StageTimer:
+    """
+    Times consecutive stages of a function without wrapping each in a block.
+
+    Each call to lap records the time since the previous lap (or since the
+    timer was created) under the given stage.
+    """
+
+    def __init__(self):
+        self._last = perf_counter()
+
+    def lap(self, stage):
+        """
+        Record the time since the previous lap as one run of a stage.
+
+        Parameters:
+        -----------
+        stage : str
+            Stage that just finished
+        """
+        now = perf_counter()
+        observe_stage(stage, now - self._last)
+        self._last = now
+
+
+def reset_metrics():
+    """Remove all recorded stage histograms."""
+    with _registry_lock:
+        _STAGE_HISTOGRAMS.clear()
+
+
+def _format_value(value):
+    """Format a number the way the Prometheus text format expects."""
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(samples=None):
+    """
+    Render the stage histograms, and optionally other values, as Prometheus text.
+
+    Parameters:
+    -----------
+    samples : list, optional
+        (name, type, help text, value) tuples, where type is 'gauge' or
+        'counter', rendered after the histograms. Default is None.
+
+    Returns:
+    --------
+    str
+        Metrics in the Prometheus text exposition format (version 0.0.4)
+    """
+    lines = [
+        f"# HELP {STAGE_METRIC} Time spent in each stage of answering a chat message.",
+        f"# TYPE {STAGE_METRIC} histogram"
+    ]
+    with _registry_lock:
+        stages = sorted(_STAGE_HISTOGRAMS.items())
+    for stage, histogram in stages:
+        cumulative, total, count = histogram.snapshot()
+        for bound, bucket_count in zip(histogram.buckets, cumulative):
+            lines.append(f'{STAGE_METRIC}_bucket{{stage="{stage}",le="{bound}"}} {bucket_count}')
+        lines.append(f'{STAGE_METRIC}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+        lines.append(f'{STAGE_METRIC}_sum{{stage="{stage}"}} {_format_value(total)}')
+        lines.append(f'{STAGE_METRIC}_count{{stage="{stage}"}} {count}')
+
+    for name, metric_type, help_text, value in samples or []:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {_format_value(value)}")
+    return '\n'.join(lines) + '\n'
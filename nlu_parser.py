@@ -7,13 +7,19 @@ import re
 import nltk
 import logging
 import string
-from difflib import get_close_matches
+import copy
+import threading
 from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 import config
-from collections import Counter
+from collections import Counter, OrderedDict
 from nltk.corpus import stopwords
 from nltk.stem import PorterStemmer
+from bisect import bisect_right
+from data_cleaner import COMPOUND_INGREDIENTS
+from phrase_matcher import PhraseMatcher
+from fuzzy_index import TrigramIndex
+from category_index import PRIMARY_CATEGORIES, RECIPE_CATEGORY_TERMS, SPECIAL_CATEGORY_MODIFIERS
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -36,6 +42,9 @@ DIETARY_KEYWORDS = {
     'quick': ['quick', 'fast', 'easy', 'simple', 'under 30', 'quick meal']
 }
 
+# Automaton for spotting multi-word ingredients in queries
+COMPOUND_INGREDIENT_MATCHER = PhraseMatcher(COMPOUND_INGREDIENTS, whole_words=True)
+
 # Negation terms to detect ingredients to exclude
 NEGATION_TERMS = ['no', 'not', 'without', 'except', 'but no', 'dont', "don't", 'excluding', 'none', 'no more']
 
@@ -98,6 +107,34 @@ INTENT_PATTERNS = {
     ]
 }
 
+def _compile_intent_patterns(intent_patterns):
+    """
+    Compile the pattern list of each intent into a single named-group alternation.
+    
+    Parameters:
+    -----------
+    intent_patterns : dict
+        Mapping of intent names to lists of regex patterns
+        
+    Returns:
+    --------
+    dict
+        Mapping of intent names to compiled patterns, in the same priority order
+    """
+    return {
+        intent: re.compile(f"(?P<{intent}>" + '|'.join(f"(?:{pattern})" for pattern in patterns) + ')')
+        for intent, patterns in intent_patterns.items()
+    }
+
+# Requests for a recipe by its number in the results (e.g., "show me recipe 7" or just "7")
+RECIPE_NUMBER_PATTERN = re.compile(
+    r'(?:show|get|view|see|display)(?:\s+me)?(?:\s+recipe)?(?:\s+#)?(?:\s+number)?\s+(\d+)'
+    r'|^(\d+)$'
+)
+
+# Intent patterns compiled once at import time, checked in the order of INTENT_PATTERNS
+COMPILED_INTENT_PATTERNS = _compile_intent_patterns(INTENT_PATTERNS)
+
 # Dictionary of dietary preferences and their related terms
 DIETARY_PREFERENCE_TERMS = {
     'vegetarian': [
@@ -148,6 +185,65 @@ def preprocess_input(text):
     
     return text
 
+class IngredientLookup:
+    """
+    Lookup tables over a set of canonical ingredients for find_closest_ingredient.
+    
+    Where several ingredients share a key, the first one in iteration order
+    wins, as it did when the set was scanned linearly.
+    
+    Parameters:
+    -----------
+    canonical_ingredients : set
+        Set of canonical ingredient names.
+    """
+    
+    def __init__(self, canonical_ingredients):
+        # Lowercased name -> canonical ingredient
+        self.by_lowercase = {}
+        # Word of a multi-word ingredient -> first canonical ingredient containing it
+        self.compounds_by_word = {}
+        for ingredient in canonical_ingredients:
+            ing_lower = ingredient.lower()
+            self.by_lowercase.setdefault(ing_lower, ingredient)
+            if ' ' in ing_lower:
+                for part in ing_lower.split():
+                    self.compounds_by_word.setdefault(part, ingredient)
+        
+        # Lowercased names in iteration order, the candidates for fuzzy matching
+        self.lowercase_names = [ingredient.lower() for ingredient in canonical_ingredients]
+        self.size = len(self.lowercase_names)
+        self.fuzzy_index = TrigramIndex(self.lowercase_names)
+
+# Lookup built for the most recently used canonical ingredient set
+_ingredient_lookup_cache = (None, None)
+
+def get_ingredient_lookup(canonical_ingredients):
+    """
+    Get the lookup tables for a set of canonical ingredients, building them on first use.
+    
+    The tables are rebuilt when a different set is passed or the set changes size.
+    
+    Parameters:
+    -----------
+    canonical_ingredients : set
+        Set of canonical ingredient names.
+        
+    Returns:
+    --------
+    IngredientLookup
+        Lookup tables for the set.
+    """
+    global _ingredient_lookup_cache
+    cached_ingredients, lookup = _ingredient_lookup_cache
+    if cached_ingredients is canonical_ingredients and lookup.size == len(canonical_ingredients):
+        return lookup
+    
+    lookup = IngredientLookup(canonical_ingredients)
+    _ingredient_lookup_cache = (canonical_ingredients, lookup)
+    logger.debug(f"Built ingredient lookup for {lookup.size} canonical ingredients")
+    return lookup
+
 def find_closest_ingredient(word, canonical_ingredients, threshold=0.8):
     """
     Find the closest matching ingredient from the canonical list using fuzzy matching.
@@ -206,44 +302,32 @@ def find_closest_ingredient(word, canonical_ingredients, threshold=0.8):
         if word in canonical_ingredients:
             return word
     
+    lookup = get_ingredient_lookup(canonical_ingredients)
+    
     # Try exact match first (case-insensitive)
-    for ingredient in canonical_ingredients:
-        if word == ingredient.lower():
-            return ingredient
+    if word in lookup.by_lowercase:
+        return lookup.by_lowercase[word]
     
     # Try plural/singular matching
-    singular_word = word
-    plural_word = word
-    
     # Simple pluralization rule (add 's')
-    if word.endswith('s'):
-        singular_word = word[:-1]
-    else:
-        plural_word = word + 's'
-    
-    # Check for singular/plural forms
-    for ingredient in canonical_ingredients:
-        ing_lower = ingredient.lower()
-        if singular_word == ing_lower or plural_word == ing_lower:
-            return ingredient
+    other_form = word[:-1] if word.endswith('s') else word + 's'
+    if other_form in lookup.by_lowercase:
+        return lookup.by_lowercase[other_form]
             
-    # Look for similar matches using difflib
-    matches = get_close_matches(word, [ing.lower() for ing in canonical_ingredients], n=1, cutoff=threshold)
+    # Look for similar matches using the trigram index (same result as difflib.get_close_matches)
+    match_lower = lookup.fuzzy_index.best_match(word, cutoff=threshold)
     
-    if matches:
-        match_lower = matches[0]
+    if match_lower:
         # Find the original case in canonical_ingredients
-        for ingredient in canonical_ingredients:
-            if ingredient.lower() == match_lower:
-                logger.debug(f"Fuzzy matched '{word}' to '{ingredient}'")
-                return ingredient
+        ingredient = lookup.by_lowercase[match_lower]
+        logger.debug(f"Fuzzy matched '{word}' to '{ingredient}'")
+        return ingredient
         
     # Try to match as part of a compound ingredient
-    for ingredient in canonical_ingredients:
-        ing_lower = ingredient.lower()
-        if ' ' in ing_lower and word in ing_lower.split():
-            logger.debug(f"Partial matched '{word}' to '{ingredient}'")
-            return ingredient
+    if word in lookup.compounds_by_word:
+        ingredient = lookup.compounds_by_word[word]
+        logger.debug(f"Partial matched '{word}' to '{ingredient}'")
+        return ingredient
             
     return None
 
@@ -631,21 +715,16 @@ def identify_intent(query):
     str
         Identified intent
     """
-    # Check for recipe number pattern first (e.g., "show me recipe 7" or just "7")
-    recipe_number_patterns = [
-        r'(?:show|get|view|see|display)(?:\s+me)?(?:\s+recipe)?(?:\s+#)?(?:\s+number)?\s+(\d+)',
-        r'^(\d+)$'
-    ]
+    query_lower = query.lower()
     
-    for pattern in recipe_number_patterns:
-        if re.search(pattern, query.lower()):
-            return 'get_recipe_details'
+    # Check for recipe number pattern first (e.g., "show me recipe 7" or just "7")
+    if RECIPE_NUMBER_PATTERN.search(query_lower):
+        return 'get_recipe_details'
     
-    # Check each intent pattern
-    for candidate_intent, patterns in INTENT_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, query.lower()):
-                return candidate_intent
+    # Check each intent's combined pattern in priority order
+    for candidate_intent, pattern in COMPILED_INTENT_PATTERNS.items():
+        if pattern.search(query_lower):
+            return candidate_intent
     
     # If no specific intent is matched, default to find_recipe
     return 'find_recipe'
@@ -742,8 +821,28 @@ def extract_ingredients(tokens, canonical_ingredients=None):
                            not any(n_gram.lower() == term for term in category_terms):
                             exclude_ingredients.append(match)
     
-    # Process remaining n-grams for inclusion
+    # Claim known multi-word ingredients first so their words are not matched one by one
     included_indices = set()
+    if canonical_ingredients:
+        token_starts = []
+        offset = 0
+        for token in tokens:
+            token_starts.append(offset)
+            offset += len(token) + 1
+        
+        for start, end, compound in COMPOUND_INGREDIENT_MATCHER.find_non_overlapping(text):
+            start_idx = bisect_right(token_starts, start) - 1
+            end_idx = bisect_right(token_starts, end - 1) - 1
+            if any(idx in negated_indices for idx in range(start_idx, end_idx + 1)):
+                continue
+            
+            match = find_closest_ingredient(compound, canonical_ingredients)
+            if match and match not in include_ingredients and not any(term in compound for term in dietary_terms):
+                include_ingredients.append(match)
+                for idx in range(start_idx, end_idx + 1):
+                    included_indices.add(idx)
+    
+    # Process remaining n-grams for inclusion
     for n_gram, start_idx, end_idx in n_grams:
         # Skip if any token in this n-gram is in negated_indices
         if any(idx in negated_indices for idx in range(start_idx, end_idx + 1)):
@@ -922,39 +1021,13 @@ def extract_recipe_category(query):
             # This is an exclusion query, not a category query
             return None
     
-    # Handle special categories and qualifiers
-    special_categories = {
-        'quick': 'quick',
-        'fast': 'quick',
-        'easy': 'easy',
-        'simple': 'easy', 
-        'fancy': 'fancy',
-        'elegant': 'fancy',
-        'gourmet': 'fancy',
-        'party': 'party',
-        'celebration': 'party',
-        'holiday': 'holiday',
-        'spicy': 'spicy',
-        'hot': 'spicy',
-        'dinner party': 'dinner party',
-        'picnic': 'picnic',
-        'bbq': 'bbq',
-        'barbecue': 'bbq',
-        'grilled': 'grilled',
-        'baked': 'baked',
-        'roasted': 'roasted',
-        'fried': 'fried',
-        'healthy': 'healthy',
-        'light': 'healthy'
-    }
-    
     # Check for special modifiers
-    for special, category in special_categories.items():
+    for special, category in SPECIAL_CATEGORY_MODIFIERS.items():
         if re.search(r'\b' + re.escape(special) + r'\b', query_lower):
             logger.debug(f"Found special category modifier: '{special}' -> '{category}'")
             
             # Look for associated primary category (like "quick breakfast")
-            for primary in ['breakfast', 'lunch', 'dinner', 'dessert', 'soup', 'salad', 'appetizer']:
+            for primary in PRIMARY_CATEGORIES:
                 if primary in query_lower:
                     combined = f"{category} {primary}"
                     logger.debug(f"Detected combined category: '{combined}'")
@@ -979,26 +1052,8 @@ def extract_recipe_category(query):
                     logger.debug(f"Found '{ingredient}' as ingredient, not category")
                     return None
     
-    # Define category mapping with variations
-    category_mapping = {
-        'dessert': ['dessert', 'desserts', 'sweet', 'cake', 'cookies', 'pie', 'pastry', 'pastries', 'baked goods'],
-        'breakfast': ['breakfast', 'morning meal', 'brunch'],
-        'lunch': ['lunch', 'midday meal'],
-        'dinner': ['dinner', 'supper', 'evening meal'],
-        'appetizer': ['appetizer', 'appetizers', 'starter', 'starters', 'hors d\'oeuvre', 'hors d\'oeuvres', 'snack', 'snacks'],
-        'main': ['main course', 'main dish', 'entree', 'entrée', 'main'],
-        'side': ['side', 'side dish', 'sides', 'accompaniment'],
-        'soup': ['soup', 'soups', 'stew', 'stews', 'broth', 'bisque', 'chowder'],
-        'salad': ['salad', 'salads'],
-        'bread': ['bread', 'breads', 'roll', 'rolls', 'bun', 'buns'],
-        'drink': ['drink', 'drinks', 'beverage', 'beverages', 'cocktail', 'cocktails', 'smoothie', 'smoothies', 'juice', 'juices'],
-        'seafood': ['seafood', 'fish', 'shrimp', 'crab', 'lobster', 'scallop', 'scallops', 'oyster', 'oysters'],
-        'meat': ['meat', 'beef', 'pork', 'lamb', 'chicken', 'turkey', 'duck', 'goose'],
-        'pasta': ['pasta', 'noodle', 'spaghetti', 'lasagna', 'macaroni']
-    }
-    
     # Check for each category
-    for category, terms in category_mapping.items():
+    for category, terms in RECIPE_CATEGORY_TERMS.items():
         for term in terms:
             if re.search(r'\b' + re.escape(term) + r'\b', query_lower):
                 # Check if this term should be prioritized as an ingredient
@@ -1183,10 +1238,77 @@ def extract_common_ingredients(query):
     
     return include_ingredients, exclude_ingredients
 
+# Parsed queries for the most recently used canonical ingredient set, in least-recently-used order
+_parse_cache = OrderedDict()
+_parse_cache_owner = (None, None)
+_parse_cache_stats = {'hits': 0, 'misses': 0}
+_parse_cache_lock = threading.Lock()
+
+def parse_cache_stats():
+    """
+    Get hit and miss counts and the current size of the parse cache.
+    
+    Returns:
+    --------
+    dict
+        Hits, misses and number of cached queries.
+    """
+    with _parse_cache_lock:
+        return dict(_parse_cache_stats, size=len(_parse_cache))
+
+def clear_parse_cache():
+    """Remove all parsed queries from the parse cache and reset its counters."""
+    global _parse_cache_owner
+    with _parse_cache_lock:
+        _parse_cache.clear()
+        _parse_cache_owner = (None, None)
+        _parse_cache_stats.update(hits=0, misses=0)
+
+def _cached_parse(query, canonical_ingredients):
+    """
+    Look up a query in the parse cache.
+    
+    The cache is emptied when a different canonical ingredient set is passed
+    or the set changes size, since the parse depends on it.
+    
+    Returns:
+    --------
+    dict or None
+        Copy of the cached parse, or None on a miss.
+    """
+    global _parse_cache_owner
+    owner = (canonical_ingredients, len(canonical_ingredients) if canonical_ingredients is not None else None)
+    with _parse_cache_lock:
+        cached_ingredients, cached_size = _parse_cache_owner
+        if cached_ingredients is not canonical_ingredients or cached_size != owner[1]:
+            _parse_cache.clear()
+            _parse_cache_owner = owner
+        
+        parsed = _parse_cache.get(query)
+        if parsed is None:
+            _parse_cache_stats['misses'] += 1
+            return None
+        _parse_cache.move_to_end(query)
+        _parse_cache_stats['hits'] += 1
+        return copy.deepcopy(parsed)
+
+def _store_parse(query, canonical_ingredients, parsed):
+    """Add a parsed query to the parse cache, evicting the least recently used entries."""
+    with _parse_cache_lock:
+        # Skip the store if the cache was switched to another ingredient set meanwhile
+        if _parse_cache_owner[0] is not canonical_ingredients:
+            return
+        _parse_cache[query] = copy.deepcopy(parsed)
+        while len(_parse_cache) > config.PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+
 def parse_query(query, canonical_ingredients=None):
     """
     Parse a user query to extract intent and entities.
     
+    When config.PARSE_CACHE_SIZE is positive, parses are cached on the exact
+    query text and the caller gets its own copy of the result.
+    
     Parameters:
     -----------
     query : str
@@ -1206,6 +1328,21 @@ def parse_query(query, canonical_ingredients=None):
         - recipe_name: Recipe name if specified, None otherwise
         - recipe_category: Category of recipes to search for
     """
+    use_cache = config.PARSE_CACHE_SIZE > 0 and isinstance(query, str) and query
+    if use_cache:
+        parsed = _cached_parse(query, canonical_ingredients)
+        if parsed is not None:
+            return parsed
+    
+    parsed = _parse_query_uncached(query, canonical_ingredients)
+    
+    # Failed parses are not cached so a later attempt can succeed
+    if use_cache and parsed['intent'] != 'unknown':
+        _store_parse(query, canonical_ingredients, parsed)
+    return parsed
+
+def _parse_query_uncached(query, canonical_ingredients=None):
+    """Parse a user query without the parse cache; see parse_query."""
     try:
         # Basic validation
         if not query or not isinstance(query, str):
@@ -0,0 +1,147 @@
+"""
+Phrase matching module for Recipe Bot.
+This module contains an Aho-Corasick automaton that finds every occurrence of
+a fixed set of phrases (such as compound ingredient names) in one pass over
+the text.
+"""
+
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def _is_word_char(char):
+    """Check if a character is part of a word, using the same rule as regex \\w."""
+    return char.isalnum() or char == '_'
+
+
+class PhraseMatcher:
+    """
+    Multi-pattern matcher built once from a list of phrases.
+
+    Parameters:
+    -----------
+    phrases : list
+        Phrases to look for; matching is case-sensitive, so lowercase both
+        the phrases and the text for case-insensitive matching
+    whole_words : bool, optional
+        Only report matches that start and end on word boundaries. Default is False.
+    """
+
+    def __init__(self, phrases, whole_words=False):
+        self.phrases = list(dict.fromkeys(phrase for phrase in phrases if phrase))
+        self.whole_words = whole_words
+
+        # Trie transitions, failure links and the phrases ending at each state
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        for phrase in self.phrases:
+            state = 0
+            for char in phrase:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append(phrase)
+
+        # Breadth-first pass to set failure links to the longest proper suffix in the trie
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # A state also ends every phrase its failure state ends
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+        logger.debug(f"Built phrase matcher with {len(self.phrases)} phrases and {len(self._goto)} states")
+
+    def find_all(self, text):
+        """
+        Find every occurrence of every phrase in a text.
+
+        Parameters:
+        -----------
+        text : str
+            Text to search
+
+        Returns:
+        --------
+        list
+            (start, end, phrase) tuples ordered by end position, then by
+            decreasing length; text[start:end] == phrase
+        """
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for phrase in self._outputs[state]:
+                end = position + 1
+                start = end - len(phrase)
+                if self.whole_words and not self._on_word_boundaries(text, start, end):
+                    continue
+                matches.append((start, end, phrase))
+        return matches
+
+    def longest_match(self, text):
+        """
+        Find the longest phrase occurring in a text.
+
+        Parameters:
+        -----------
+        text : str
+            Text to search
+
+        Returns:
+        --------
+        str or None
+            The longest matching phrase, the leftmost one among equally long
+            phrases, or None if no phrase occurs in the text
+        """
+        best = None
+        for start, end, phrase in self.find_all(text):
+            if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+                best = (start, end, phrase)
+        return best[2] if best else None
+
+    def find_non_overlapping(self, text):
+        """
+        Find phrase occurrences that do not overlap, preferring longer phrases.
+
+        Parameters:
+        -----------
+        text : str
+            Text to search
+
+        Returns:
+        --------
+        list
+            (start, end, phrase) tuples ordered by start position; longer
+            matches win over the shorter ones they overlap, then leftmost
+        """
+        selected = []
+        taken = [False] * len(text)
+        for start, end, phrase in sorted(self.find_all(text), key=lambda match: (match[0] - match[1], match[0])):
+            if not any(taken[start:end]):
+                selected.append((start, end, phrase))
+                taken[start:end] = [True] * (end - start)
+        return sorted(selected)
+
+    @staticmethod
+    def _on_word_boundaries(text, start, end):
+        """Check that a match is not glued to word characters on either side."""
+        if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+            return False
+        if end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+            return False
+        return True
@@ -0,0 +1,613 @@
+"""
+Recipe index module for Recipe Bot.
+This module contains lookup structures that are built once over the recipe
+DataFrame so that queries only have to look at the recipes that can match.
+"""
+
+import itertools
+import logging
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from time import time
+
+from bisect import bisect_right
+
+import numpy as np
+from fuzzywuzzy import fuzz
+
+from category_index import CATEGORY_COLUMNS, CategoryIndex
+from fuzzy_index import char_count_matrix, shared_char_counts
+from text_index import TextIndex
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Indexes built so far, keyed on the id() of the DataFrame they describe
+_INDEX_REGISTRY = {}
+
+# Source of RecipeIndex.version; every index built gets a new number
+_INDEX_VERSIONS = itertools.count(1)
+
+# Values of config.MATCH_ENGINE understood by find_matching_recipes
+MATCH_ENGINES = ('python', 'sparse')
+
+# Fuzzy threshold used by calculate_match_score for ingredient similarity
+FUZZY_MATCH_THRESHOLD = 85
+
+# Fuzzy threshold used by get_detailed_recipe for recipe titles
+TITLE_MATCH_THRESHOLD = 70
+
+# Separator between titles in the text searched for substrings
+_TITLE_SEPARATOR = '\x00'
+
+# Words of a title, used as keys of the title token index
+_TITLE_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def check_match_engine(config):
+    """
+    Check that config.MATCH_ENGINE names a known scoring engine.
+
+    Parameters:
+    -----------
+    config : module
+        Configuration module
+
+    Raises:
+    -------
+    ValueError
+        If MATCH_ENGINE is not one of MATCH_ENGINES
+    """
+    if config.MATCH_ENGINE not in MATCH_ENGINES:
+        raise ValueError(f"Unknown MATCH_ENGINE {config.MATCH_ENGINE!r}; expected one of {MATCH_ENGINES}")
+
+
+class TitleIndex:
+    """
+    Lookup structures over recipe titles for get_detailed_recipe.
+
+    Titles are found by exact name, then by case-insensitive substring, then
+    by the best fuzz.ratio above TITLE_MATCH_THRESHOLD. Each tier returns the
+    same recipe as the corresponding scan over the DataFrame: the first one
+    in row order among equally good matches.
+
+    Parameters:
+    -----------
+    names : list
+        Recipe titles in row order; entries that are not strings never match
+    """
+
+    def __init__(self, names):
+        start_time = time()
+        names = list(names)
+        self.num_titles = len(names)
+
+        # Exact title -> first row position
+        self.by_name = {}
+        for position, name in enumerate(names):
+            if isinstance(name, str):
+                self.by_name.setdefault(name, position)
+
+        # Uppercased titles joined into one string, as str.contains(case=False)
+        # compares uppercased text; offsets map a hit back to its row position
+        upper_names = [name.upper().replace(_TITLE_SEPARATOR, ' ') if isinstance(name, str) else ''
+                       for name in names]
+        self._upper_text = _TITLE_SEPARATOR.join(upper_names)
+        self._upper_offsets = []
+        offset = 0
+        for upper_name in upper_names:
+            self._upper_offsets.append(offset)
+            offset += len(upper_name) + len(_TITLE_SEPARATOR)
+
+        # Lowercased titles with their lengths and character counts for the fuzzy tier
+        self.lower_names = [name.lower() if isinstance(name, str) else '' for name in names]
+        self.lengths = np.array([len(name) for name in self.lower_names], dtype=np.int64)
+        self.alphabet, self.char_counts = char_count_matrix(self.lower_names)
+
+        # Title word -> row positions of the titles containing it
+        postings = {}
+        for position, name in enumerate(self.lower_names):
+            for token in set(_TITLE_TOKEN_PATTERN.findall(name)):
+                postings.setdefault(token, []).append(position)
+        self.token_postings = {token: np.array(positions, dtype=np.int64) for token, positions in postings.items()}
+
+        logger.info(f"Built title index with {len(self.token_postings)} title words "
+                    f"over {self.num_titles} recipes in {time() - start_time:.2f} seconds")
+
+    def find(self, recipe_name):
+        """
+        Find the row position of the recipe best matching a title.
+
+        Parameters:
+        -----------
+        recipe_name : str
+            Title to look for
+
+        Returns:
+        --------
+        int or None
+            Row position of the matching recipe, or None if no title matches
+        """
+        position = self.by_name.get(recipe_name)
+        if position is not None:
+            return position
+
+        position = self.find_containing(recipe_name)
+        if position is not None:
+            return position
+
+        matches = self.fuzzy_matches(recipe_name, limit=1)
+        return matches[0][0] if matches else None
+
+    def find_containing(self, text):
+        """
+        Find the first recipe whose title contains a piece of text, ignoring case.
+
+        Parameters:
+        -----------
+        text : str
+            Text to look for
+
+        Returns:
+        --------
+        int or None
+            Row position of the first title containing the text, or None
+        """
+        upper_text = text.upper()
+        if _TITLE_SEPARATOR in upper_text or not self.num_titles:
+            return None
+        # The text has no separator, so a hit always lies within a single title
+        hit = self._upper_text.find(upper_text)
+        if hit < 0:
+            return None
+        return bisect_right(self._upper_offsets, hit) - 1
+
+    def fuzzy_matches(self, recipe_name, limit=1, threshold=TITLE_MATCH_THRESHOLD):
+        """
+        Find the titles with the best fuzz.ratio against a name.
+
+        Titles sharing a word with the name are scored first. Their scores
+        raise the bar that the remaining titles' character-count upper bound
+        must reach, so only a few of them are scored as well.
+
+        Parameters:
+        -----------
+        recipe_name : str
+            Name to compare titles against
+        limit : int, optional
+            Maximum number of titles to return. Default is 1.
+        threshold : int, optional
+            Scores must be strictly above this value. Default is TITLE_MATCH_THRESHOLD.
+
+        Returns:
+        --------
+        list
+            (row position, score) tuples, best score first and earlier rows
+            first among equal scores
+        """
+        query = recipe_name.lower()
+        if not query or not self.num_titles or limit < 1:
+            return []
+
+        scores = {}
+
+        def score_positions(positions):
+            for position in positions.tolist():
+                if position not in scores:
+                    scores[position] = fuzz.ratio(query, self.lower_names[position])
+
+        # Titles sharing a word with the query are likely to be the best matches
+        tokens = set(_TITLE_TOKEN_PATTERN.findall(query))
+        seed_postings = [self.token_postings[token] for token in tokens if token in self.token_postings]
+        if seed_postings:
+            score_positions(np.unique(np.concatenate(seed_postings)))
+
+        # Any other title must be able to tie the limit-th best score so far
+        seed_scores = sorted((score for score in scores.values() if score > threshold), reverse=True)
+        min_score = seed_scores[limit - 1] if len(seed_scores) >= limit else threshold + 1
+        # fuzz.ratio rounds, so a score of s needs a ratio of at least (s - 0.5) / 100
+        min_ratio = (min_score - 0.5) / 100
+
+        total_lengths = self.lengths + len(query)
+        keep = 2.0 * np.minimum(self.lengths, len(query)) >= min_ratio * total_lengths
+        positions = np.flatnonzero(keep)
+        shared = shared_char_counts(query, self.alphabet, self.char_counts[positions])
+        score_positions(positions[2.0 * shared >= min_ratio * total_lengths[positions]])
+
+        matches = sorted(((position, score) for position, score in scores.items() if score > threshold),
+                         key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
+
+
+class RecipeIndex:
+    """
+    Precomputed lookup structures for a recipe DataFrame.
+
+    The DataFrame is treated as read-only once it has been indexed; all
+    structures refer to recipes by their row position in the DataFrame.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    config : module
+        Configuration module
+    """
+
+    def __init__(self, df_recipes, config):
+        # Fail at startup rather than silently scoring with the wrong engine
+        check_match_engine(config)
+        start_time = time()
+        self.num_recipes = len(df_recipes)
+        # Distinguishes this corpus from ones loaded before or after it, so
+        # results cached for another corpus are never reused
+        self.version = next(_INDEX_VERSIONS)
+
+        # Recipe id -> row position; ids come from the 'id' column, or the index
+        # labels when there is none, and the first row wins for duplicate ids
+        recipe_ids = df_recipes['id'] if 'id' in df_recipes.columns else df_recipes.index
+        self.id_positions = {}
+        for position, recipe_id in enumerate(recipe_ids.tolist()):
+            self.id_positions.setdefault(recipe_id, position)
+
+        # Inverted index: cleaned ingredient -> row positions of recipes using it
+        postings = {}
+        # Number of non-empty ingredients per recipe (the coverage denominator)
+        self.recipe_lengths = np.zeros(self.num_recipes, dtype=np.int64)
+        ingredients_col = config.CLEANED_INGREDIENTS_COLUMN
+        if ingredients_col in df_recipes.columns:
+            for position, recipe_ingredients in enumerate(df_recipes[ingredients_col]):
+                if not isinstance(recipe_ingredients, list):
+                    continue
+                for ingredient in recipe_ingredients:
+                    if ingredient:
+                        postings.setdefault(str(ingredient).lower(), []).append(position)
+                        self.recipe_lengths[position] += 1
+        else:
+            logger.warning(f"Column '{ingredients_col}' not found, ingredient index will be empty")
+
+        self.ingredient_postings = {
+            ingredient: np.unique(np.array(positions, dtype=np.int64))
+            for ingredient, positions in postings.items()
+        }
+        self.vocabulary = sorted(self.ingredient_postings)
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.vocabulary)}
+        self._ingredient_matrix = None
+        self._title_index = None
+        name_col = config.RECIPE_NAME_COLUMN
+        # Titles, kept until their title index is built
+        self._title_names = df_recipes[name_col] if name_col in df_recipes.columns else None
+        # Text columns searched by category filters, kept until the category index is built
+        self._category_index = None
+        category_columns = [name_col, config.INSTRUCTIONS_COLUMN, 'description', 'tags', 'keywords', 'notes']
+        self._category_recipes = df_recipes[
+            [column for column in category_columns + CATEGORY_COLUMNS if column in df_recipes.columns]
+        ]
+        # Name and instructions, kept until their text index is built
+        self._text_index = None
+        # Guards the structures built on first use, which request threads may ask for at the same time
+        self._build_lock = threading.Lock()
+        self._text_recipes = df_recipes[
+            [column for column in [name_col, config.INSTRUCTIONS_COLUMN] if column in df_recipes.columns]
+        ]
+        self._config = config
+        
+        # Bounded cache of fuzzy matches per user ingredient, shared by all queries
+        self._similar_terms = OrderedDict()
+        self._similar_terms_size = config.FUZZY_TERM_CACHE_SIZE
+        self._similar_terms_lock = threading.Lock()
+
+        # Group the vocabulary by length to bound the fuzzy comparisons
+        self._vocabulary_by_length = {}
+        for ingredient in self.vocabulary:
+            self._vocabulary_by_length.setdefault(len(ingredient), []).append(ingredient)
+
+        logger.info(f"Built ingredient index with {len(self.vocabulary)} ingredients "
+                    f"over {self.num_recipes} recipes in {time() - start_time:.2f} seconds")
+
+    def position_of(self, recipe_id):
+        """
+        Get the row position of a recipe from its id.
+
+        Parameters:
+        -----------
+        recipe_id : int or str
+            Recipe id, as stored in search results
+
+        Returns:
+        --------
+        int or None
+            Row position of the recipe, or None if the id is unknown
+        """
+        try:
+            return self.id_positions.get(recipe_id)
+        except TypeError:
+            # Unhashable ids cannot be in the index
+            return None
+
+    def substring_terms(self, text):
+        """
+        Find the vocabulary terms that contain a piece of text.
+
+        Parameters:
+        -----------
+        text : str
+            Lowercased text to look for
+
+        Returns:
+        --------
+        list
+            Vocabulary terms containing the text
+        """
+        return [term for term in self.vocabulary if text in term]
+
+    def fuzzy_term_scores(self, user_ingredient):
+        """
+        Find the vocabulary terms whose fuzz.ratio with an ingredient exceeds
+        the threshold used by calculate_match_score.
+
+        Parameters:
+        -----------
+        user_ingredient : str
+            Lowercased ingredient requested by the user
+
+        Returns:
+        --------
+        dict
+            Mapping of similar vocabulary terms to their fuzz.ratio score
+        """
+        scores = {}
+        # Only terms of a similar length can exceed the fuzzy threshold
+        length = len(user_ingredient)
+        for term_length in range(int(length * 0.7), int(length * 1.5) + 2):
+            for term in self._vocabulary_by_length.get(term_length, []):
+                similarity = fuzz.ratio(user_ingredient, term)
+                if similarity > FUZZY_MATCH_THRESHOLD:
+                    scores[term] = similarity
+        return scores
+
+    def similar_terms(self, user_ingredient):
+        """
+        Get the fuzzy matches of an ingredient, computing them on first use.
+
+        The results are kept in a least-recently-used table so repeated
+        queries for the same ingredient skip the fuzz.ratio calls.
+
+        Parameters:
+        -----------
+        user_ingredient : str
+            Lowercased ingredient requested by the user
+
+        Returns:
+        --------
+        dict
+            Mapping of similar vocabulary terms to their fuzz.ratio score
+        """
+        with self._similar_terms_lock:
+            scores = self._similar_terms.get(user_ingredient)
+            if scores is not None:
+                self._similar_terms.move_to_end(user_ingredient)
+                return scores
+
+        scores = self.fuzzy_term_scores(user_ingredient)
+        with self._similar_terms_lock:
+            self._similar_terms[user_ingredient] = scores
+            while len(self._similar_terms) > self._similar_terms_size:
+                self._similar_terms.popitem(last=False)
+        return scores
+
+    def fuzzy_terms(self, user_ingredient):
+        """
+        Find the vocabulary terms fuzzily similar to an ingredient.
+
+        Parameters:
+        -----------
+        user_ingredient : str
+            Lowercased ingredient requested by the user
+
+        Returns:
+        --------
+        list
+            Vocabulary terms fuzzily similar to the ingredient
+        """
+        return list(self.similar_terms(user_ingredient))
+
+    def matching_terms(self, user_ingredient):
+        """
+        Find the vocabulary terms that calculate_match_score could match.
+
+        A user ingredient matches a recipe when it is a substring of the
+        recipe's joined ingredient text, or when it is fuzzily similar to one
+        of the recipe's ingredients. Phrases spanning two adjacent ingredients
+        always keep their first word inside a single ingredient, so the first
+        word is used as the substring key for multi-word ingredients.
+
+        Parameters:
+        -----------
+        user_ingredient : str
+            Lowercased ingredient requested by the user
+
+        Returns:
+        --------
+        list
+            Vocabulary terms of recipes that may match the ingredient
+        """
+        key = user_ingredient.split(' ')[0] if ' ' in user_ingredient else user_ingredient
+        return self.substring_terms(key) + self.fuzzy_terms(user_ingredient)
+
+    def ingredient_matrix(self):
+        """
+        Get the recipe x ingredient incidence matrix, building it on first use.
+
+        Returns:
+        --------
+        scipy.sparse.csr_matrix
+            Matrix with a 1 where a recipe (row) uses a vocabulary term (column)
+        """
+        if self._ingredient_matrix is None:
+            from scipy import sparse
+
+            rows = [self.ingredient_postings[term] for term in self.vocabulary]
+            cols = [np.full(len(positions), term_id, dtype=np.int64) for term_id, positions in enumerate(rows)]
+            row_positions = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+            col_positions = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+            self._ingredient_matrix = sparse.csr_matrix(
+                (np.ones(len(row_positions), dtype=np.float32), (row_positions, col_positions)),
+                shape=(self.num_recipes, len(self.vocabulary))
+            )
+            logger.info(f"Built {self._ingredient_matrix.shape[0]}x{self._ingredient_matrix.shape[1]} "
+                        f"ingredient matrix with {self._ingredient_matrix.nnz} entries")
+        return self._ingredient_matrix
+
+    def title_index(self):
+        """
+        Get the index over recipe titles, building it on first use.
+
+        Returns:
+        --------
+        TitleIndex or None
+            Title index, or None if the DataFrame has no name column
+        """
+        if self._title_index is None and self._title_names is not None:
+            with self._build_lock:
+                # Another thread may have built it while this one waited
+                if self._title_index is None:
+                    self._title_index = TitleIndex(self._title_names)
+                    self._title_names = None
+        return self._title_index
+
+    def text_index(self):
+        """
+        Get the word index over the normalized name and instructions, building it on first use.
+
+        Returns:
+        --------
+        TextIndex
+            Text index over the recipes
+        """
+        if self._text_index is None:
+            with self._build_lock:
+                # Another thread may have built it while this one waited
+                if self._text_index is None:
+                    self._text_index = TextIndex(self._text_recipes, list(self._text_recipes.columns))
+                    self._text_recipes = None
+        return self._text_index
+
+    def category_index(self):
+        """
+        Get the category bitmaps, building them on first use.
+
+        Returns:
+        --------
+        CategoryIndex
+            Category index over the recipes
+        """
+        if self._category_index is None:
+            # Built before taking the lock, which text_index takes too
+            text_index = self.text_index()
+            with self._build_lock:
+                # Another thread may have built it while this one waited
+                if self._category_index is None:
+                    self._category_index = CategoryIndex(self._category_recipes, self._config, text_index)
+                    self._category_recipes = None
+        return self._category_index
+
+    def term_hits(self, matrix, term_lists):
+        """
+        Check which recipes use at least one term from each list of terms.
+
+        Parameters:
+        -----------
+        matrix : scipy.sparse.csr_matrix
+            Rows of the ingredient matrix to check
+        term_lists : list
+            One list of vocabulary terms per column of the result
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean array of shape (recipes, len(term_lists))
+        """
+        selector = np.zeros((len(self.vocabulary), len(term_lists)), dtype=np.float32)
+        for column, terms in enumerate(term_lists):
+            for term in terms:
+                selector[self.term_ids[term], column] = 1
+        return (matrix @ selector) > 0
+
+    def candidate_positions(self, user_ingredients):
+        """
+        Get the row positions of recipes that may match any user ingredient.
+
+        Parameters:
+        -----------
+        user_ingredients : list
+            Lowercased ingredients requested by the user
+
+        Returns:
+        --------
+        numpy.ndarray
+            Sorted, unique row positions of candidate recipes
+        """
+        postings = []
+        for user_ingredient in user_ingredients:
+            for term in self.matching_terms(user_ingredient):
+                postings.append(self.ingredient_postings[term])
+
+        if not postings:
+            return np.array([], dtype=np.int64)
+        return np.unique(np.concatenate(postings))
+
+
+def build_recipe_index(df_recipes, config):
+    """
+    Build the recipe index for a DataFrame and register it for later lookups.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    RecipeIndex
+        The newly built index
+    """
+    recipe_index = RecipeIndex(df_recipes, config)
+    key = id(df_recipes)
+
+    def _unregister(ref, key=key):
+        # Only drop the entry if it still belongs to the collected DataFrame
+        entry = _INDEX_REGISTRY.get(key)
+        if entry is not None and entry[0] is ref:
+            del _INDEX_REGISTRY[key]
+
+    _INDEX_REGISTRY[key] = (weakref.ref(df_recipes, _unregister), recipe_index)
+    return recipe_index
+
+
+def get_recipe_index(df_recipes, config):
+    """
+    Get the recipe index for a DataFrame, building it on first use.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    config : module
+        Configuration module
+
+    Returns:
+    --------
+    RecipeIndex
+        Index describing the DataFrame
+    """
+    entry = _INDEX_REGISTRY.get(id(df_recipes))
+    if entry is not None and entry[0]() is df_recipes:
+        return entry[1]
+
+    logger.info("No recipe index registered for this DataFrame, building one now")
+    return build_recipe_index(df_recipes, config)
@@ -8,12 +8,73 @@ import numpy as np
 import logging
 import config
 import re
-from collections import Counter
+import sys
+import threading
+from collections import Counter, OrderedDict
+from time import time
 from fuzzywuzzy import fuzz
+from category_index import RecipeColumns, recipe_category_mask
+from recipe_index import check_match_engine, get_recipe_index
+from metrics import StageTimer, timed
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Meat and fish ingredients, which neither vegetarian nor vegan recipes may contain
+NON_VEGETARIAN_TERMS = [
+    'meat', 'beef', 'chicken', 'pork', 'lamb', 'veal', 'turkey', 'duck', 'goose',
+    'bacon', 'ham', 'sausage', 'prosciutto', 'pepperoni', 'salami', 'chorizo',
+    'fish', 'salmon', 'tuna', 'shrimp', 'lobster', 'crab', 'clam', 'mussel', 'oyster', 
+    'squid', 'octopus', 'anchovies', 'sardines', 'cod', 'tilapia', 'catfish',
+    'gelatin'
+]
+
+# Ingredients that rule a recipe out for each dietary preference
+DIETARY_RESTRICTED_INGREDIENTS = {
+    'vegetarian': NON_VEGETARIAN_TERMS,
+    'vegan': NON_VEGETARIAN_TERMS + [
+        'milk', 'cream', 'butter', 'cheese', 'yogurt', 'ice cream', 'dairy',
+        'egg', 'eggs', 'honey', 'mayonnaise', 'whey', 'casein', 'lactose'
+    ],
+    'gluten-free': [
+        'wheat', 'rye', 'barley', 'triticale', 'semolina', 'spelt', 'farina',
+        'farro', 'graham flour', 'matzo', 'panko', 'bulgur', 'couscous',
+        'pasta', 'noodles', 'bread', 'flour', 'soy sauce'
+    ],
+    'dairy-free': [
+        'milk', 'cream', 'butter', 'cheese', 'yogurt', 'ice cream', 'dairy',
+        'whey', 'casein', 'lactose', 'ghee', 'buttermilk', 'half-and-half',
+        'sour cream', 'creme fraiche', 'custard', 'pudding'
+    ],
+    'nut-free': [
+        'almond', 'almonds', 'walnut', 'walnuts', 'pecan', 'pecans', 'peanut', 'peanuts',
+        'cashew', 'cashews', 'pistachio', 'pistachios', 'hazelnut', 'hazelnuts',
+        'macadamia', 'brazil nut', 'pine nut', 'chestnut', 'nut', 'nuts', 'nut butter',
+        'peanut butter', 'almond butter', 'nutella'
+    ]
+}
+
+# High carb ingredients, used for the low-carb flag
+HIGH_CARB_INGREDIENTS = ['sugar', 'pasta', 'rice', 'potato', 'bread', 'flour', 'corn']
+
+# Boolean column added to the recipe DataFrame for each diet
+DIETARY_FLAG_COLUMNS = {
+    'vegetarian': 'is_vegetarian',
+    'vegan': 'is_vegan',
+    'gluten-free': 'is_gluten_free',
+    'dairy-free': 'is_dairy_free',
+    'nut-free': 'is_nut_free',
+    'low-carb': 'is_low_carb'
+}
+
+# One whole-word alternation per diet; longer terms first so phrases win over their words
+DIETARY_FLAG_PATTERNS = {
+    diet: re.compile(r'\b(?:' + '|'.join(
+        re.escape(term) for term in sorted(set(terms), key=len, reverse=True)
+    ) + r')\b')
+    for diet, terms in list(DIETARY_RESTRICTED_INGREDIENTS.items()) + [('low-carb', HIGH_CARB_INGREDIENTS)]
+}
+
 # Dietary indicators - keywords that might indicate a recipe matches a dietary preference
 DIETARY_INDICATORS = {
     'vegetarian': [
@@ -45,7 +106,7 @@ DIETARY_INDICATORS = {
     ]
 }
 
-def calculate_match_score(user_ingredients, recipe_ingredients, exclude_ingredients=None):
+def calculate_match_score(user_ingredients, recipe_ingredients, exclude_ingredients=None, similar_terms=None):
     """
     Calculate a match score between user ingredients and recipe ingredients.
     
@@ -57,6 +118,10 @@ def calculate_match_score(user_ingredients, recipe_ingredients, exclude_ingredie
         List of ingredients in the recipe
     exclude_ingredients : list, optional
         List of ingredients to exclude
+    similar_terms : dict, optional
+        Precomputed fuzzy matches: lowercased user ingredient -> {recipe
+        ingredient: fuzz.ratio} for every recipe ingredient scoring above 85
+        (see RecipeIndex.similar_terms). Used instead of calling fuzz.ratio.
         
     Returns:
     --------
@@ -123,10 +188,14 @@ def calculate_match_score(user_ingredients, recipe_ingredients, exclude_ingredie
         if not found:
             best_match = None
             best_score = 0
+            known_scores = similar_terms.get(user_ing) if similar_terms else None
             
             for recipe_ing in recipe_ingredients_lower:
                 # Try fuzzy ratio for more complex matches
-                similarity = fuzz.ratio(user_ing, recipe_ing)
+                if known_scores is not None:
+                    similarity = known_scores.get(recipe_ing, 0)
+                else:
+                    similarity = fuzz.ratio(user_ing, recipe_ing)
                 
                 if similarity > 85 and similarity > best_score:  # Stricter threshold (85% vs 80%)
                     best_match = recipe_ing
@@ -178,6 +247,220 @@ def calculate_match_score(user_ingredients, recipe_ingredients, exclude_ingredie
         'score': score
     }
 
+def _phrase_hits(phrase, recipe_index, matrix, positions, direct_hits, df_recipes, ingredients_col):
+    """
+    Find recipes whose joined ingredient text contains a multi-word phrase that
+    spans two adjacent ingredients (and so is not a substring of any single one).
+    
+    Parameters:
+    -----------
+    phrase : str
+        Lowercased multi-word phrase
+    recipe_index : RecipeIndex
+        Index of the recipe DataFrame
+    matrix : scipy.sparse.csr_matrix
+        Ingredient matrix rows for the recipes being scored
+    positions : numpy.ndarray
+        Row positions of the recipes being scored
+    direct_hits : numpy.ndarray
+        Boolean array of recipes already known to contain the phrase
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    ingredients_col : str
+        Name of the cleaned ingredients column
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean array of recipes containing the phrase
+    """
+    # The first word of the phrase always falls inside a single ingredient
+    first_word = phrase.split(' ')[0]
+    maybe_hits = recipe_index.term_hits(matrix, [recipe_index.substring_terms(first_word)])[:, 0] & ~direct_hits
+    
+    hits = direct_hits.copy()
+    ingredient_lists = df_recipes[ingredients_col]
+    for row in np.flatnonzero(maybe_hits):
+        recipe_text = " ".join(str(ing).lower() for ing in ingredient_lists.iloc[positions[row]] if ing)
+        hits[row] = phrase in recipe_text
+    return hits
+
+def calculate_match_scores_sparse(user_ingredients, exclude_ingredients, df_recipes, positions, recipe_index, config):
+    """
+    Vectorized version of calculate_match_score for many recipes at once.
+    
+    Each user ingredient is turned into a selector over the ingredient
+    vocabulary, so matching every recipe is a sparse matrix product.
+    
+    Parameters:
+    -----------
+    user_ingredients : list
+        List of lowercased ingredients specified by the user
+    exclude_ingredients : list
+        List of ingredients to exclude
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    positions : numpy.ndarray
+        Row positions of the recipes to score
+    recipe_index : RecipeIndex
+        Index of the recipe DataFrame
+    config : module
+        Configuration module
+        
+    Returns:
+    --------
+    dict
+        Arrays aligned with positions, with keys:
+        - match_count: number of matched user ingredients
+        - match_ratio: ratio of matched ingredients to user_ingredients
+        - coverage_ratio: ratio of matched ingredients to recipe ingredients
+        - score: overall match score
+    """
+    ingredients_col = config.CLEANED_INGREDIENTS_COLUMN
+    matrix = recipe_index.ingredient_matrix()[positions]
+    recipe_lengths = recipe_index.recipe_lengths[positions]
+    
+    user_ingredients = [str(ing).lower() for ing in user_ingredients if ing]
+    match_count = np.zeros(len(positions), dtype=np.int64)
+    if user_ingredients:
+        substring_hits = recipe_index.term_hits(
+            matrix, [recipe_index.substring_terms(ing) for ing in user_ingredients]
+        )
+        
+        # Like calculate_match_score, a fuzzy match only counts if its recipe
+        # ingredient is not already among the common ingredients, so track
+        # which terms each recipe has contributed so far, in query order
+        in_common = {}
+        for column, user_ing in enumerate(user_ingredients):
+            found = substring_hits[:, column]
+            if ' ' in user_ing:
+                found = _phrase_hits(user_ing, recipe_index, matrix, positions, found, df_recipes, ingredients_col)
+            match_count += found
+            if user_ing in recipe_index.term_ids:
+                in_common[user_ing] = in_common.get(user_ing, False) | found
+            
+            # Assign each remaining recipe its best fuzzy term
+            fuzzy_scores = recipe_index.similar_terms(user_ing)
+            unassigned = ~found
+            for term in sorted(fuzzy_scores, key=lambda t: (-fuzzy_scores[t], recipe_index.term_ids[t])):
+                best = unassigned & recipe_index.term_hits(matrix, [[term]])[:, 0]
+                unassigned &= ~best
+                new_matches = best & ~in_common.get(term, False)
+                match_count += new_matches
+                in_common[term] = in_common.get(term, False) | new_matches
+    
+    has_ingredients = recipe_lengths > 0
+    match_count[~has_ingredients] = 0
+    match_ratio = match_count / len(user_ingredients) if user_ingredients else np.zeros(len(positions))
+    coverage_ratio = np.divide(match_count, recipe_lengths, out=np.zeros(len(positions)), where=has_ingredients)
+    score = (0.8 * match_ratio) + (0.2 * coverage_ratio)
+    
+    # Apply penalty for excluded ingredients if provided
+    if exclude_ingredients:
+        exclude_lower = [exclude_ing.lower() for exclude_ing in exclude_ingredients]
+        # An excluded ingredient is found when it contains, or is contained in, a recipe ingredient
+        excluded_terms = [
+            [term for term in recipe_index.vocabulary if exclude_ing in term or term in exclude_ing]
+            for exclude_ing in exclude_lower
+        ]
+        excluded_hits = recipe_index.term_hits(matrix, excluded_terms)
+        excluded_count = np.zeros(len(positions), dtype=np.int64)
+        for column, exclude_ing in enumerate(exclude_lower):
+            found = excluded_hits[:, column]
+            if ' ' in exclude_ing:
+                found = _phrase_hits(exclude_ing, recipe_index, matrix, positions, found, df_recipes, ingredients_col)
+            excluded_count += found
+        
+        exclusion_penalty = np.minimum(1.0, 0.7 * excluded_count)
+        penalized = (excluded_count > 0) & has_ingredients
+        score = np.where(penalized, np.maximum(0, score - exclusion_penalty), score)
+    
+    return {
+        'match_count': match_count,
+        'match_ratio': match_ratio,
+        'coverage_ratio': coverage_ratio,
+        'score': score
+    }
+
+def normalize_dietary_preference(preference):
+    """
+    Map the different ways of writing a dietary preference to one name.
+    
+    Parameters:
+    -----------
+    preference : str
+        Dietary preference as given by the user or the parser
+        
+    Returns:
+    --------
+    str
+        Normalized preference (e.g., 'vegetarian', 'gluten-free')
+    """
+    pref_lower = preference.lower()
+    if pref_lower in ['vegetarian', 'veg', 'veggie', 'vegetable', 'no meat']:
+        return 'vegetarian'
+    elif pref_lower in ['vegan', 'plant-based', 'plant based', 'no animal', 'no animal products']:
+        return 'vegan'
+    elif pref_lower in ['gluten-free', 'gluten free', 'gluten_free', 'no gluten']:
+        return 'gluten-free'
+    elif pref_lower in ['dairy-free', 'dairy free', 'no dairy', 'lactose-free']:
+        return 'dairy-free'
+    elif pref_lower in ['nut-free', 'nut free', 'no nuts', 'peanut-free']:
+        return 'nut-free'
+    return pref_lower
+
+def recipe_contains_restricted_ingredient(recipe_ingredients, diet):
+    """
+    Check if any ingredient of a recipe is ruled out by a diet.
+    
+    Parameters:
+    -----------
+    recipe_ingredients : list
+        List of ingredients in the recipe
+    diet : str
+        Key of DIETARY_FLAG_PATTERNS (e.g., 'vegan', 'low-carb')
+        
+    Returns:
+    --------
+    bool
+        True if the recipe contains a restricted ingredient, False otherwise
+    """
+    # Ingredients are joined with newlines so multi-word terms cannot span two of them
+    recipe_text = '\n'.join(ing.lower() for ing in recipe_ingredients)
+    return DIETARY_FLAG_PATTERNS[diet].search(recipe_text) is not None
+
+def add_dietary_flag_columns(df_recipes, config):
+    """
+    Add one boolean column per diet telling whether each recipe fits it.
+    
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    config : module
+        Configuration module
+        
+    Returns:
+    --------
+    pandas.DataFrame
+        The same DataFrame with the DIETARY_FLAG_COLUMNS columns added
+    """
+    start_time = time()
+    ingredients_col = config.CLEANED_INGREDIENTS_COLUMN
+    if ingredients_col not in df_recipes.columns:
+        logger.warning(f"Column '{ingredients_col}' not found, dietary flags not computed")
+        return df_recipes
+    
+    for diet, column in DIETARY_FLAG_COLUMNS.items():
+        # Recipes without a usable ingredient list never meet a preference
+        df_recipes[column] = [
+            isinstance(recipe_ingredients, list) and not recipe_contains_restricted_ingredient(recipe_ingredients, diet)
+            for recipe_ingredients in df_recipes[ingredients_col]
+        ]
+    
+    logger.info(f"Computed dietary flags for {len(df_recipes)} recipes in {time() - start_time:.2f} seconds")
+    return df_recipes
+
 def check_dietary_preferences(recipe_ingredients, dietary_preferences):
     """
     Check if a recipe meets the specified dietary preferences.
@@ -197,107 +480,178 @@ def check_dietary_preferences(recipe_ingredients, dietary_preferences):
     if not dietary_preferences:
         return True  # No preferences specified, so all recipes are valid
     
-    # Convert recipe ingredients to lowercase for case-insensitive matching
-    recipe_ingredients_lower = [ing.lower() for ing in recipe_ingredients]
-    recipe_text = ' '.join(recipe_ingredients_lower)
-    
-    # Define ingredient lists for each dietary preference
-    non_vegetarian_ingredients = [
-        'meat', 'beef', 'chicken', 'pork', 'lamb', 'veal', 'turkey', 'duck', 'goose',
-        'bacon', 'ham', 'sausage', 'prosciutto', 'pepperoni', 'salami', 'chorizo',
-        'fish', 'salmon', 'tuna', 'shrimp', 'lobster', 'crab', 'clam', 'mussel', 'oyster', 
-        'squid', 'octopus', 'anchovies', 'sardines', 'cod', 'tilapia', 'catfish',
-        'gelatin'
-    ]
-    
-    non_vegan_ingredients = non_vegetarian_ingredients + [
-        'milk', 'cream', 'butter', 'cheese', 'yogurt', 'ice cream', 'dairy',
-        'egg', 'eggs', 'honey', 'mayonnaise', 'whey', 'casein', 'lactose'
-    ]
-    
-    gluten_ingredients = [
-        'wheat', 'rye', 'barley', 'triticale', 'semolina', 'spelt', 'farina',
-        'farro', 'graham flour', 'matzo', 'panko', 'bulgur', 'couscous',
-        'pasta', 'noodles', 'bread', 'flour', 'soy sauce'
-    ]
-    
-    dairy_ingredients = [
-        'milk', 'cream', 'butter', 'cheese', 'yogurt', 'ice cream', 'dairy',
-        'whey', 'casein', 'lactose', 'ghee', 'buttermilk', 'half-and-half',
-        'sour cream', 'creme fraiche', 'custard', 'pudding'
-    ]
-    
-    nut_ingredients = [
-        'almond', 'almonds', 'walnut', 'walnuts', 'pecan', 'pecans', 'peanut', 'peanuts',
-        'cashew', 'cashews', 'pistachio', 'pistachios', 'hazelnut', 'hazelnuts',
-        'macadamia', 'brazil nut', 'pine nut', 'chestnut', 'nut', 'nuts', 'nut butter',
-        'peanut butter', 'almond butter', 'nutella'
-    ]
-    
     # Normalize preferences
-    normalized_preferences = []
-    for pref in dietary_preferences:
-        pref_lower = pref.lower()
-        if pref_lower in ['vegetarian', 'veg', 'veggie', 'vegetable', 'no meat']:
-            normalized_preferences.append('vegetarian')
-        elif pref_lower in ['vegan', 'plant-based', 'plant based', 'no animal', 'no animal products']:
-            normalized_preferences.append('vegan')
-        elif pref_lower in ['gluten-free', 'gluten free', 'gluten_free', 'no gluten']:
-            normalized_preferences.append('gluten-free')
-        elif pref_lower in ['dairy-free', 'dairy free', 'no dairy', 'lactose-free']:
-            normalized_preferences.append('dairy-free')
-        elif pref_lower in ['nut-free', 'nut free', 'no nuts', 'peanut-free']:
-            normalized_preferences.append('nut-free')
-        else:
-            normalized_preferences.append(pref_lower)
+    normalized_preferences = [normalize_dietary_preference(pref) for pref in dietary_preferences]
     
     # Log the normalized preferences
     logger.debug(f"Checking dietary preferences: {normalized_preferences}")
     
     # Check each dietary preference
     for preference in normalized_preferences:
-        if preference == 'vegetarian':
-            # Check if any non-vegetarian ingredient is in the recipe
-            for ingredient in non_vegetarian_ingredients:
-                if any(re.search(r'\b' + re.escape(ingredient) + r'\b', ing) for ing in recipe_ingredients_lower):
-                    logger.debug(f"Recipe contains non-vegetarian ingredient: {ingredient}")
-                    return False
-                
-        elif preference == 'vegan':
-            # Check if any non-vegan ingredient is in the recipe
-            for ingredient in non_vegan_ingredients:
-                if any(re.search(r'\b' + re.escape(ingredient) + r'\b', ing) for ing in recipe_ingredients_lower):
-                    logger.debug(f"Recipe contains non-vegan ingredient: {ingredient}")
-                    return False
-                    
-        elif preference == 'gluten-free':
-            # Check if any gluten ingredient is in the recipe
-            for ingredient in gluten_ingredients:
-                if any(re.search(r'\b' + re.escape(ingredient) + r'\b', ing) for ing in recipe_ingredients_lower):
-                    logger.debug(f"Recipe contains gluten ingredient: {ingredient}")
-                    return False
-                    
-        elif preference == 'dairy-free':
-            # Check if any dairy ingredient is in the recipe
-            for ingredient in dairy_ingredients:
-                if any(re.search(r'\b' + re.escape(ingredient) + r'\b', ing) for ing in recipe_ingredients_lower):
-                    logger.debug(f"Recipe contains dairy ingredient: {ingredient}")
-                    return False
-                    
-        elif preference == 'nut-free':
-            # Check if any nut ingredient is in the recipe
-            for ingredient in nut_ingredients:
-                if any(re.search(r'\b' + re.escape(ingredient) + r'\b', ing) for ing in recipe_ingredients_lower):
-                    logger.debug(f"Recipe contains nut ingredient: {ingredient}")
-                    return False
+        if preference in DIETARY_RESTRICTED_INGREDIENTS and \
+                recipe_contains_restricted_ingredient(recipe_ingredients, preference):
+            logger.debug(f"Recipe does not meet dietary preference: {preference}")
+            return False
     
     # If we get here, all preferences were satisfied
     return True
 
+def top_k_positions(scores, k):
+    """
+    Get the positions of the k highest scores without sorting all of them.
+    
+    Parameters:
+    -----------
+    scores : numpy.ndarray
+        Score of each candidate
+    k : int
+        Number of positions to return
+        
+    Returns:
+    --------
+    numpy.ndarray
+        Positions of the top scores, best first; equal scores keep their
+        original order so repeated queries and pages are stable
+    """
+    num_scores = len(scores)
+    k = max(min(k, num_scores), 0)
+    if k == 0:
+        return np.array([], dtype=np.int64)
+    
+    if k < num_scores:
+        # Keep every score tied with the k-th best so ties are broken by position, not by partitioning
+        kth_score = np.partition(scores, num_scores - k)[num_scores - k]
+        candidates = np.flatnonzero(scores >= kth_score)
+    else:
+        candidates = np.arange(num_scores)
+    
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+# Ranked search results for the most recently used corpus, in least-recently-used order
+_result_cache = OrderedDict()
+_result_cache_version = None
+_result_cache_bytes = 0
+_result_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+_result_cache_lock = threading.Lock()
+
+def result_cache_stats():
+    """
+    Get hit and miss counts, the hit ratio and the current size of the result cache.
+    
+    Returns:
+    --------
+    dict
+        Hits, misses, hit ratio, evictions, invalidations, number of cached
+        searches and their approximate size in bytes.
+    """
+    with _result_cache_lock:
+        lookups = _result_cache_stats['hits'] + _result_cache_stats['misses']
+        return dict(
+            _result_cache_stats,
+            hit_ratio=_result_cache_stats['hits'] / lookups if lookups else 0.0,
+            size=len(_result_cache),
+            bytes=_result_cache_bytes
+        )
+
+def clear_result_cache():
+    """Remove all cached search results and reset the counters of the result cache."""
+    global _result_cache_version, _result_cache_bytes
+    with _result_cache_lock:
+        _result_cache.clear()
+        _result_cache_version = None
+        _result_cache_bytes = 0
+        _result_cache_stats.update(hits=0, misses=0, evictions=0, invalidations=0)
+
+def _result_cache_key(include_ingredients, exclude_ingredients, dietary_preferences, recipe_category, limit, config):
+    """
+    Build the result cache key of a search.
+    
+    The parameters are normalized by find_matching_recipes first (stripped
+    and lowercased, with dietary preferences mapped to one name). The
+    ingredient and preference lists are then deduplicated and sorted, since
+    the ranking does not depend on their order or on repeated entries.
+    """
+    return (
+        tuple(sorted(set(include_ingredients))),
+        tuple(sorted(set(exclude_ingredients))),
+        tuple(sorted(set(dietary_preferences))),
+        recipe_category,
+        limit,
+        config.MATCH_ENGINE
+    )
+
+def _ranked_size(key, ranked):
+    """Approximate the memory used by a result cache entry, in bytes."""
+    size = sys.getsizeof(key) + sum(sys.getsizeof(part) for part in key)
+    if ranked is not None:
+        for column, values in ranked.items():
+            if column == 'common_ingredients':
+                size += sys.getsizeof(values) + sum(
+                    sys.getsizeof(ingredients) + sum(sys.getsizeof(ingredient) for ingredient in ingredients)
+                    for ingredients in values
+                )
+            else:
+                size += values.nbytes
+    return size
+
+def _cached_result(key, recipe_index):
+    """
+    Look up a search in the result cache.
+    
+    The cache only holds results for one corpus; looking up a search on
+    another corpus (a reloaded DataFrame has a new recipe index version)
+    empties it first.
+    
+    Returns:
+    --------
+    tuple
+        (True, ranked results or None) on a hit, (False, None) on a miss.
+    """
+    global _result_cache_version, _result_cache_bytes
+    with _result_cache_lock:
+        if _result_cache_version != recipe_index.version:
+            if _result_cache:
+                _result_cache_stats['invalidations'] += 1
+            _result_cache.clear()
+            _result_cache_bytes = 0
+            _result_cache_version = recipe_index.version
+        
+        entry = _result_cache.get(key)
+        if entry is None:
+            _result_cache_stats['misses'] += 1
+            return False, None
+        _result_cache.move_to_end(key)
+        _result_cache_stats['hits'] += 1
+        return True, entry[0]
+
+def _store_result(key, recipe_index, ranked, config):
+    """Add ranked results to the result cache, evicting the least recently used entries."""
+    global _result_cache_bytes
+    size = _ranked_size(key, ranked)
+    with _result_cache_lock:
+        # Skip the store if the cache was switched to another corpus meanwhile
+        if _result_cache_version != recipe_index.version or size > config.RESULT_CACHE_MAX_BYTES:
+            return
+        previous = _result_cache.pop(key, None)
+        if previous is not None:
+            _result_cache_bytes -= previous[1]
+        _result_cache[key] = (ranked, size)
+        _result_cache_bytes += size
+        while len(_result_cache) > config.RESULT_CACHE_SIZE or _result_cache_bytes > config.RESULT_CACHE_MAX_BYTES:
+            _, (_, evicted_size) = _result_cache.popitem(last=False)
+            _result_cache_bytes -= evicted_size
+            _result_cache_stats['evictions'] += 1
+
+@timed('match')
 def find_matching_recipes(include_ingredients, exclude_ingredients, dietary_preferences, df_recipes, config, limit=5, recipe_category=None):
     """
     Find recipes that match the specified ingredients and dietary preferences.
     
+    When config.RESULT_CACHE_SIZE is positive, the ranked results are cached
+    on the normalized search parameters, so searches that parse the same way
+    are only ranked once per corpus.
+    
     Parameters:
     -----------
     include_ingredients : list
@@ -320,6 +674,9 @@ def find_matching_recipes(include_ingredients, exclude_ingredients, dietary_pref
     pandas.DataFrame
         DataFrame containing matching recipes, sorted by match score
     """
+    # Time each stage of the search for the /metrics endpoint
+    stages = StageTimer()
+    
     logger.info(f"Finding recipes with ingredients: {include_ingredients}")
     logger.info(f"Excluding ingredients: {exclude_ingredients}")
     logger.info(f"Dietary preferences: {dietary_preferences}")
@@ -336,6 +693,16 @@ def find_matching_recipes(include_ingredients, exclude_ingredients, dietary_pref
     include_ingredients = [ing for ing in include_ingredients if ing and len(ing) < 50]
     exclude_ingredients = [ing for ing in exclude_ingredients if ing and len(ing) < 50]
     
+    # Normalize the search the way it is compared with the recipes, so searches
+    # that differ only in case or spacing rank (and are cached) alike
+    include_ingredients = [ing.strip().lower() for ing in include_ingredients if ing.strip()]
+    exclude_ingredients = [ing.strip().lower() for ing in exclude_ingredients if ing.strip()]
+    dietary_preferences = [
+        normalize_dietary_preference(pref.strip()) for pref in dietary_preferences or [] if pref and pref.strip()
+    ]
+    if recipe_category:
+        recipe_category = recipe_category.strip().lower() or None
+    
     # No ingredients, category or preferences - return empty result
     if (not include_ingredients and not dietary_preferences and not recipe_category) or df_recipes.empty:
         logger.warning("No ingredients, category or dietary preferences specified, or empty recipe dataframe")
@@ -345,191 +712,73 @@ def find_matching_recipes(include_ingredients, exclude_ingredients, dietary_pref
     ingredients_col = config.CLEANED_INGREDIENTS_COLUMN
     name_col = config.RECIPE_NAME_COLUMN
     
-    # Add a match score column to the DataFrame
-    df_with_scores = df_recipes.copy()
-    
     # Check if the dataframe has the required columns
-    if ingredients_col not in df_with_scores.columns:
+    if ingredients_col not in df_recipes.columns:
         logger.error(f"Column '{ingredients_col}' not found in recipe dataframe")
         return pd.DataFrame()
     
-    if name_col not in df_with_scores.columns:
+    if name_col not in df_recipes.columns:
         logger.error(f"Column '{name_col}' not found in recipe dataframe")
         return pd.DataFrame()
     
-    # Apply category filter if specified
-    if recipe_category:
-        logger.info(f"Filtering by category: {recipe_category}")
-        
-        # Handle special categories and qualifiers
-        special_categories = {
-            'quick': ['quick', 'fast', 'rapid', 'ready in', 'minutes', '30 min', '15 min'],
-            'easy': ['easy', 'simple', 'basic', 'beginner', 'effortless'],
-            'fancy': ['fancy', 'gourmet', 'elegant', 'sophisticated', 'impressive', 'special'],
-            'party': ['party', 'gathering', 'entertaining', 'celebrate', 'celebration', 'guests'],
-            'dinner party': ['dinner party', 'entertaining', 'guests', 'gathering', 'formal dinner'],
-            'spicy': ['spicy', 'spice', 'hot', 'chili', 'pepper', 'jalapeño', 'cayenne'],
-            'bbq': ['bbq', 'barbecue', 'grill', 'grilled', 'cookout', 'outdoor cooking'],
-            'healthy': ['healthy', 'nutritious', 'light', 'low-fat', 'low-calorie', 'fitness', 'diet']
-        }
-        
-        # Check if we're dealing with a special category
-        special_category = None
-        for special, terms in special_categories.items():
-            if recipe_category == special or recipe_category.startswith(f"{special} "):
-                special_category = special
-                logger.info(f"Identified special category: {special_category}")
-                break
-        
-        # Create appropriate search terms based on the special category
-        if special_category:
-            # Get search terms for the special category
-            search_terms = special_categories[special_category]
-            
-            # If there's a combined category (e.g., "quick breakfast"), add the second part
-            if ' ' in recipe_category:
-                primary_category = recipe_category.split(' ', 1)[1]
-                logger.info(f"Combined category with primary: {primary_category}")
-                
-                # Create a separate mask for the primary category
-                primary_mask = None
-                
-                # First, try to find a dedicated category column
-                category_col = None
-                potential_category_cols = ['category', 'categories', 'type', 'dish_type', 'meal_type', 'recipe_type']
-                for col in potential_category_cols:
-                    if col in df_with_scores.columns:
-                        category_col = col
-                        break
-                
-                # Apply primary category filter
-                if category_col:
-                    primary_mask = df_with_scores[category_col].str.lower().str.contains(primary_category.lower(), na=False)
-                else:
-                    # Search in recipe name
-                    primary_mask = df_with_scores[name_col].str.lower().str.contains(primary_category.lower(), na=False)
-                    
-                    # Search in instruction text and other fields
-                    if config.INSTRUCTIONS_COLUMN in df_with_scores.columns:
-                        instr_mask = df_with_scores[config.INSTRUCTIONS_COLUMN].str.lower().str.contains(primary_category.lower(), na=False)
-                        primary_mask = primary_mask | instr_mask
-            
-            # Initialize mask for special category
-            special_mask = pd.Series(False, index=df_with_scores.index)
-            
-            # Apply masks for each search term in special category
-            for term in search_terms:
-                term_mask = False
-                
-                # Check in recipe name
-                name_contains = df_with_scores[name_col].str.lower().str.contains(term, na=False)
-                term_mask = term_mask | name_contains
-                
-                # Check in instructions
-                if config.INSTRUCTIONS_COLUMN in df_with_scores.columns:
-                    instr_contains = df_with_scores[config.INSTRUCTIONS_COLUMN].str.lower().str.contains(term, na=False)
-                    term_mask = term_mask | instr_contains
-                
-                # Check in description if available
-                if 'description' in df_with_scores.columns:
-                    desc_contains = df_with_scores['description'].str.lower().str.contains(term, na=False)
-                    term_mask = term_mask | desc_contains
-                
-                # Check in other potential columns
-                for col in ['tags', 'keywords', 'notes']:
-                    if col in df_with_scores.columns:
-                        try:
-                            if df_with_scores[col].dtype == 'object':
-                                if isinstance(df_with_scores[col].iloc[0], list):
-                                    # Handle list type columns
-                                    col_contains = df_with_scores[col].apply(
-                                        lambda x: any(term.lower() in str(tag).lower() for tag in x) if isinstance(x, list) else False
-                                    )
-                                else:
-                                    # Handle string type columns
-                                    col_contains = df_with_scores[col].str.lower().str.contains(term, na=False)
-                                term_mask = term_mask | col_contains
-                        except Exception as e:
-                            logger.warning(f"Error searching in {col} column: {e}")
-                
-                # Add this term's mask to the special category mask
-                special_mask = special_mask | term_mask
-            
-            # Combine masks if we have a primary category too
-            if ' ' in recipe_category and primary_mask is not None:
-                special_mask = special_mask & primary_mask
-            
-            # Apply the special category mask
-            df_with_scores = df_with_scores[special_mask]
-            logger.info(f"After special category filtering, found {len(df_with_scores)} recipes")
-            
-        else:
-            # First, try to find a dedicated category column
-            category_col = None
-            potential_category_cols = ['category', 'categories', 'type', 'dish_type', 'meal_type', 'recipe_type']
-            for col in potential_category_cols:
-                if col in df_with_scores.columns:
-                    category_col = col
-                    break
-            
-            # If we have a dedicated category column, use it
-            if category_col:
-                logger.info(f"Using {category_col} column for category filtering")
-                # Convert to lowercase for case-insensitive comparison
-                df_with_scores = df_with_scores[df_with_scores[category_col].str.lower().str.contains(recipe_category.lower(), na=False)]
-            else:
-                # Otherwise, search in multiple columns and in the recipe name
-                logger.info("No specific category column found, searching across multiple fields")
-                
-                # Start with recipe name
-                category_mask = df_with_scores[name_col].str.lower().str.contains(recipe_category.lower(), na=False)
-                
-                # Also search in tags if available
-                if 'tags' in df_with_scores.columns:
-                    try:
-                        if df_with_scores['tags'].dtype == 'object':
-                            tags_mask = df_with_scores['tags'].apply(
-                                lambda x: any(recipe_category.lower() in tag.lower() for tag in x) if isinstance(x, list) else False
-                            )
-                            category_mask = category_mask | tags_mask
-                    except Exception as e:
-                        logger.warning(f"Error searching in tags column: {e}")
-                
-                # Search in keywords if available
-                if 'keywords' in df_with_scores.columns:
-                    try:
-                        keywords_mask = df_with_scores['keywords'].str.lower().str.contains(recipe_category.lower(), na=False)
-                        category_mask = category_mask | keywords_mask
-                    except Exception as e:
-                        logger.warning(f"Error searching in keywords column: {e}")
-                
-                # Search in description if available
-                if 'description' in df_with_scores.columns:
-                    try:
-                        desc_mask = df_with_scores['description'].str.lower().str.contains(recipe_category.lower(), na=False)
-                        category_mask = category_mask | desc_mask
-                    except Exception as e:
-                        logger.warning(f"Error searching in description column: {e}")
-                        
-                # Search in instruction text if available (some recipes mention the meal type there)
-                if config.INSTRUCTIONS_COLUMN in df_with_scores.columns:
-                    try:
-                        instr_mask = df_with_scores[config.INSTRUCTIONS_COLUMN].str.lower().str.contains(recipe_category.lower(), na=False)
-                        category_mask = category_mask | instr_mask
-                    except Exception as e:
-                        logger.warning(f"Error searching in instructions column: {e}")
-                
-                # Apply the combined mask
-                df_with_scores = df_with_scores[category_mask]
-                
-                logger.info(f"After category filtering, found {len(df_with_scores)} recipes")
+    # MATCH_ENGINE may have been changed since the recipe index was built
+    check_match_engine(config)
+    recipe_index = get_recipe_index(df_recipes, config)
+    use_cache = config.RESULT_CACHE_SIZE > 0
+    if use_cache:
+        cache_key = _result_cache_key(
+            include_ingredients, exclude_ingredients, dietary_preferences, recipe_category, limit, config
+        )
+        hit, ranked = _cached_result(cache_key, recipe_index)
+    else:
+        hit = False
     
-    # If no recipes left after category filtering, return empty DataFrame
-    if df_with_scores.empty:
-        logger.info("No recipes found after category filtering")
+    if hit:
+        logger.info("Using cached results for this search")
+    else:
+        ranked = _rank_matching_recipes(
+            include_ingredients, exclude_ingredients, dietary_preferences, df_recipes, config,
+            limit, recipe_category, recipe_index, stages
+        )
+        if use_cache:
+            _store_result(cache_key, recipe_index, ranked, config)
+    
+    if ranked is None:
         return pd.DataFrame()
-        
-    # Calculate match scores based on ingredients
+    
+    # Only the returned recipes become rows
+    df_with_scores = df_recipes.iloc[ranked['positions']].copy()
+    df_with_scores['match_score'] = ranked['match_score']
+    common_ingredients = np.empty(len(df_with_scores), dtype=object)
+    common_ingredients[:] = [list(ingredients) for ingredients in ranked['common_ingredients']]
+    df_with_scores['common_ingredients'] = common_ingredients
+    for column in ['match_count', 'match_ratio', 'coverage_ratio']:
+        df_with_scores[column] = ranked[column]
+    if dietary_preferences:
+        df_with_scores['meets_preferences'] = True
+    
+    stages.lap('match_ranking')
+    
+    # Log the final count of recipes
+    logger.info(f"Returning {len(df_with_scores)} matching recipes")
+    
+    # Return top matching recipes with their full data
+    return df_with_scores
+
+def _rank_matching_recipes(include_ingredients, exclude_ingredients, dietary_preferences, df_recipes, config,
+                           limit, recipe_category, recipe_index, stages):
+    """
+    Rank the recipes for a search without the result cache; see find_matching_recipes.
+    
+    Returns:
+    --------
+    dict or None
+        Row positions of the best recipes in ranked order, with their
+        'match_score', 'match_count', 'match_ratio', 'coverage_ratio' and
+        'common_ingredients'; None if no recipe passes the filters
+    """
+    ingredients_col = config.CLEANED_INGREDIENTS_COLUMN
+    
     if include_ingredients:
         # Enhanced matching to better handle common ingredients
         # First, clean ingredients to handle standardization
@@ -554,46 +803,127 @@ def find_matching_recipes(include_ingredients, exclude_ingredients, dietary_pref
         cleaned_include = list(set(cleaned_include))
         logger.info(f"Expanded include ingredients: {cleaned_include}")
         
-        match_results = df_with_scores[ingredients_col].apply(
-            lambda recipe_ingredients: calculate_match_score(
-                cleaned_include, recipe_ingredients, exclude_ingredients
-            ) if isinstance(recipe_ingredients, list) else {}
+        # Only recipes in the posting lists of the requested ingredients can score above zero
+        candidate_positions = recipe_index.candidate_positions(cleaned_include)
+        logger.info(f"Ingredient index selected {len(candidate_positions)} candidate recipes")
+        
+        # Fuzzy matches of each requested ingredient in the recipe vocabulary, shared by all recipes
+        similar_terms = {ing: recipe_index.similar_terms(ing) for ing in cleaned_include}
+        row_positions = candidate_positions
+    else:
+        row_positions = np.arange(len(df_recipes))
+    stages.lap('match_candidates')
+    
+    def candidate_column(column):
+        # Values of a column for the recipes still in row_positions, without copying the other columns
+        if len(row_positions) == len(df_recipes):
+            return df_recipes[column]
+        return df_recipes[column].iloc[row_positions]
+    
+    # Apply category filter if specified
+    if recipe_category:
+        logger.info(f"Filtering by category: {recipe_category}")
+        
+        # Categories the parser produces are precomputed as bitmaps; others are searched in the recipe text
+        category_mask = recipe_index.category_index().contains(recipe_category, row_positions)
+        if category_mask is None:
+            logger.info(f"Category '{recipe_category}' is not indexed, searching the recipe text index")
+            category_mask = recipe_category_mask(
+                RecipeColumns(df_recipes, row_positions, recipe_index.text_index()), recipe_category, config
+            )
+        row_positions = row_positions[category_mask]
+        logger.info(f"After category filtering, found {len(row_positions)} recipes")
+    
+    stages.lap('match_category_filter')
+    
+    # If no recipes left after category filtering, return empty DataFrame
+    if len(row_positions) == 0:
+        logger.info("No recipes found after category filtering")
+        return None
+    
+    # Scores are kept in arrays aligned with row_positions; only the returned recipes become rows
+    num_candidates = len(row_positions)
+    common_ingredients = None
+    
+    # Calculate match scores based on ingredients
+    if include_ingredients and config.MATCH_ENGINE == 'sparse':
+        # Score every remaining recipe with sparse matrix products
+        match_results = calculate_match_scores_sparse(
+            cleaned_include, exclude_ingredients, df_recipes, row_positions, recipe_index, config
         )
-        df_with_scores['match_score'] = match_results.apply(lambda x: x.get('score', 0))
-        df_with_scores['common_ingredients'] = match_results.apply(lambda x: x.get('common_ingredients', []))
-        df_with_scores['match_count'] = match_results.apply(lambda x: x.get('match_count', 0))
-        df_with_scores['match_ratio'] = match_results.apply(lambda x: x.get('match_ratio', 0))
-        df_with_scores['coverage_ratio'] = match_results.apply(lambda x: x.get('coverage_ratio', 0))
+        scores = {
+            'match_score': match_results['score'],
+            'match_count': match_results['match_count'],
+            'match_ratio': match_results['match_ratio'],
+            'coverage_ratio': match_results['coverage_ratio']
+        }
+    elif include_ingredients:
+        match_results = [
+            calculate_match_score(
+                cleaned_include, recipe_ingredients, exclude_ingredients, similar_terms
+            ) if isinstance(recipe_ingredients, list) else {}
+            for recipe_ingredients in candidate_column(ingredients_col)
+        ]
+        scores = {
+            'match_score': np.array([x.get('score', 0) for x in match_results], dtype=float),
+            'match_count': np.array([x.get('match_count', 0) for x in match_results], dtype=np.int64),
+            'match_ratio': np.array([x.get('match_ratio', 0) for x in match_results], dtype=float),
+            'coverage_ratio': np.array([x.get('coverage_ratio', 0) for x in match_results], dtype=float)
+        }
+        common_ingredients = np.empty(num_candidates, dtype=object)
+        common_ingredients[:] = [x.get('common_ingredients', []) for x in match_results]
     else:
         # If no ingredients provided, set a default match score
-        df_with_scores['match_score'] = 1.0
-        df_with_scores['common_ingredients'] = df_with_scores.apply(lambda _: [], axis=1)
-        df_with_scores['match_count'] = 0
-        df_with_scores['match_ratio'] = 0
-        df_with_scores['coverage_ratio'] = 0
+        scores = {
+            'match_score': np.ones(num_candidates),
+            'match_count': np.zeros(num_candidates, dtype=np.int64),
+            'match_ratio': np.zeros(num_candidates, dtype=np.int64),
+            'coverage_ratio': np.zeros(num_candidates, dtype=np.int64)
+        }
+    stages.lap('match_scoring')
+    
+    def keep_candidates(mask):
+        # Drop the candidates (and their scores) where mask is False
+        nonlocal row_positions, scores, common_ingredients
+        row_positions = row_positions[mask]
+        scores = {column: values[mask] for column, values in scores.items()}
+        if common_ingredients is not None:
+            common_ingredients = common_ingredients[mask]
     
     # Apply dietary preference filter
     if dietary_preferences:
         logger.info(f"Applying dietary preference filter: {dietary_preferences}")
         
-        # Filter recipes based on dietary preferences
-        df_with_scores['meets_preferences'] = df_with_scores[ingredients_col].apply(
-            lambda recipe_ingredients: check_dietary_preferences(
-                recipe_ingredients, dietary_preferences
-            ) if isinstance(recipe_ingredients, list) else False
-        )
+        # Filter recipes based on dietary preferences, using the flags precomputed by the loader
+        flag_columns = [
+            DIETARY_FLAG_COLUMNS[preference]
+            for preference in {normalize_dietary_preference(pref) for pref in dietary_preferences}
+            if preference in DIETARY_RESTRICTED_INGREDIENTS
+        ]
+        if all(column in df_recipes.columns for column in flag_columns):
+            meets_preferences = np.ones(num_candidates, dtype=bool)
+            for column in flag_columns:
+                meets_preferences &= df_recipes[column].to_numpy(dtype=bool)[row_positions]
+        else:
+            logger.debug("Dietary flag columns not found, checking recipes one by one")
+            meets_preferences = np.array([
+                check_dietary_preferences(
+                    recipe_ingredients, dietary_preferences
+                ) if isinstance(recipe_ingredients, list) else False
+                for recipe_ingredients in candidate_column(ingredients_col)
+            ], dtype=bool)
         
         # Log the count of recipes meeting preferences
-        meets_prefs_count = df_with_scores['meets_preferences'].sum()
-        logger.info(f"Found {meets_prefs_count} recipes meeting dietary preferences")
+        logger.info(f"Found {meets_preferences.sum()} recipes meeting dietary preferences")
         
         # Keep only recipes that meet dietary preferences
-        df_with_scores = df_with_scores[df_with_scores['meets_preferences']]
+        keep_candidates(meets_preferences)
+    stages.lap('match_dietary_filter')
     
     # If no recipes left after all filtering, return empty DataFrame
-    if df_with_scores.empty:
+    if len(row_positions) == 0:
         logger.info("No recipes found after all filtering")
-        return pd.DataFrame()
+        return None
     
     # Extra filtering to ensure ALL requested ingredients are present
     if include_ingredients and len(include_ingredients) > 1:
@@ -604,31 +934,40 @@ def find_matching_recipes(include_ingredients, exclude_ingredients, dietary_pref
         
         # Only keep recipes that contain all requested ingredients
         # We use match_count >= user_ing_count * 0.9 to allow for some flexibility in matching
-        df_with_scores = df_with_scores[df_with_scores['match_count'] >= user_ing_count * 0.9]
+        has_all_ingredients = scores['match_count'] >= user_ing_count * 0.9
         
         # Log the count of recipes after ingredient filtering
-        logger.info(f"After ensuring all ingredients present: {len(df_with_scores)} recipes")
+        logger.info(f"After ensuring all ingredients present: {has_all_ingredients.sum()} recipes")
         
-        # If no recipes after strict filtering, fall back to the original list but mark it
-        if df_with_scores.empty:
+        # If no recipes after strict filtering, fall back to the scored partial matches
+        if has_all_ingredients.any():
+            keep_candidates(has_all_ingredients)
+        else:
             logger.info("No recipes with ALL ingredients, falling back to partial matches")
-            # We can return to the original approach in this case
-            df_with_scores = df_recipes.copy()
-            df_with_scores = df_with_scores.sort_values('match_score', ascending=False)
-    
-    # Sort by match score in descending order
-    df_with_scores = df_with_scores.sort_values('match_score', ascending=False)
     
     # Apply minimum score threshold if there are user ingredients
     if include_ingredients:
         min_score_threshold = 0.1  # Minimum score to consider a recipe
-        df_with_scores = df_with_scores[df_with_scores['match_score'] >= min_score_threshold]
+        keep_candidates(scores['match_score'] >= min_score_threshold)
     
-    # Log the final count of recipes
-    logger.info(f"Returning {len(df_with_scores.head(limit))} matching recipes")
+    # Keep the best recipes by match score, ties in dataset order
+    top = top_k_positions(scores['match_score'], limit)
+    ranked = {column: values[top] for column, values in scores.items()}
+    ranked['positions'] = row_positions[top]
     
-    # Return top matching recipes with their full data
-    return df_with_scores.head(limit)
+    # The sparse engine only scores; list the matched ingredients for the returned recipes
+    if common_ingredients is not None:
+        ranked['common_ingredients'] = list(common_ingredients[top])
+    elif include_ingredients:
+        ranked['common_ingredients'] = [
+            calculate_match_score(
+                cleaned_include, recipe_ingredients, exclude_ingredients, similar_terms
+            )['common_ingredients'] if isinstance(recipe_ingredients, list) else []
+            for recipe_ingredients in df_recipes[ingredients_col].iloc[ranked['positions']]
+        ]
+    else:
+        ranked['common_ingredients'] = [[] for _ in range(len(top))]
+    return ranked
 
 def get_detailed_recipe(recipe_name, df_recipes, config):
     """
@@ -656,36 +995,59 @@ def get_detailed_recipe(recipe_name, df_recipes, config):
         logger.error(f"Column '{name_col}' not found in recipe dataframe")
         return None
     
-    # Try exact matching first
-    recipe_match = df_recipes[df_recipes[name_col] == recipe_name]
-    
-    # If no exact match, try fuzzy matching
-    if recipe_match.empty:
-        # Try partial string matching
-        recipe_match = df_recipes[df_recipes[name_col].str.contains(recipe_name, case=False, regex=False)]
-        
-        # If still no match, try more aggressive fuzzy matching
-        if recipe_match.empty:
-            best_match = None
-            best_score = 0
-            
-            for _, row in df_recipes.iterrows():
-                curr_name = row[name_col]
-                score = fuzz.ratio(recipe_name.lower(), curr_name.lower())
-                
-                if score > 70 and score > best_score:  # 70% threshold
-                    best_match = row
-                    best_score = score
-            
-            if best_match is not None:
-                recipe_match = pd.DataFrame([best_match])
+    # Exact title, then case-insensitive substring, then the best fuzzy match (70% threshold)
+    position = get_recipe_index(df_recipes, config).title_index().find(recipe_name)
     
     # Return None if no match found
-    if recipe_match.empty:
+    if position is None:
+        return None
+    
+    return recipe_details_from_row(df_recipes.iloc[position], config)
+
+def get_recipe_details_by_id(recipe_id, df_recipes, config):
+    """
+    Get detailed information about a recipe from its id.
+    
+    The recipe is found through the recipe index, so this takes constant time
+    and returns the exact recipe even when several recipes share its name.
+    
+    Parameters:
+    -----------
+    recipe_id : int or str
+        Recipe id, from the 'id' column or the index label when there is none
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    config : module
+        Configuration module
+        
+    Returns:
+    --------
+    dict or None
+        Dictionary with recipe details or None if the id is unknown
+    """
+    position = get_recipe_index(df_recipes, config).position_of(recipe_id)
+    if position is None:
+        logger.warning(f"Recipe id {recipe_id} not found")
         return None
+    return recipe_details_from_row(df_recipes.iloc[position], config)
+
+def recipe_details_from_row(recipe, config):
+    """
+    Extract the details shown to the user from a recipe row.
     
-    # Get the first matching recipe (in case there are multiple)
-    recipe = recipe_match.iloc[0]
+    Parameters:
+    -----------
+    recipe : pandas.Series
+        Row of the recipe DataFrame
+    config : module
+        Configuration module
+        
+    Returns:
+    --------
+    dict
+        Dictionary with recipe details
+    """
+    name_col = config.RECIPE_NAME_COLUMN
     
     # Extract recipe details
     recipe_details = {
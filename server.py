@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+# coding: utf-8
+"""
+Production server for the Recipe Bot web interface.
+The master process loads and indexes the recipe corpus once, then forks
+worker processes that serve requests on a shared listening socket. The
+workers inherit the corpus copy-on-write instead of loading their own copy.
+Only POSIX systems can fork; elsewhere use app.py.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Fields of /proc/<pid>/smaps_rollup reported by memory_usage, in kB
+_SMAPS_FIELDS = {
+    'Rss': 'rss_kb',
+    'Pss': 'pss_kb',
+    'Shared_Clean': 'shared_clean_kb',
+    'Shared_Dirty': 'shared_dirty_kb',
+    'Private_Clean': 'private_clean_kb',
+    'Private_Dirty': 'private_dirty_kb'
+}
+
+
+def memory_usage(pid):
+    """
+    Get the memory used by a process, split into shared and private pages.
+
+    Parameters:
+    -----------
+    pid : int
+        Process id
+
+    Returns:
+    --------
+    dict or None
+        RSS, PSS and shared/private page sizes in kB, plus 'private_kb', the
+        memory the process does not share with any other; None if the
+        platform does not expose /proc/<pid>/smaps_rollup
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps:
+            lines = smaps.readlines()
+    except OSError:
+        return None
+
+    usage = {}
+    for line in lines:
+        field, _, value = line.partition(':')
+        if field in _SMAPS_FIELDS:
+            usage[_SMAPS_FIELDS[field]] = int(value.split()[0])
+    usage['private_kb'] = usage.get('private_clean_kb', 0) + usage.get('private_dirty_kb', 0)
+    return usage
+
+
+def log_memory_report(master_pid, worker_pids):
+    """
+    Log the memory of the master and of each worker.
+
+    A worker's private memory is what it adds on top of the corpus it shares
+    with the master, so hosts need about master RSS + workers x private.
+
+    Parameters:
+    -----------
+    master_pid : int
+        Process id of the master
+    worker_pids : list
+        Process ids of the workers
+    """
+    master = memory_usage(master_pid)
+    if master is None:
+        logger.info("Memory report unavailable: /proc/<pid>/smaps_rollup not found")
+        return
+
+    logger.info(f"Master {master_pid}: RSS {master['rss_kb'] / 1024:.1f} MB, PSS {master['pss_kb'] / 1024:.1f} MB")
+    private_sizes = []
+    for pid in worker_pids:
+        usage = memory_usage(pid)
+        if usage is None:
+            continue
+        private_sizes.append(usage['private_kb'])
+        logger.info(f"Worker {pid}: RSS {usage['rss_kb'] / 1024:.1f} MB, PSS {usage['pss_kb'] / 1024:.1f} MB, "
+                    f"private {usage['private_kb'] / 1024:.1f} MB")
+    if private_sizes:
+        mean_private = sum(private_sizes) / len(private_sizes)
+        logger.info(f"Per-worker RSS increment: {mean_private / 1024:.1f} MB on average; "
+                    f"estimated total for {len(private_sizes)} workers: "
+                    f"{(master['rss_kb'] + sum(private_sizes)) / 1024:.1f} MB")
+
+
+def warm_up(web_app):
+    """
+    Build the structures that are otherwise built on first use, so that the
+    workers share them instead of each building a private copy.
+
+    Parameters:
+    -----------
+    web_app : module
+        The imported app module holding recipes_df and canonical_ingredients
+    """
+    from nlu_parser import get_ingredient_lookup
+    from recipe_index import get_recipe_index
+
+    recipe_index = get_recipe_index(web_app.recipes_df, config)
+    recipe_index.title_index()
+    recipe_index.text_index()
+    recipe_index.category_index()
+    if config.MATCH_ENGINE == 'sparse':
+        recipe_index.ingredient_matrix()
+    get_ingredient_lookup(web_app.canonical_ingredients)
+
+
+def run_worker(web_app, host, port, listen_fd, ready_fd=None):
+    """
+    Serve requests on the shared socket until the process is terminated.
+
+    Parameters:
+    -----------
+    web_app : module
+        The imported app module
+    host : str
+        Address the socket listens on
+    port : int
+        Port the socket listens on
+    listen_fd : int
+        File descriptor of the listening socket
+    ready_fd : int, optional
+        Write end of the pipe used to tell the master the worker is serving
+    """
+    from werkzeug.serving import make_server
+
+    # The master handles Ctrl+C and stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    server = make_server(host, port, web_app.app, threaded=True, fd=listen_fd)
+    if ready_fd is not None:
+        os.write(ready_fd, b'1')
+        os.close(ready_fd)
+    server.serve_forever()
+
+
+def serve(host, port, workers, report_interval=0):
+    """
+    Load the corpus, fork the workers and supervise them.
+
+    Workers that exit are replaced. SIGINT or SIGTERM stops all workers.
+
+    Parameters:
+    -----------
+    host : str
+        Address to listen on
+    port : int
+        Port to listen on
+    workers : int
+        Number of worker processes
+    report_interval : float, optional
+        Seconds between memory reports after the first one (0 reports once). Default is 0.
+    """
+    if not hasattr(os, 'fork'):
+        raise RuntimeError("server.py needs os.fork; use app.py on this platform")
+
+    # Importing the app loads and indexes the corpus once, in the master
+    import app as web_app
+    warm_up(web_app)
+
+    if workers > 1 and config.SESSION_BACKEND == 'memory':
+        logger.warning("Sessions are kept per worker with SESSION_BACKEND = 'memory'; "
+                       "set it to 'sqlite' so that all workers share them")
+
+    # Keep the garbage collector from touching the inherited corpus objects,
+    # which would copy their pages into every worker
+    gc.collect()
+    gc.freeze()
+
+    listener = socket.create_server((host, port), backlog=128)
+    listener.set_inheritable(True)
+    ready_read, ready_write = os.pipe()
+
+    worker_pids = set()
+
+    def spawn_worker(ready_fd=None):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                if ready_fd is not None:
+                    os.close(ready_read)
+                run_worker(web_app, host, port, listener.fileno(), ready_fd)
+            finally:
+                os._exit(1)
+        worker_pids.add(pid)
+        return pid
+
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    for _ in range(workers):
+        spawn_worker(ready_write)
+    os.close(ready_write)
+
+    # Wait until every worker is serving before the first memory report;
+    # the pipe closes early if all workers exit during startup
+    ready = 0
+    while ready < workers:
+        signals = os.read(ready_read, workers - ready)
+        if not signals:
+            break
+        ready += len(signals)
+    os.close(ready_read)
+    if ready < workers:
+        logger.error(f"Only {ready} of {workers} workers started")
+    logger.info(f"Serving on http://{host}:{port}/ with {workers} workers (master pid {os.getpid()})")
+    log_memory_report(os.getpid(), sorted(worker_pids))
+    next_report = time.monotonic() + report_interval if report_interval else None
+
+    while not stopping:
+        time.sleep(1)
+        # Replace workers that exited
+        while worker_pids:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            worker_pids.discard(pid)
+            if not stopping:
+                logger.warning(f"Worker {pid} exited with status {status}, starting a new one")
+                spawn_worker()
+        if next_report is not None and time.monotonic() >= next_report:
+            log_memory_report(os.getpid(), sorted(worker_pids))
+            next_report = time.monotonic() + report_interval
+
+    logger.info("Stopping workers")
+    for pid in worker_pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in worker_pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    listener.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Recipe Bot production server')
+    parser.add_argument('--host', default=config.SERVER_HOST, help='Address to listen on')
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=config.SERVER_WORKERS, help='Number of worker processes')
+    parser.add_argument('--report-interval', type=float, default=config.MEMORY_REPORT_INTERVAL,
+                        help='Seconds between worker memory reports (0 reports once at startup)')
+    args = parser.parse_args()
+
+    serve(args.host, args.port, max(1, args.workers), args.report_interval)
@@ -0,0 +1,442 @@
+"""
+Session store module for Recipe Bot.
+This module contains the stores that keep each chat session's context between
+requests, with idle expiry, a cap on the number of sessions and a background
+sweeper. Sessions live in process memory or in a local SQLite file that
+several server processes can share.
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def new_session_context():
+    """
+    Create the context of a new chat session.
+
+    Returns:
+    --------
+    dict
+        Empty session context
+    """
+    return {
+        'last_search_results': None,
+        'current_page': 0,
+        'recipes_per_page': 5
+    }
+
+
+def _estimate_size(obj):
+    """Approximate the memory used by a JSON-like object, in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_estimate_size(key) + _estimate_size(value) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_estimate_size(item) for item in obj)
+    return size
+
+
+def _to_json(value):
+    """Convert numpy scalars such as recipe ids to plain Python values for JSON."""
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SessionStore(ABC):
+    """
+    Base class for session stores.
+
+    Sessions that have not been used for ttl_seconds expire, and once there
+    are more than max_sessions the least recently used ones are evicted.
+
+    Parameters:
+    -----------
+    ttl_seconds : float
+        Idle time after which a session expires (None keeps sessions until evicted)
+    max_sessions : int
+        Maximum number of sessions kept (None for no limit)
+    clock : callable, optional
+        Function returning the current time in seconds. Default is time.time.
+    """
+
+    def __init__(self, ttl_seconds, max_sessions, clock=time.time):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._sweeper = None
+        self._sweep_interval = None
+        self._stop_sweeper = threading.Event()
+
+        # Forked server workers inherit the store but not its sweeper thread
+        if hasattr(os, 'register_at_fork'):
+            store = weakref.ref(self)
+            os.register_at_fork(after_in_child=lambda: store() is not None and store()._after_fork_in_child())
+
+    @abstractmethod
+    def get(self, session_id):
+        """
+        Get the context of a session and mark the session as used.
+
+        Parameters:
+        -----------
+        session_id : str
+            Session identifier
+
+        Returns:
+        --------
+        dict or None
+            Session context, or None if the session is unknown or expired
+        """
+
+    @abstractmethod
+    def set(self, session_id, context):
+        """
+        Store the context of a session and mark the session as used.
+
+        Parameters:
+        -----------
+        session_id : str
+            Session identifier
+        context : dict
+            Session context
+        """
+
+    @abstractmethod
+    def delete(self, session_id):
+        """
+        Remove a session.
+
+        Parameters:
+        -----------
+        session_id : str
+            Session identifier
+        """
+
+    @abstractmethod
+    def sweep(self):
+        """
+        Remove all expired sessions.
+
+        Returns:
+        --------
+        int
+            Number of sessions removed
+        """
+
+    @abstractmethod
+    def stats(self):
+        """
+        Get the size of the store and its eviction counters.
+
+        Returns:
+        --------
+        dict
+            Number of sessions, approximate bytes used, and counts of expired
+            and evicted sessions
+        """
+
+    def get_or_create(self, session_id):
+        """
+        Get the context of a session, starting a new session if needed.
+
+        Parameters:
+        -----------
+        session_id : str
+            Session identifier
+
+        Returns:
+        --------
+        dict
+            Session context
+        """
+        context = self.get(session_id)
+        return context if context is not None else new_session_context()
+
+    def start_sweeper(self, interval_seconds):
+        """
+        Start a daemon thread that removes expired sessions periodically.
+
+        Parameters:
+        -----------
+        interval_seconds : float
+            Time between sweeps
+        """
+        if self._sweeper is not None or not self.ttl_seconds:
+            return
+
+        def run():
+            while not self._stop_sweeper.wait(interval_seconds):
+                try:
+                    removed = self.sweep()
+                    if removed:
+                        logger.info(f"Session sweeper removed {removed} expired sessions")
+                    logger.debug(f"Session store stats: {self.stats()}")
+                except Exception as e:
+                    logger.error(f"Error sweeping sessions: {e}")
+
+        self._stop_sweeper.clear()
+        self._sweep_interval = interval_seconds
+        self._sweeper = threading.Thread(target=run, name='session-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the sweeper thread if it is running."""
+        if self._sweeper is not None:
+            self._stop_sweeper.set()
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _after_fork_in_child(self):
+        """Reset per-process state in a forked child and restart its sweeper."""
+        self._stop_sweeper = threading.Event()
+        if self._sweeper is not None:
+            self._sweeper = None
+            self.start_sweeper(self._sweep_interval)
+
+    def _is_expired(self, last_access, now):
+        """Check if a session last used at last_access has expired."""
+        return bool(self.ttl_seconds) and now - last_access > self.ttl_seconds
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Session store kept in the memory of the current process.
+
+    Parameters:
+    -----------
+    ttl_seconds : float
+        Idle time after which a session expires (None keeps sessions until evicted)
+    max_sessions : int
+        Maximum number of sessions kept (None for no limit)
+    clock : callable, optional
+        Function returning the current time in seconds. Default is time.time.
+    """
+
+    def __init__(self, ttl_seconds, max_sessions, clock=time.time):
+        super().__init__(ttl_seconds, max_sessions, clock)
+        # Session id -> (context, last access time), least recently used first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._expired = 0
+        self._evicted = 0
+
+    def _after_fork_in_child(self):
+        # The lock may have been held by another thread of the parent
+        self._lock = threading.Lock()
+        super()._after_fork_in_child()
+
+    def get(self, session_id):
+        now = self.clock()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            context, last_access = entry
+            if self._is_expired(last_access, now):
+                del self._sessions[session_id]
+                self._expired += 1
+                return None
+            self._sessions[session_id] = (context, now)
+            self._sessions.move_to_end(session_id)
+            return context
+
+    def set(self, session_id, context):
+        now = self.clock()
+        with self._lock:
+            self._sessions[session_id] = (context, now)
+            self._sessions.move_to_end(session_id)
+            while self.max_sessions and len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evicted += 1
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def sweep(self):
+        if not self.ttl_seconds:
+            return 0
+        now = self.clock()
+        removed = 0
+        with self._lock:
+            # Sessions are ordered by last access, so stop at the first live one
+            while self._sessions:
+                session_id, (_, last_access) = next(iter(self._sessions.items()))
+                if not self._is_expired(last_access, now):
+                    break
+                del self._sessions[session_id]
+                removed += 1
+            self._expired += removed
+        return removed
+
+    def stats(self):
+        with self._lock:
+            contexts = [context for context, _ in self._sessions.values()]
+            return {
+                'backend': 'memory',
+                'sessions': len(contexts),
+                'approx_bytes': sum(_estimate_size(context) for context in contexts),
+                'expired': self._expired,
+                'evicted': self._evicted
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Session store kept in a local SQLite file shared by all server processes.
+
+    Contexts are stored as JSON, so they must hold plain values such as the
+    recipe ids in last_search_results.
+
+    Parameters:
+    -----------
+    db_path : str
+        Path to the SQLite database file
+    ttl_seconds : float
+        Idle time after which a session expires (None keeps sessions until evicted)
+    max_sessions : int
+        Maximum number of sessions kept (None for no limit)
+    clock : callable, optional
+        Function returning the current time in seconds. Default is time.time.
+    """
+
+    def __init__(self, db_path, ttl_seconds, max_sessions, clock=time.time):
+        super().__init__(ttl_seconds, max_sessions, clock)
+        self.db_path = db_path
+        self._local = threading.local()
+        # Eviction counts are per process; the database only holds the sessions
+        self._counter_lock = threading.Lock()
+        self._expired = 0
+        self._evicted = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, context TEXT NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+
+    def _connection(self):
+        """Get this thread's connection to the database, opening it on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            # WAL lets readers in other processes continue while one process writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _after_fork_in_child(self):
+        # SQLite connections must not be shared with the parent process
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        super()._after_fork_in_child()
+
+    def _count(self, counter, amount):
+        """Add to one of the expired/evicted counters."""
+        if amount > 0:
+            with self._counter_lock:
+                setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, session_id):
+        now = self.clock()
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT context, last_access FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            context, last_access = row
+            if self._is_expired(last_access, now):
+                connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._count('_expired', 1)
+                return None
+            connection.execute("UPDATE sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+        return json.loads(context)
+
+    def set(self, session_id, context):
+        now = self.clock()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, context, last_access) VALUES (?, ?, ?)",
+                (session_id, json.dumps(context, default=_to_json), now)
+            )
+            if self.max_sessions:
+                evicted = connection.execute(
+                    "DELETE FROM sessions WHERE session_id IN ("
+                    "SELECT session_id FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_sessions,)
+                ).rowcount
+                self._count('_evicted', evicted)
+
+    def delete(self, session_id):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def sweep(self):
+        if not self.ttl_seconds:
+            return 0
+        with self._connection() as connection:
+            removed = connection.execute(
+                "DELETE FROM sessions WHERE last_access < ?", (self.clock() - self.ttl_seconds,)
+            ).rowcount
+        self._count('_expired', removed)
+        return removed
+
+    def stats(self):
+        sessions, context_bytes = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(context)), 0) FROM sessions"
+        ).fetchone()
+        with self._counter_lock:
+            return {
+                'backend': 'sqlite',
+                'sessions': sessions,
+                'approx_bytes': context_bytes,
+                'expired': self._expired,
+                'evicted': self._evicted
+            }
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def create_session_store(config):
+    """
+    Create the session store selected in the configuration.
+
+    Parameters:
+    -----------
+    config : module
+        Configuration module with the SESSION_* settings
+
+    Returns:
+    --------
+    SessionStore
+        Memory or SQLite session store
+    """
+    if config.SESSION_BACKEND == 'sqlite':
+        logger.info(f"Using SQLite session store at {config.SESSION_DB_PATH}")
+        return SQLiteSessionStore(config.SESSION_DB_PATH, config.SESSION_TTL_SECONDS, config.MAX_SESSIONS)
+    if config.SESSION_BACKEND != 'memory':
+        raise ValueError(f"Unknown session backend: {config.SESSION_BACKEND}")
+    return MemorySessionStore(config.SESSION_TTL_SECONDS, config.MAX_SESSIONS)
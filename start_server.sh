@@ -18,7 +18,13 @@ fi
 echo "Checking dependencies..."
 pip install -r requirements.txt
 
-# Run the Flask app
+# Run the Flask app, or the multi-worker server with "./start_server.sh --serve [--workers N]"
 echo ""
-echo "Starting Flask server..."
-python app.py 
\ No newline at end of file
+if [ "$1" = "--serve" ]; then
+    shift
+    echo "Starting multi-worker server..."
+    python server.py "$@"
+else
+    echo "Starting Flask server..."
+    python app.py
+fi
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Test script for the category index.
+This checks that the precomputed category bitmaps select the same recipes as
+searching the recipe text, including special categories combined with a meal
+type, and that categories without a bitmap are still searched.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from category_index import (CategoryIndex, RecipeColumns, RECIPE_CATEGORY_TERMS, SPECIAL_CATEGORY_TERMS,
+                            recipe_category_mask)
+from recipe_index import build_recipe_index
+from recipe_matcher import find_matching_recipes
+
+def build_test_recipes():
+    """Build a DataFrame of recipes whose names and instructions mention categories."""
+    recipes = [
+        ("Quick Breakfast Burrito", "Ready in 15 min. Serve hot.", ['egg', 'tortilla']),
+        ("Easy Chicken Soup", "Simmer the broth for an hour.", ['chicken', 'broth']),
+        ("Chocolate Cake", "Bake and serve as dessert at a party for guests.", ['flour', 'cocoa']),
+        ("Grilled Steak Dinner", "Grill over high heat.", ['beef']),
+        ("Spicy Chili", "Add cayenne pepper to taste.", ['beans', 'chili']),
+        ("Green Salad", None, ['lettuce']),
+    ]
+    return pd.DataFrame([
+        {config.RECIPE_NAME_COLUMN: name, config.INSTRUCTIONS_COLUMN: instructions,
+         config.CLEANED_INGREDIENTS_COLUMN: ingredients, 'id': i}
+        for i, (name, instructions, ingredients) in enumerate(recipes)
+    ])
+
+def test_bitmaps_match_text_search():
+    """Every indexed category selects the same recipes as a text search."""
+    df_recipes = build_test_recipes()
+    category_index = CategoryIndex(df_recipes, config)
+    positions = np.arange(len(df_recipes))
+
+    categories = list(SPECIAL_CATEGORY_TERMS) + list(RECIPE_CATEGORY_TERMS) + ['quick breakfast', 'party dessert']
+    for recipe_category in categories:
+        expected = recipe_category_mask(RecipeColumns(df_recipes), recipe_category, config)
+        assert category_index.contains(recipe_category, positions).tolist() == expected.tolist(), recipe_category
+
+    # Only some of the recipes can be checked at once
+    assert category_index.contains('quick', np.array([4, 0])).tolist() == [False, True]
+
+def test_unindexed_categories_are_searched():
+    """Categories without a bitmap are found by searching the recipe text."""
+    df_recipes = build_test_recipes()
+    category_index = build_recipe_index(df_recipes, config).category_index()
+    assert category_index.contains('steak', np.arange(len(df_recipes))) is None
+
+    matches = find_matching_recipes([], [], [], df_recipes, config, limit=5, recipe_category='steak')
+    assert matches[config.RECIPE_NAME_COLUMN].tolist() == ["Grilled Steak Dinner"]
+
+def test_matcher_filters_by_category():
+    """Searches with a category only return recipes in that category."""
+    df_recipes = build_test_recipes()
+    build_recipe_index(df_recipes, config).category_index()
+
+    matches = find_matching_recipes([], [], [], df_recipes, config, limit=5, recipe_category='quick breakfast')
+    assert matches[config.RECIPE_NAME_COLUMN].tolist() == ["Quick Breakfast Burrito"]
+
+    matches = find_matching_recipes(['chicken'], [], [], df_recipes, config, limit=5, recipe_category='soup')
+    assert matches[config.RECIPE_NAME_COLUMN].tolist() == ["Easy Chicken Soup"]
+
+def test_concurrent_first_use_builds_one_index():
+    """Threads asking for the category index at the same time all get the same index."""
+    recipe_index = build_recipe_index(build_test_recipes(), config)
+    start = threading.Barrier(8)
+    category_indexes = []
+
+    def first_use():
+        start.wait()
+        category_indexes.append(recipe_index.category_index())
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(category_indexes) == 8
+    assert all(category_index is category_indexes[0] for category_index in category_indexes)
+
+if __name__ == "__main__":
+    print("Testing category index")
+    print("=" * 50)
+
+    test_bitmaps_match_text_search()
+    print("Category bitmaps match a text search")
+
+    test_unindexed_categories_are_searched()
+    print("Unindexed categories are searched in the recipe text")
+
+    test_matcher_filters_by_category()
+    print("The matcher filters searches by category")
+
+    test_concurrent_first_use_builds_one_index()
+    print("Concurrent first use builds a single category index")
@@ -0,0 +1,128 @@
+"""
+Test script for the corpus cache.
+This checks that a second startup loads the prepared corpus from the cache
+with the same recipes, ids and canonical ingredients as a cold load, that
+settings changing the cleaned output select another cache file, and that a
+damaged cache file falls back to a cold load.
+"""
+
+import json
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+import corpus_cache
+import main
+from corpus_cache import corpus_cache_path
+
+# Object layout dataset; one recipe carries its own integer id and one has no instructions
+RECIPES = {
+    'pancakes': {'title': 'Pancakes', 'ingredients': ['1 cup flour', '2 eggs', 'milk'],
+                 'instructions': 'Whisk and fry.'},
+    'soup': {'title': 'Tomato Soup', 'ingredients': ['4 tomatoes', '1 onion, chopped'], 'id': 3},
+    'toast': {'title': 'Toast', 'ingredients': ['bread', 'butter'], 'instructions': 'Toast the bread.'},
+}
+
+@contextmanager
+def temporary_dataset():
+    """Point the configuration at a small dataset and an empty cache directory."""
+    settings = ['DATASET_PATH', 'CORPUS_CACHE_DIR', 'USE_CORPUS_CACHE', 'LIMIT_RECIPES', 'CLEANING_WORKERS']
+    original = {setting: getattr(config, setting) for setting in settings}
+    with tempfile.TemporaryDirectory() as directory:
+        dataset_path = Path(directory) / 'recipes.json'
+        dataset_path.write_text(json.dumps(RECIPES), encoding='utf-8')
+        config.DATASET_PATH = str(dataset_path)
+        config.CORPUS_CACHE_DIR = str(Path(directory) / 'cache')
+        config.USE_CORPUS_CACHE = True
+        config.LIMIT_RECIPES = None
+        config.CLEANING_WORKERS = 1
+        try:
+            yield
+        finally:
+            for setting, value in original.items():
+                setattr(config, setting, value)
+
+def load_counting_cold_loads():
+    """Run load_and_prepare_data, returning its result and whether it loaded the dataset itself."""
+    cold_loads = []
+    original_load_corpus = main.load_corpus
+
+    def counting_load_corpus():
+        cold_loads.append(True)
+        return original_load_corpus()
+
+    main.load_corpus = counting_load_corpus
+    try:
+        recipes, canonical_ingredients = main.load_and_prepare_data()
+    finally:
+        main.load_corpus = original_load_corpus
+    return recipes, canonical_ingredients, bool(cold_loads)
+
+def assert_same_corpus(first, second):
+    """Check that two loads gave the same recipes and canonical ingredients."""
+    pd.testing.assert_frame_equal(first[0], second[0])
+    assert [type(recipe_id) for recipe_id in first[0]['id']] == [type(recipe_id) for recipe_id in second[0]['id']]
+    assert first[1] == second[1]
+
+def test_second_load_comes_from_the_cache():
+    """The second startup is a cache hit with the same corpus as the cold load."""
+    with temporary_dataset():
+        cold = load_counting_cold_loads()
+        cached = load_counting_cold_loads()
+        assert cold[2] and not cached[2]
+        assert corpus_cache_path(config).exists()
+        assert_same_corpus(cold, cached)
+
+        # Ids keep their types and missing instructions stay missing
+        assert cached[0]['id'].tolist() == ['pancakes', 3, 'toast']
+        assert pd.isna(cached[0][config.INSTRUCTIONS_COLUMN].iloc[1])
+
+def test_cleaning_changes_select_another_file():
+    """Changing a setting or version that affects the cleaned output selects another cache file."""
+    original_remove_quantities = config.REMOVE_QUANTITIES
+    original_cleaner_version = corpus_cache.CLEANER_VERSION
+    with temporary_dataset():
+        path = corpus_cache_path(config)
+        try:
+            config.REMOVE_QUANTITIES = not original_remove_quantities
+            assert corpus_cache_path(config) != path
+            config.REMOVE_QUANTITIES = original_remove_quantities
+
+            corpus_cache.CLEANER_VERSION = original_cleaner_version + 1
+            assert corpus_cache_path(config) != path
+        finally:
+            config.REMOVE_QUANTITIES = original_remove_quantities
+            corpus_cache.CLEANER_VERSION = original_cleaner_version
+
+def test_damaged_cache_falls_back_to_a_cold_load():
+    """A truncated or corrupt cache file is ignored and the dataset is loaded again."""
+    with temporary_dataset():
+        cold = load_counting_cold_loads()
+        path = corpus_cache_path(config)
+        contents = path.read_bytes()
+        for damaged in [contents[:len(contents) // 2], b'not an npz file']:
+            path.write_bytes(damaged)
+            reloaded = load_counting_cold_loads()
+            assert reloaded[2]
+            assert_same_corpus(cold, reloaded)
+
+if __name__ == "__main__":
+    print("Testing corpus cache")
+    print("=" * 50)
+
+    test_second_load_comes_from_the_cache()
+    print("The second load comes from the cache")
+
+    test_cleaning_changes_select_another_file()
+    print("Cleaning changes select another cache file")
+
+    test_damaged_cache_falls_back_to_a_cold_load()
+    print("A damaged cache falls back to a cold load")
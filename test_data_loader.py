@@ -0,0 +1,87 @@
+"""
+Test script for the streaming JSON loader.
+This checks that recipes in the array and object layouts are streamed into
+the standard columns at any chunk size, and that loading stops as soon as
+the recipe limit is reached.
+"""
+
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from data_loader import iter_json_records, load_recipe_data
+
+RECIPES = [
+    {'title': 'Pancakes', 'ingredients': ['1 cup flour', '2 eggs'], 'directions': 'Whisk and fry.', 'rating': 4.5},
+    {'title': 'Tomato Soup', 'ingredients': ['4 tomatoes'], 'notes': {'serves': 2}},
+    {'title': 'Toast', 'ingredients': 'bread, butter', 'directions': 'Toast the bread.'},
+]
+
+def load_dataset(text, limit=None):
+    """Load recipes from a JSON dataset with the given text."""
+    original_path = config.DATASET_PATH
+    with tempfile.TemporaryDirectory() as directory:
+        dataset_path = Path(directory) / 'recipes.json'
+        dataset_path.write_text(text, encoding='utf-8')
+        config.DATASET_PATH = str(dataset_path)
+        try:
+            return load_recipe_data(limit=limit)
+        finally:
+            config.DATASET_PATH = original_path
+
+def test_records_stream_at_any_chunk_size():
+    """Recipes are decoded the same whether or not they span several chunks."""
+    array_text = json.dumps(RECIPES, indent=2)
+    object_text = json.dumps({f"r{i}": recipe for i, recipe in enumerate(RECIPES)})
+    for chunk_size in [1, 5, 64, 1 << 20]:
+        assert [recipe for _, recipe in iter_json_records(io.StringIO(array_text), chunk_size)] == RECIPES
+        assert list(iter_json_records(io.StringIO(object_text), chunk_size)) == \
+            [(f"r{i}", recipe) for i, recipe in enumerate(RECIPES)]
+        assert list(iter_json_records(io.StringIO(' [ ] '), chunk_size)) == []
+
+def test_array_layout():
+    """The array layout gives the standard columns, with row numbers as ids."""
+    df = load_dataset(json.dumps(RECIPES))
+    assert df.columns.tolist() == ['name', 'ingredients', 'instructions', 'id']
+    assert df['name'].tolist() == ['Pancakes', 'Tomato Soup', 'Toast']
+    assert df['ingredients'].tolist() == [['flour', '2 eggs'], ['4 tomatoes'], ['bread', 'butter']]
+    assert df['instructions'].fillna('').tolist() == ['Whisk and fry.', '', 'Toast the bread.']
+    assert df['id'].tolist() == [0, 1, 2]
+
+def test_object_layout():
+    """The object layout uses the keys as ids, unless a recipe has its own."""
+    recipes = {'a': RECIPES[0], 'b': dict(RECIPES[1], id=7), 'c': 'not a recipe', 'd': RECIPES[2]}
+    df = load_dataset(json.dumps(recipes))
+    assert df['name'].tolist() == ['Pancakes', 'Tomato Soup', 'Toast']
+    assert df['id'].tolist() == ['a', 7, 'd']
+
+def test_loading_stops_at_the_limit():
+    """Recipes after the limit are never read, so they need not even be valid JSON."""
+    text = json.dumps(RECIPES)[:-1] + ', {"title": "Broken", '
+    df = load_dataset(text, limit=2)
+    assert df['name'].tolist() == ['Pancakes', 'Tomato Soup']
+
+    assert load_dataset(text) is None
+
+if __name__ == "__main__":
+    print("Testing streaming JSON loader")
+    print("=" * 50)
+
+    test_records_stream_at_any_chunk_size()
+    print("Recipes stream at any chunk size")
+
+    test_array_layout()
+    print("Array layout loads into the standard columns")
+
+    test_object_layout()
+    print("Object layout uses its keys as ids")
+
+    test_loading_stops_at_the_limit()
+    print("Loading stops at the recipe limit")
@@ -0,0 +1,86 @@
+"""
+Test script for the dietary flag columns.
+This checks that the flags precomputed for each diet agree with searching the
+ingredients for each restricted term with its own whole-word regex, as
+dietary preferences were checked per query before, and that the matcher
+filters searches by the flags the same way as without them.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from recipe_matcher import (DIETARY_FLAG_COLUMNS, DIETARY_RESTRICTED_INGREDIENTS, HIGH_CARB_INGREDIENTS,
+                            add_dietary_flag_columns, find_matching_recipes)
+
+# Ingredient lists including words that contain a restricted term without being it
+INGREDIENT_LISTS = [
+    ['eggplant', 'tomato'],
+    ['2 eggs', 'flour'],
+    ['butternut squash', 'olive oil'],
+    ['peanut butter', 'banana'],
+    ['coconut milk', 'rice'],
+    ['chicken stock', 'onion'],
+    ['buckwheat', 'water'],
+    ['Soy Sauce', 'tofu'],
+    ['hamburger buns', 'lettuce'],
+    ['pineapple', 'nutmeg'],
+    [],
+    None,
+]
+
+def build_test_recipes():
+    """Build a DataFrame of recipes with cleaned ingredients."""
+    return pd.DataFrame([
+        {config.RECIPE_NAME_COLUMN: f"Recipe {i}", config.CLEANED_INGREDIENTS_COLUMN: ingredients,
+         config.INSTRUCTIONS_COLUMN: "Cook.", 'id': i}
+        for i, ingredients in enumerate(INGREDIENT_LISTS)
+    ])
+
+def fits_diet(recipe_ingredients, terms):
+    """Check a recipe against a diet one term and one ingredient at a time, the way queries used to."""
+    if not isinstance(recipe_ingredients, list):
+        return False
+    ingredients_lower = [ing.lower() for ing in recipe_ingredients]
+    return not any(
+        re.search(r'\b' + re.escape(term) + r'\b', ing) for term in terms for ing in ingredients_lower
+    )
+
+def test_flags_match_per_term_search():
+    """Each flag column agrees with the per-term regex search, including word boundaries."""
+    df_recipes = add_dietary_flag_columns(build_test_recipes(), config)
+    diets = dict(DIETARY_RESTRICTED_INGREDIENTS, **{'low-carb': HIGH_CARB_INGREDIENTS})
+    for diet, column in DIETARY_FLAG_COLUMNS.items():
+        expected = [fits_diet(ingredients, diets[diet]) for ingredients in INGREDIENT_LISTS]
+        assert df_recipes[column].tolist() == expected, diet
+
+    # "eggplant" is not an egg, "butternut" is neither butter nor a nut, "buckwheat" is not wheat
+    assert df_recipes['is_vegan'].tolist()[:3] == [True, False, True]
+    assert df_recipes['is_nut_free'].iloc[2] and df_recipes['is_dairy_free'].iloc[2]
+    assert df_recipes['is_gluten_free'].iloc[6]
+
+def test_matcher_filters_with_flags():
+    """Searches with dietary preferences select the same recipes with and without the flag columns."""
+    without_flags = build_test_recipes()
+    with_flags = add_dietary_flag_columns(build_test_recipes(), config)
+    for preferences in [['vegan'], ['gluten-free', 'nut-free'], ['dairy-free']]:
+        flagged = find_matching_recipes([], [], preferences, with_flags, config, limit=len(INGREDIENT_LISTS))
+        checked = find_matching_recipes([], [], preferences, without_flags, config, limit=len(INGREDIENT_LISTS))
+        assert flagged['id'].tolist() == checked['id'].tolist(), preferences
+
+if __name__ == "__main__":
+    print("Testing dietary flag columns")
+    print("=" * 50)
+
+    test_flags_match_per_term_search()
+    print("Dietary flags match the per-term regex search")
+
+    test_matcher_filters_with_flags()
+    print("The matcher filters by the flags like the per-recipe check")
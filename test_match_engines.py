@@ -0,0 +1,138 @@
+"""
+Test script for the recipe matching engines.
+This checks that the sparse scoring engine ranks recipes the same way as the
+original per-recipe Python scoring.
+"""
+
+import logging
+import random
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from recipe_index import build_recipe_index
+from recipe_matcher import find_matching_recipes
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+logger = logging.getLogger(__name__)
+
+# Ingredient vocabulary for the generated recipes, including near-duplicates
+# and multi-word ingredients to exercise the substring and fuzzy tiers
+TEST_INGREDIENTS = [
+    'chicken', 'chicken breast', 'chicken broth', 'rice', 'brown rice', 'licorice', 'onion',
+    'garlic', 'tomato', 'tomatoes', 'potato', 'sweet potato', 'beef', 'ground beef', 'pasta',
+    'spaghetti', 'butter', 'peanut butter', 'milk', 'coconut milk', 'cheese', 'cream cheese',
+    'egg', 'flour', 'sugar', 'brown sugar', 'salt', 'black pepper', 'olive oil', 'olive', 'oil',
+    'shrimp', 'tofu', 'almond', 'honey', 'bread', 'soy sauce', 'basil', 'mushroom', 'chiken', 'potatos'
+]
+
+TEST_QUERIES = [
+    (['chicken'], []),
+    (['chicken', 'rice'], []),
+    (['rice'], ['onion']),
+    (['potato', 'beef'], ['garlic', 'olive oil']),
+    (['olive oil'], []),
+    (['oil olive'], []),
+    (['chikn'], []),
+    (['pasta', 'cheese', 'egg'], ['butter']),
+    (['xyzzy'], []),
+]
+
+def build_test_recipes(num_recipes=500, seed=42):
+    """Build a small DataFrame of generated recipes."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(num_recipes):
+        ingredients = rng.sample(TEST_INGREDIENTS, rng.randint(1, 8))
+        rows.append({
+            config.RECIPE_NAME_COLUMN: f"Recipe {i}",
+            config.RAW_INGREDIENTS_COLUMN: ingredients,
+            config.CLEANED_INGREDIENTS_COLUMN: ingredients,
+            config.INSTRUCTIONS_COLUMN: "Mix and cook.",
+            'id': i
+        })
+    # One recipe without a usable ingredient list
+    rows.append({
+        config.RECIPE_NAME_COLUMN: "Empty recipe",
+        config.RAW_INGREDIENTS_COLUMN: [],
+        config.CLEANED_INGREDIENTS_COLUMN: [],
+        config.INSTRUCTIONS_COLUMN: None,
+        'id': num_recipes
+    })
+    return pd.DataFrame(rows)
+
+def rank_with_engine(engine, include, exclude, df_recipes):
+    """Return {recipe id: (score, match count)} for every match found by an engine."""
+    original_engine = config.MATCH_ENGINE
+    config.MATCH_ENGINE = engine
+    try:
+        matches = find_matching_recipes(include, exclude, [], df_recipes, config, limit=len(df_recipes))
+    finally:
+        config.MATCH_ENGINE = original_engine
+
+    if matches.empty:
+        return {}
+    return {
+        recipe_id: (round(score, 9), count)
+        for recipe_id, score, count in zip(matches['id'], matches['match_score'], matches['match_count'])
+    }
+
+def test_sparse_engine_matches_python_engine():
+    """The sparse engine should score every recipe exactly like the Python engine."""
+    df_recipes = build_test_recipes()
+
+    for include, exclude in TEST_QUERIES:
+        python_ranking = rank_with_engine('python', include, exclude, df_recipes)
+        sparse_ranking = rank_with_engine('sparse', include, exclude, df_recipes)
+        assert python_ranking == sparse_ranking, f"Engines disagree for include={include}, exclude={exclude}"
+
+def test_sparse_engine_lists_common_ingredients():
+    """Returned recipes should still carry their matched ingredients."""
+    df_recipes = build_test_recipes()
+
+    config.MATCH_ENGINE = 'sparse'
+    try:
+        matches = find_matching_recipes(['chicken', 'rice'], [], [], df_recipes, config, limit=5)
+    finally:
+        config.MATCH_ENGINE = 'python'
+
+    assert not matches.empty
+    for common, count in zip(matches['common_ingredients'], matches['match_count']):
+        assert len(common) == count
+
+def test_unknown_engine_is_rejected():
+    """A misspelled engine fails loudly instead of falling back to the Python engine."""
+    df_recipes = build_test_recipes()
+    build_recipe_index(df_recipes, config)
+
+    config.MATCH_ENGINE = 'Sparse'
+    try:
+        for call in [lambda: build_recipe_index(df_recipes, config),
+                      lambda: find_matching_recipes(['chicken'], [], [], df_recipes, config)]:
+            try:
+                call()
+                assert False, "an unknown engine should be rejected"
+            except ValueError:
+                pass
+    finally:
+        config.MATCH_ENGINE = 'python'
+
+if __name__ == "__main__":
+    print("Testing recipe matching engines")
+    print("=" * 50)
+
+    test_sparse_engine_matches_python_engine()
+    print("Sparse and Python engines produce identical rankings")
+
+    test_sparse_engine_lists_common_ingredients()
+    print("Sparse engine returns matched ingredients for the top recipes")
+
+    test_unknown_engine_is_rejected()
+    print("Unknown engines are rejected")
@@ -0,0 +1,77 @@
+"""
+Test script for the stage latency metrics.
+This checks that durations land in the right histogram buckets, that the
+timing helpers record one observation per run, and that the Prometheus
+output holds the bucket, sum and count lines of every stage.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from metrics import (Histogram, StageTimer, render_prometheus, reset_metrics,
+                     stage_histogram, time_stage, timed)
+
+def test_histogram_buckets_are_cumulative():
+    """Each bucket counts every duration up to its bound."""
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.01, 0.05, 0.5, 2.0):
+        histogram.observe(seconds)
+    cumulative, total, count = histogram.snapshot()
+    assert cumulative == [2, 3, 4, 5]
+    assert count == 5 and abs(total - 2.565) < 1e-9
+
+def test_timing_helpers_record_runs():
+    """time_stage, timed and StageTimer each record one run per use."""
+    reset_metrics()
+
+    with time_stage('parse'):
+        pass
+
+    @timed('format')
+    def format_reply(text):
+        return text.upper()
+
+    assert format_reply('ok') == 'OK'
+    assert format_reply('ok') == 'OK'
+
+    timer = StageTimer()
+    timer.lap('match_candidates')
+    timer.lap('match_scoring')
+
+    assert stage_histogram('parse').snapshot()[2] == 1
+    assert stage_histogram('format').snapshot()[2] == 2
+    assert stage_histogram('match_candidates').snapshot()[2] == 1
+    assert stage_histogram('match_scoring').snapshot()[2] == 1
+
+def test_prometheus_output():
+    """The output has bucket, sum and count lines per stage, then the extra samples."""
+    reset_metrics()
+    with time_stage('parse'):
+        pass
+
+    text = render_prometheus([('recipe_bot_sessions', 'gauge', 'Sessions in the session store.', 3)])
+    lines = text.splitlines()
+    assert '# TYPE recipe_bot_stage_duration_seconds histogram' in lines
+    assert 'recipe_bot_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 1' in lines
+    assert 'recipe_bot_stage_duration_seconds_count{stage="parse"} 1' in lines
+    assert any(line.startswith('recipe_bot_stage_duration_seconds_sum{stage="parse"} ') for line in lines)
+    assert '# TYPE recipe_bot_sessions gauge' in lines
+    assert 'recipe_bot_sessions 3' in lines
+    assert text.endswith('\n')
+
+if __name__ == "__main__":
+    print("Testing stage latency metrics")
+    print("=" * 50)
+
+    test_histogram_buckets_are_cumulative()
+    print("Histogram buckets are cumulative")
+
+    test_timing_helpers_record_runs()
+    print("Timing helpers record one run per use")
+
+    test_prometheus_output()
+    print("Prometheus output lists every stage")
@@ -0,0 +1,90 @@
+"""
+Test script for parallel ingredient cleaning.
+This checks that cleaning in worker processes, chunk by chunk, gives the same
+cleaned ingredients in the same row order as cleaning in this process, and
+that cleaning falls back to this process when the worker pool fails.
+"""
+
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+import data_cleaner
+from data_cleaner import apply_cleaning_to_dataframe
+
+RAW_INGREDIENTS = [
+    ['2 cups chopped onions', '1 lb chicken breast'],
+    ['1 tbsp olive oil', 'salt'],
+    None,
+    ['3 large eggs, beaten', '1/2 cup milk'],
+    [],
+    ['500 g minced beef', 'garlic cloves'],
+    ['fresh basil leaves', '2 tomatoes, diced'],
+    float('nan'),
+    ['1 cup brown rice', 'black pepper'],
+    ['butter', 'all-purpose flour', 'sugar'],
+]
+
+def build_test_recipes(copies=3):
+    """Build a DataFrame of recipes with raw ingredients, repeated to fill several chunks."""
+    raw_ingredients = RAW_INGREDIENTS * copies
+    return pd.DataFrame({
+        config.RECIPE_NAME_COLUMN: [f"Recipe {i}" for i in range(len(raw_ingredients))],
+        config.RAW_INGREDIENTS_COLUMN: raw_ingredients
+    })
+
+def clean(workers):
+    """Clean the test recipes with a number of worker processes and small chunks."""
+    original_chunk_size = config.CLEANING_CHUNK_SIZE
+    config.CLEANING_CHUNK_SIZE = 4
+    try:
+        df = apply_cleaning_to_dataframe(
+            build_test_recipes(), config.RAW_INGREDIENTS_COLUMN, config.CLEANED_INGREDIENTS_COLUMN, workers=workers
+        )
+    finally:
+        config.CLEANING_CHUNK_SIZE = original_chunk_size
+    return df[config.CLEANED_INGREDIENTS_COLUMN].tolist()
+
+class FailingExecutor:
+    """Process pool stand-in whose workers die as soon as work is submitted."""
+    def __init__(self, *args, **kwargs):
+        pass
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc_info):
+        return False
+    def map(self, function, *iterables):
+        raise BrokenProcessPool("a worker process died")
+
+def test_parallel_cleaning_matches_serial_cleaning():
+    """Worker processes clean every chunk like this process, keeping the row order."""
+    serial = clean(workers=1)
+    assert len(serial) == len(RAW_INGREDIENTS) * 3
+    assert clean(workers=2) == serial
+
+def test_failing_pool_falls_back_to_serial_cleaning():
+    """When the worker pool breaks, the recipes are cleaned in this process instead."""
+    serial = clean(workers=1)
+    original_executor = data_cleaner.ProcessPoolExecutor
+    data_cleaner.ProcessPoolExecutor = FailingExecutor
+    try:
+        assert clean(workers=2) == serial
+    finally:
+        data_cleaner.ProcessPoolExecutor = original_executor
+
+if __name__ == "__main__":
+    print("Testing parallel ingredient cleaning")
+    print("=" * 50)
+
+    test_parallel_cleaning_matches_serial_cleaning()
+    print("Parallel cleaning matches serial cleaning")
+
+    test_failing_pool_falls_back_to_serial_cleaning()
+    print("A failing worker pool falls back to serial cleaning")
@@ -0,0 +1,87 @@
+"""
+Test script for the parse cache.
+This checks that cached parses equal fresh ones, that callers get their own
+copy, and that the cache is emptied when the canonical ingredients change.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+import nlu_parser
+from nlu_parser import parse_query, parse_cache_stats, clear_parse_cache
+
+QUERIES = ["help", "3", "vegetarian meals", "chicken and rice", "pasta without mushrooms", "quit"]
+CANONICAL_INGREDIENTS = {'chicken', 'rice', 'pasta', 'mushroom', 'tomato'}
+
+def with_cache_size(size):
+    """Run a test with config.PARSE_CACHE_SIZE set, restoring it afterwards."""
+    def decorator(test):
+        def wrapper():
+            previous = config.PARSE_CACHE_SIZE
+            config.PARSE_CACHE_SIZE = size
+            clear_parse_cache()
+            try:
+                test()
+            finally:
+                config.PARSE_CACHE_SIZE = previous
+                clear_parse_cache()
+        wrapper.__name__ = test.__name__
+        wrapper.__doc__ = test.__doc__
+        return wrapper
+    return decorator
+
+@with_cache_size(100)
+def test_cached_parse_matches_uncached():
+    """Repeated queries should be served from the cache with the same result."""
+    for query in QUERIES:
+        expected = nlu_parser._parse_query_uncached(query, CANONICAL_INGREDIENTS)
+        assert parse_query(query, CANONICAL_INGREDIENTS) == expected
+        assert parse_query(query, CANONICAL_INGREDIENTS) == expected
+    stats = parse_cache_stats()
+    assert stats['hits'] == len(QUERIES) and stats['misses'] == len(QUERIES)
+
+@with_cache_size(100)
+def test_cached_parse_is_a_copy():
+    """Changing a returned parse must not change the cached one."""
+    parse_query("chicken and rice", CANONICAL_INGREDIENTS)['include_ingredients'].append('salt')
+    assert 'salt' not in parse_query("chicken and rice", CANONICAL_INGREDIENTS)['include_ingredients']
+
+@with_cache_size(2)
+def test_eviction_and_invalidation():
+    """The cache keeps the most recently used queries and resets for new ingredients."""
+    for query in QUERIES:
+        parse_query(query, CANONICAL_INGREDIENTS)
+    assert parse_cache_stats()['size'] == 2
+
+    canonical_ingredients = set(CANONICAL_INGREDIENTS)
+    parse_query("quit", canonical_ingredients)
+    stats = parse_cache_stats()
+    assert stats['size'] == 1 and stats['hits'] == 0
+
+@with_cache_size(0)
+def test_disabled_cache():
+    """With PARSE_CACHE_SIZE = 0 nothing is cached."""
+    parse_query("help", CANONICAL_INGREDIENTS)
+    parse_query("help", CANONICAL_INGREDIENTS)
+    assert parse_cache_stats() == {'hits': 0, 'misses': 0, 'size': 0}
+
+if __name__ == "__main__":
+    print("Testing parse cache")
+    print("=" * 50)
+
+    test_cached_parse_matches_uncached()
+    print("Cached parses match uncached ones")
+
+    test_cached_parse_is_a_copy()
+    print("Callers get their own copy of a cached parse")
+
+    test_eviction_and_invalidation()
+    print("Least recently used queries are evicted and new ingredient sets reset the cache")
+
+    test_disabled_cache()
+    print("PARSE_CACHE_SIZE = 0 disables the cache")
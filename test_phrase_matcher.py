@@ -0,0 +1,67 @@
+"""
+Test script for the phrase matcher.
+This checks the Aho-Corasick matcher against a plain substring search and
+shows how compound ingredients are picked out of ingredient lines.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from phrase_matcher import PhraseMatcher
+
+COMPOUNDS = ['olive oil', 'oil', 'sour cream', 'cream', 'cream cheese', 'peanut butter', 'butter']
+
+def naive_find_all(phrases, text):
+    """Find every phrase occurrence with str.startswith at every position."""
+    return sorted(
+        (start, start + len(phrase), phrase)
+        for phrase in set(phrases)
+        for start in range(len(text))
+        if text.startswith(phrase, start)
+    )
+
+def test_find_all_matches_substring_search():
+    """Every occurrence, including overlapping ones, should be reported."""
+    rng = random.Random(7)
+    for _ in range(500):
+        phrases = [''.join(rng.choice('ab ') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = ''.join(rng.choice('ab c') for _ in range(rng.randint(0, 30)))
+        assert sorted(PhraseMatcher(phrases).find_all(text)) == naive_find_all(phrases, text)
+
+def test_longest_match_wins():
+    """The longest compound should win regardless of the order of the phrase list."""
+    for phrases in [COMPOUNDS, list(reversed(COMPOUNDS))]:
+        matcher = PhraseMatcher(phrases)
+        assert matcher.longest_match("1 cup sour cream cheese") == 'cream cheese'
+        assert matcher.longest_match("2 tbsp olive oil") == 'olive oil'
+        assert matcher.longest_match("salt") is None
+
+def test_whole_words():
+    """With whole_words, phrases inside longer words are ignored."""
+    matcher = PhraseMatcher(COMPOUNDS, whole_words=True)
+    assert [phrase for _, _, phrase in matcher.find_all("buttermilk and soil")] == []
+    assert matcher.find_non_overlapping("olive oil and cream cheese") == [
+        (0, 9, 'olive oil'), (14, 26, 'cream cheese')
+    ]
+
+if __name__ == "__main__":
+    print("Testing phrase matcher")
+    print("=" * 50)
+
+    test_find_all_matches_substring_search()
+    print("find_all agrees with a plain substring search")
+
+    test_longest_match_wins()
+    print("Longest compound wins, independent of list order")
+
+    test_whole_words()
+    print("Whole-word matching skips phrases inside other words")
+
+    matcher = PhraseMatcher(COMPOUNDS, whole_words=True)
+    for line in ["2 tbsp olive oil", "1 cup sour cream cheese", "3 tbsp peanut butter, softened"]:
+        print(f"  {line!r}: {matcher.find_non_overlapping(line)}")
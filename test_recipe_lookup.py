@@ -0,0 +1,107 @@
+"""
+Test script for looking up recipe details.
+This checks that recipes are found by id through the recipe index, including
+recipes that share a name and DataFrames without an 'id' column, and that the
+title index finds recipes by exact, partial and misspelled titles.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from recipe_index import TitleIndex, build_recipe_index
+from recipe_matcher import get_detailed_recipe, get_recipe_details_by_id
+
+def build_test_recipes():
+    """Build a DataFrame where two recipes share a name."""
+    return pd.DataFrame([
+        {config.RECIPE_NAME_COLUMN: "Pancakes", config.CLEANED_INGREDIENTS_COLUMN: ['flour', 'egg'],
+         config.INSTRUCTIONS_COLUMN: "Fry.", 'id': 101},
+        {config.RECIPE_NAME_COLUMN: "Omelette", config.CLEANED_INGREDIENTS_COLUMN: ['egg'],
+         config.INSTRUCTIONS_COLUMN: "Whisk.", 'id': 205},
+        {config.RECIPE_NAME_COLUMN: "Pancakes", config.CLEANED_INGREDIENTS_COLUMN: ['banana', 'oat'],
+         config.INSTRUCTIONS_COLUMN: "Blend.", 'id': 309},
+    ])
+
+def test_lookup_by_id_returns_the_exact_recipe():
+    """Recipes sharing a name are told apart by their id."""
+    df_recipes = build_test_recipes()
+    assert get_recipe_details_by_id(101, df_recipes, config)['ingredients'] == ['flour', 'egg']
+    assert get_recipe_details_by_id(309, df_recipes, config)['ingredients'] == ['banana', 'oat']
+    # Ids from search results may be numpy integers
+    assert get_recipe_details_by_id(np.int64(205), df_recipes, config)['name'] == "Omelette"
+
+def test_unknown_ids():
+    """Unknown ids give None instead of another recipe."""
+    df_recipes = build_test_recipes()
+    assert get_recipe_details_by_id(999, df_recipes, config) is None
+    assert get_recipe_details_by_id([101], df_recipes, config) is None
+
+def test_lookup_by_index_label():
+    """Without an 'id' column the index labels are the ids."""
+    df_recipes = build_test_recipes().drop(columns=['id'])
+    df_recipes.index = [7, 3, 5]
+    assert get_recipe_details_by_id(5, df_recipes, config)['instructions'] == "Blend."
+
+def test_title_lookup_tiers():
+    """Exact titles win, then case-insensitive substrings, then the closest misspelling."""
+    df_recipes = build_test_recipes()
+    assert get_detailed_recipe("Omelette", df_recipes, config)['instructions'] == "Whisk."
+    assert get_detailed_recipe("PANCAKE", df_recipes, config)['instructions'] == "Fry."
+    assert get_detailed_recipe("omlete", df_recipes, config)['name'] == "Omelette"
+    assert get_detailed_recipe("lasagna", df_recipes, config) is None
+
+def test_fuzzy_title_alternatives():
+    """fuzzy_matches ranks titles by score, earlier rows first among equal scores."""
+    index = TitleIndex(["Lime Tarts", "Lemon Tart", "Lemon Cake", "Lemon Torte", "Lemon Tart", "Beef Stew"])
+    matches = index.fuzzy_matches("lemon tarts", limit=4)
+    assert [position for position, _ in matches] == [1, 4, 3, 0]
+    assert matches[0][1] == matches[1][1] > matches[2][1] > matches[3][1] > 70
+
+def test_concurrent_first_use_builds_one_title_index():
+    """Threads asking for the title index at the same time all get the same index."""
+    recipe_index = build_recipe_index(build_test_recipes(), config)
+    start = threading.Barrier(8)
+    title_indexes = []
+
+    def first_use():
+        start.wait()
+        title_indexes.append(recipe_index.title_index())
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(title_indexes) == 8 and all(title_index is title_indexes[0] for title_index in title_indexes)
+    assert title_indexes[0].find("Omelette") == 1
+
+if __name__ == "__main__":
+    print("Testing recipe lookup")
+    print("=" * 50)
+
+    test_lookup_by_id_returns_the_exact_recipe()
+    print("Lookup by id returns the exact recipe, even with duplicate names")
+
+    test_unknown_ids()
+    print("Unknown ids are not found")
+
+    test_lookup_by_index_label()
+    print("Index labels are used when there is no 'id' column")
+
+    test_title_lookup_tiers()
+    print("Titles are found by exact name, substring and closest misspelling")
+
+    test_fuzzy_title_alternatives()
+    print("Fuzzy title alternatives are ranked by score")
+
+    test_concurrent_first_use_builds_one_title_index()
+    print("Concurrent first use builds a single title index")
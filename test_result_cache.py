@@ -0,0 +1,118 @@
+"""
+Test script for the search result cache.
+This checks that cached searches return the same recipes as fresh ones, that
+searches differing only in case, spacing, order or repeats share an entry, and
+that the cache is emptied when the corpus is reloaded and stays under its
+memory cap.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from recipe_matcher import clear_result_cache, find_matching_recipes, result_cache_stats
+
+def build_test_recipes(extra_ingredient='salt'):
+    """Build a small DataFrame of recipes."""
+    ingredient_lists = [
+        ['chicken', 'rice', 'onion'], ['chicken', 'garlic'], ['rice', 'beans'],
+        ['chicken', 'rice', extra_ingredient], ['pasta', 'cheese'], ['rice']
+    ]
+    return pd.DataFrame([
+        {config.RECIPE_NAME_COLUMN: f"Recipe {i}", config.CLEANED_INGREDIENTS_COLUMN: ingredients,
+         config.INSTRUCTIONS_COLUMN: "Cook.", 'id': i}
+        for i, ingredients in enumerate(ingredient_lists)
+    ])
+
+def test_cached_results_match_fresh_results():
+    """A repeated search, in any ingredient order, is answered from the cache unchanged."""
+    df_recipes = build_test_recipes()
+    clear_result_cache()
+
+    fresh = find_matching_recipes(['chicken', 'rice'], [], [], df_recipes, config, limit=3)
+    cached = find_matching_recipes(['rice', 'chicken', 'rice'], [], [], df_recipes, config, limit=3)
+    pd.testing.assert_frame_equal(fresh, cached)
+
+    stats = result_cache_stats()
+    assert stats['misses'] == 1 and stats['hits'] == 1 and stats['hit_ratio'] == 0.5
+
+    # Another limit is another search
+    find_matching_recipes(['chicken', 'rice'], [], [], df_recipes, config, limit=5)
+    assert result_cache_stats()['misses'] == 2
+
+def test_equivalent_searches_share_an_entry():
+    """Searches differing only in case, spacing or order of their parameters share one cache entry."""
+    df_recipes = build_test_recipes()
+    clear_result_cache()
+
+    fresh = find_matching_recipes(['chicken', 'rice'], ['garlic'], ['gluten-free'], df_recipes, config,
+                                  limit=3, recipe_category='recipe')
+    cached = find_matching_recipes(['Rice ', ' CHICKEN'], ['Garlic'], ['Gluten Free '], df_recipes, config,
+                                   limit=3, recipe_category=' Recipe')
+    assert not fresh.empty
+    pd.testing.assert_frame_equal(fresh, cached)
+
+    stats = result_cache_stats()
+    assert stats['misses'] == 1 and stats['hits'] == 1 and stats['size'] == 1
+
+def test_callers_get_their_own_results():
+    """Changing a returned DataFrame does not change later cached results."""
+    df_recipes = build_test_recipes()
+    clear_result_cache()
+
+    first = find_matching_recipes(['chicken'], [], [], df_recipes, config, limit=3)
+    first.iloc[0]['common_ingredients'].append('changed')
+    second = find_matching_recipes(['chicken'], [], [], df_recipes, config, limit=3)
+    assert 'changed' not in second.iloc[0]['common_ingredients']
+
+def test_reloaded_corpus_empties_the_cache():
+    """Results of an older corpus are never returned for a new one."""
+    clear_result_cache()
+    find_matching_recipes(['salt'], [], [], build_test_recipes('salt'), config, limit=3)
+
+    reloaded = build_test_recipes('pepper')
+    assert find_matching_recipes(['salt'], [], [], reloaded, config, limit=3).empty
+    stats = result_cache_stats()
+    assert stats['invalidations'] == 1 and stats['hits'] == 0
+
+def test_memory_cap_evicts_oldest_searches():
+    """The cache evicts its least recently used searches to stay under its memory cap."""
+    df_recipes = build_test_recipes()
+    original_max_bytes = config.RESULT_CACHE_MAX_BYTES
+    clear_result_cache()
+    try:
+        find_matching_recipes(['chicken'], [], [], df_recipes, config, limit=3)
+        config.RESULT_CACHE_MAX_BYTES = result_cache_stats()['bytes'] + 1
+        find_matching_recipes(['rice'], [], [], df_recipes, config, limit=3)
+
+        stats = result_cache_stats()
+        assert stats['size'] == 1 and stats['evictions'] == 1
+        assert stats['bytes'] <= config.RESULT_CACHE_MAX_BYTES
+    finally:
+        config.RESULT_CACHE_MAX_BYTES = original_max_bytes
+        clear_result_cache()
+
+if __name__ == "__main__":
+    print("Testing search result cache")
+    print("=" * 50)
+
+    test_cached_results_match_fresh_results()
+    print("Cached searches match fresh ones")
+
+    test_equivalent_searches_share_an_entry()
+    print("Equivalent searches share a cache entry")
+
+    test_callers_get_their_own_results()
+    print("Callers get their own copy of cached results")
+
+    test_reloaded_corpus_empties_the_cache()
+    print("A reloaded corpus empties the cache")
+
+    test_memory_cap_evicts_oldest_searches()
+    print("The memory cap evicts the oldest searches")
@@ -0,0 +1,117 @@
+"""
+Test script for the session stores.
+This checks idle expiry, least-recently-used eviction and sweeping for the
+memory and SQLite stores, and that SQLite sessions are shared between stores
+opened on the same file.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from session_store import MemorySessionStore, SessionStore, SQLiteSessionStore, new_session_context
+
+class FakeClock:
+    """Clock that only moves when told to."""
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def make_stores(clock, directory, ttl_seconds=60, max_sessions=3):
+    """Create one store of each backend."""
+    return [
+        MemorySessionStore(ttl_seconds, max_sessions, clock=clock),
+        SQLiteSessionStore(str(Path(directory) / 'sessions.sqlite3'), ttl_seconds, max_sessions, clock=clock)
+    ]
+
+def test_idle_sessions_expire():
+    """A session unused for longer than the TTL is gone; using it keeps it alive."""
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory:
+        for store in make_stores(clock, directory):
+            store.set('a', new_session_context())
+            store.set('b', new_session_context())
+            clock.now += 40
+            assert store.get('a') is not None
+            clock.now += 40
+            assert store.get('b') is None
+            assert store.get('a') is not None
+            assert store.stats()['expired'] == 1
+
+def test_least_recently_used_sessions_are_evicted():
+    """Beyond max_sessions the session used longest ago is evicted."""
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory:
+        for store in make_stores(clock, directory):
+            for session_id in ['a', 'b', 'c']:
+                clock.now += 1
+                store.set(session_id, new_session_context())
+            clock.now += 1
+            store.get('a')
+            clock.now += 1
+            store.set('d', new_session_context())
+            assert store.get('b') is None
+            assert all(store.get(session_id) is not None for session_id in ['a', 'c', 'd'])
+            assert len(store) == 3 and store.stats()['evicted'] == 1
+
+def test_sweep_removes_expired_sessions():
+    """sweep removes every expired session at once."""
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory:
+        for store in make_stores(clock, directory):
+            store.set('a', new_session_context())
+            clock.now += 30
+            store.set('b', new_session_context())
+            clock.now += 40
+            assert store.sweep() == 1
+            assert len(store) == 1
+
+def test_sqlite_sessions_are_shared():
+    """Stores on the same file see each other's sessions, with numpy ids stored as plain values."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory) / 'sessions.sqlite3')
+        context = dict(new_session_context(), last_search_results=list(np.array([4, 8, 15])))
+        SQLiteSessionStore(path, 60, 10).set('a', context)
+        assert SQLiteSessionStore(path, 60, 10).get('a')['last_search_results'] == [4, 8, 15]
+
+def test_incomplete_store_cannot_be_created():
+    """A store missing one of the abstract methods fails when it is created."""
+    class IncompleteStore(SessionStore):
+        def get(self, session_id):
+            return None
+    try:
+        IncompleteStore(60, 10)
+        assert False, "a store without set, delete, sweep and stats should not be created"
+    except TypeError:
+        pass
+
+if __name__ == "__main__":
+    print("Testing session stores")
+    print("=" * 50)
+
+    test_idle_sessions_expire()
+    print("Idle sessions expire after the TTL")
+
+    test_least_recently_used_sessions_are_evicted()
+    print("Least recently used sessions are evicted beyond the cap")
+
+    test_sweep_removes_expired_sessions()
+    print("Sweeping removes expired sessions")
+
+    test_sqlite_sessions_are_shared()
+    print("SQLite sessions are shared between stores")
+
+    test_incomplete_store_cannot_be_created()
+    print("Incomplete stores fail when created")
+
+    store = MemorySessionStore(60, 100)
+    for session_number in range(50):
+        store.set(f"session_{session_number}", dict(new_session_context(), last_search_results=list(range(10))))
+    print(f"Stats for 50 sessions: {store.stats()}")
@@ -0,0 +1,109 @@
+"""
+Test script for the text index.
+This checks that looking terms up in the word index over the normalized name
+and instructions finds the same recipes as a substring search of that text,
+for single words, phrases and subsets of the recipes.
+"""
+
+import re
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+import config
+from category_index import RecipeColumns, recipe_category_mask
+from recipe_index import build_recipe_index
+from text_index import TextIndex, normalize_text
+
+TEXTS = [
+    "Quick Breakfast Burrito",
+    "Ready in 15 min. Serve hot.",
+    "Simmer the broth, for an hour.",
+    None,
+    "Low-fat hors d'oeuvres with a shot",
+    "Low fat  photo for a DINNER party!",
+    "",
+]
+
+def text_search(texts, term):
+    """Search the normalized texts for a term the slow way."""
+    normalized = pd.Series([' '.join(normalize_text(text)) if isinstance(text, str) else None for text in texts])
+    return normalized.str.contains(re.escape(' '.join(normalize_text(term))), na=False).tolist()
+
+def test_lookups_match_substring_search():
+    """Words and phrases select the same recipes as a substring search."""
+    text_index = TextIndex(pd.DataFrame({'text': TEXTS}), ['text', 'missing'])
+    assert text_index.has_column('text') and not text_index.has_column('missing')
+
+    terms = ['hot', 'er', 'ready in', '15 min', 'in 1', 'low-fat', "hors d'oeuvre", 'dinner party',
+             'r p', 't b', 'quick breakfast burrito', 'xyz', '']
+    for term in terms:
+        assert text_index.contains('text', term).tolist() == text_search(TEXTS, term), term
+
+    # Only some of the recipes can be checked at once
+    assert text_index.contains('text', 'hot', np.array([4, 0, 1])).tolist() == [True, False, True]
+
+def test_normalized_text():
+    """The token buffer gives back the lowercased text without punctuation."""
+    text_index = TextIndex(pd.DataFrame({'text': TEXTS}), ['text'])
+    assert text_index.normalized_text('text', 1) == "ready in 15 min serve hot"
+    assert text_index.normalized_text('text', 3) is None
+    assert text_index.normalized_text('text', 6) == ""
+
+def test_category_search_uses_text_index():
+    """Category filters over indexed columns agree with searching the columns."""
+    df_recipes = pd.DataFrame([
+        {config.RECIPE_NAME_COLUMN: name, config.INSTRUCTIONS_COLUMN: instructions,
+         config.CLEANED_INGREDIENTS_COLUMN: [], 'id': i}
+        for i, (name, instructions) in enumerate([
+            ("Quick Breakfast Burrito", "Ready in 15 min."),
+            ("Steak Dinner", "Grill the steak."),
+            ("Green Salad", None),
+        ])
+    ])
+    text_index = build_recipe_index(df_recipes, config).text_index()
+    for recipe_category in ['quick', 'steak', 'salad', 'quick breakfast']:
+        expected = recipe_category_mask(RecipeColumns(df_recipes), recipe_category, config)
+        indexed = recipe_category_mask(RecipeColumns(df_recipes, text_index=text_index), recipe_category, config)
+        assert indexed.tolist() == expected.tolist(), recipe_category
+
+def test_concurrent_first_use_builds_one_index():
+    """Threads asking for the text index at the same time all get the same index."""
+    df_recipes = pd.DataFrame({config.RECIPE_NAME_COLUMN: TEXTS, config.CLEANED_INGREDIENTS_COLUMN: [[]] * len(TEXTS)})
+    recipe_index = build_recipe_index(df_recipes, config)
+    start = threading.Barrier(8)
+    text_indexes = []
+
+    def first_use():
+        start.wait()
+        text_indexes.append(recipe_index.text_index())
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(text_indexes) == 8 and all(text_index is text_indexes[0] for text_index in text_indexes)
+
+if __name__ == "__main__":
+    print("Testing text index")
+    print("=" * 50)
+
+    test_lookups_match_substring_search()
+    print("Text index lookups match a substring search")
+
+    test_normalized_text()
+    print("Normalized text is rebuilt from the token buffer")
+
+    test_category_search_uses_text_index()
+    print("Category filters agree with and without the text index")
+
+    test_concurrent_first_use_builds_one_index()
+    print("Concurrent first use builds a single text index")
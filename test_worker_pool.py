@@ -0,0 +1,72 @@
+"""
+Test script for the bounded worker pool.
+This checks that tasks beyond the pool's capacity are rejected, that tasks
+waiting past their deadline are dropped, and that the queue statistics add up.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add the project directory to the path
+project_dir = Path(__file__).parent
+sys.path.append(str(project_dir))
+
+from worker_pool import BoundedWorkerPool, PoolSaturatedError, DeadlineExceededError
+
+def test_results_and_stats():
+    """Tasks return their results and are counted as completed."""
+    pool = BoundedWorkerPool(max_workers=2, max_queue=4)
+    try:
+        assert [pool.run(pow, 2, n) for n in range(5)] == [1, 2, 4, 8, 16]
+        stats = pool.stats()
+        assert stats['completed'] == 5 and stats['queue_depth'] == 0 and stats['running'] == 0
+    finally:
+        pool.shutdown()
+
+def test_saturated_pool_rejects_tasks():
+    """Once every worker and queue slot is taken, submit fails at once."""
+    pool = BoundedWorkerPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        pool.submit(release.wait)
+        pool.submit(release.wait)
+        try:
+            pool.submit(release.wait)
+            assert False, "a third task should not fit"
+        except PoolSaturatedError:
+            pass
+        assert pool.stats()['rejected'] == 1
+    finally:
+        release.set()
+        pool.shutdown()
+
+def test_deadline_drops_queued_tasks():
+    """A task still queued at its deadline is dropped and frees its slot."""
+    pool = BoundedWorkerPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        pool.submit(release.wait)
+        try:
+            pool.run(lambda: 'too late', timeout=0.05)
+            assert False, "the queued task should miss its deadline"
+        except DeadlineExceededError:
+            pass
+        stats = pool.stats()
+        assert stats['expired'] == 1 and stats['queue_depth'] == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+if __name__ == "__main__":
+    print("Testing bounded worker pool")
+    print("=" * 50)
+
+    test_results_and_stats()
+    print("Tasks return their results and are counted")
+
+    test_saturated_pool_rejects_tasks()
+    print("A saturated pool rejects new tasks")
+
+    test_deadline_drops_queued_tasks()
+    print("Queued tasks past their deadline are dropped")
@@ -0,0 +1,253 @@
+"""
+Text index module for Recipe Bot.
+This module contains a word-level inverted index over the recipe name and
+instructions. The text of each column is normalized once (lowercased, with
+punctuation folded into single spaces) and stored compactly as interned
+token ids, so category filters look terms up in posting lists instead of
+lowercasing and scanning the whole corpus for every term.
+"""
+
+import logging
+import re
+from time import time
+
+import numpy as np
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Words of the normalized text; everything between them folds to one space
+_WORD_PATTERN = re.compile(r'\w+')
+
+# Separator between vocabulary words in the text searched for substrings
+_VOCABULARY_SEPARATOR = '\n'
+
+
+def normalize_text(text):
+    """
+    Get the words of a text, lowercased and without punctuation.
+
+    Parameters:
+    -----------
+    text : str
+        Text to normalize
+
+    Returns:
+    --------
+    list
+        Words of the text in order; joined by single spaces they give the
+        normalized text
+    """
+    return _WORD_PATTERN.findall(text.lower())
+
+
+class TextColumn:
+    """
+    Normalized text of one column, stored as token ids with offsets.
+
+    The token ids of all recipes are held in one contiguous int32 buffer;
+    recipe i owns tokens[offsets[i]:offsets[i + 1]]. The posting lists use
+    the same layout, with token t owning
+    postings[posting_offsets[t]:posting_offsets[t + 1]].
+
+    Parameters:
+    -----------
+    tokens : numpy.ndarray
+        Token ids of all recipes, in row order
+    offsets : numpy.ndarray
+        Start of each recipe's tokens, plus the end of the buffer
+    has_text : numpy.ndarray
+        Boolean array, True for recipes whose value is a string
+    vocabulary_size : int
+        Number of distinct tokens in the index
+    """
+
+    def __init__(self, tokens, offsets, has_text, vocabulary_size):
+        self.tokens = tokens
+        self.offsets = offsets
+        self.has_text = has_text
+        num_recipes = len(offsets) - 1
+
+        # Unique (token, recipe) pairs sorted by token, then by row position
+        recipe_of_token = np.repeat(np.arange(num_recipes, dtype=np.int64), np.diff(offsets))
+        pairs = np.unique(tokens.astype(np.int64) * max(num_recipes, 1) + recipe_of_token)
+        pair_tokens = pairs // max(num_recipes, 1)
+        self.postings = (pairs % max(num_recipes, 1)).astype(np.int32)
+        self.posting_offsets = np.zeros(vocabulary_size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_tokens, minlength=vocabulary_size), out=self.posting_offsets[1:])
+
+    def recipe_tokens(self, position):
+        """Get the token ids of a recipe."""
+        return self.tokens[self.offsets[position]:self.offsets[position + 1]]
+
+    def recipes_with(self, token_ids):
+        """Get the sorted, unique row positions of recipes using any of some tokens."""
+        postings = [self.postings[self.posting_offsets[t]:self.posting_offsets[t + 1]] for t in token_ids]
+        if not postings:
+            return np.array([], dtype=np.int32)
+        if len(postings) == 1:
+            return postings[0]
+        return np.unique(np.concatenate(postings))
+
+
+class TextIndex:
+    """
+    Inverted index over the normalized text of some recipe columns.
+
+    contains() answers the same question as a case-insensitive substring
+    search over the normalized text: a single word matches every vocabulary
+    word containing it, and a phrase must start at the end of a word, match
+    the words in between exactly and end at the start of a word.
+
+    Parameters:
+    -----------
+    df_recipes : pandas.DataFrame
+        DataFrame containing recipe data
+    columns : list
+        Columns to index; those missing from the DataFrame are skipped
+    """
+
+    def __init__(self, df_recipes, columns):
+        start_time = time()
+        self.num_recipes = len(df_recipes)
+
+        # Interned words: word -> token id, ids in order of first appearance
+        self.token_ids = {}
+        self.columns = {}
+        raw_columns = {}
+        for column in columns:
+            if column not in df_recipes.columns or column in raw_columns:
+                continue
+            offsets = np.zeros(self.num_recipes + 1, dtype=np.int64)
+            has_text = np.zeros(self.num_recipes, dtype=bool)
+            token_buffer = []
+            for position, text in enumerate(df_recipes[column]):
+                if isinstance(text, str):
+                    has_text[position] = True
+                    token_buffer.extend(self.token_ids.setdefault(word, len(self.token_ids))
+                                        for word in normalize_text(text))
+                offsets[position + 1] = len(token_buffer)
+            raw_columns[column] = (np.array(token_buffer, dtype=np.int32), offsets, has_text)
+
+        for column, (tokens, offsets, has_text) in raw_columns.items():
+            self.columns[column] = TextColumn(tokens, offsets, has_text, len(self.token_ids))
+
+        # Vocabulary words in token id order, joined into one string for substring searches;
+        # word t starts at _word_starts[t]
+        self.vocabulary = list(self.token_ids)
+        self._vocabulary_text = _VOCABULARY_SEPARATOR + _VOCABULARY_SEPARATOR.join(self.vocabulary) + \
+            _VOCABULARY_SEPARATOR
+        self._word_starts = np.zeros(len(self.vocabulary), dtype=np.int64)
+        if self.vocabulary:
+            np.cumsum([len(word) + len(_VOCABULARY_SEPARATOR) for word in self.vocabulary[:-1]],
+                      out=self._word_starts[1:])
+            self._word_starts += len(_VOCABULARY_SEPARATOR)
+
+        num_tokens = sum(len(text_column.tokens) for text_column in self.columns.values())
+        logger.info(f"Built text index with {len(self.vocabulary)} words and {num_tokens} tokens "
+                    f"over {len(self.columns)} columns in {time() - start_time:.2f} seconds")
+
+    def has_column(self, column):
+        """Check whether a column is in the index."""
+        return column in self.columns
+
+    def normalized_text(self, column, position):
+        """
+        Get the normalized text of a recipe.
+
+        Parameters:
+        -----------
+        column : str
+            Indexed column
+        position : int
+            Row position of the recipe
+
+        Returns:
+        --------
+        str or None
+            Lowercased words joined by single spaces, or None if the value
+            is not a string
+        """
+        text_column = self.columns[column]
+        if not text_column.has_text[position]:
+            return None
+        return ' '.join(self.vocabulary[t] for t in text_column.recipe_tokens(position))
+
+    def _words_matching(self, pattern):
+        """Get the token ids of the vocabulary words matched by a regular expression over the joined vocabulary."""
+        hits = [match.start() for match in re.finditer(pattern, self._vocabulary_text)]
+        if not hits:
+            return np.array([], dtype=np.int64)
+        return np.unique(np.searchsorted(self._word_starts, hits, side='right') - 1)
+
+    def _words_containing(self, word):
+        """Get the token ids of the vocabulary words containing a word."""
+        # Lookahead so overlapping occurrences within one vocabulary word are all found
+        return self._words_matching(f'(?={re.escape(word)})')
+
+    def _words_ending_with(self, word):
+        """Get the token ids of the vocabulary words ending with a word."""
+        return self._words_matching(re.escape(word + _VOCABULARY_SEPARATOR))
+
+    def _words_starting_with(self, word):
+        """Get the token ids of the vocabulary words starting with a word."""
+        return self._words_matching(f'(?<={_VOCABULARY_SEPARATOR}){re.escape(word)}')
+
+    def _matching_positions(self, text_column, words):
+        """Get the row positions of the recipes whose normalized text contains a phrase."""
+        if len(words) == 1:
+            return text_column.recipes_with(self._words_containing(words[0]))
+
+        first_ids = self._words_ending_with(words[0])
+        last_ids = self._words_starting_with(words[-1])
+        middle_ids = [self.token_ids.get(word) for word in words[1:-1]]
+        if not len(first_ids) or not len(last_ids) or None in middle_ids:
+            return np.array([], dtype=np.int32)
+
+        # Recipes using a word of every part of the phrase, then the word order is checked
+        candidates = text_column.recipes_with(first_ids)
+        for token_ids in [[token_id] for token_id in middle_ids] + [last_ids]:
+            candidates = np.intersect1d(candidates, text_column.recipes_with(token_ids), assume_unique=True)
+
+        span = len(words)
+        matching = []
+        for position in candidates:
+            tokens = text_column.recipe_tokens(position)
+            starts = len(tokens) - span + 1
+            if starts <= 0:
+                continue
+            found = np.isin(tokens[:starts], first_ids)
+            for offset, token_id in enumerate(middle_ids, start=1):
+                found &= tokens[offset:offset + starts] == token_id
+            found &= np.isin(tokens[span - 1:], last_ids)
+            if found.any():
+                matching.append(position)
+        return np.array(matching, dtype=np.int32)
+
+    def contains(self, column, text, positions=None):
+        """
+        Check which recipes contain a piece of text in a column, ignoring case and punctuation.
+
+        Parameters:
+        -----------
+        column : str
+            Indexed column
+        text : str
+            Text to look for; it is normalized like the recipe text
+        positions : numpy.ndarray, optional
+            Row positions of the recipes to check. Default is all recipes.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean array aligned with positions (or the rows)
+        """
+        text_column = self.columns[column]
+        words = normalize_text(text)
+        if words:
+            mask = np.zeros(self.num_recipes, dtype=bool)
+            mask[self._matching_positions(text_column, words)] = True
+        else:
+            # Empty text is found in every string
+            mask = text_column.has_text.copy()
+        return mask if positions is None else mask[positions]
@@ -0,0 +1,187 @@
+"""
+Worker pool module for Recipe Bot.
+This module contains a bounded thread pool for the CPU-heavy parts of a chat
+request. Requests beyond the pool's capacity are rejected at once instead of
+queueing without limit, and requests that wait past their deadline are
+dropped before they start.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Number of recent queue wait times kept for the wait time percentiles
+WAIT_SAMPLE_SIZE = 1000
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a task is submitted while every worker and queue slot is taken."""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a task does not finish before its deadline."""
+
+
+class BoundedWorkerPool:
+    """
+    Thread pool with a bounded queue, deadlines and queue statistics.
+
+    Parameters:
+    -----------
+    max_workers : int
+        Number of tasks run at the same time
+    max_queue : int
+        Number of tasks that may wait for a worker; further tasks are rejected
+    name : str, optional
+        Prefix of the worker thread names. Default is 'worker'.
+    """
+
+    def __init__(self, max_workers, max_queue, name='worker'):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counts = {'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'expired': 0}
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+
+    def submit(self, function, *args, timeout=None, **kwargs):
+        """
+        Queue a function call on the pool.
+
+        Parameters:
+        -----------
+        function : callable
+            Function to call
+        *args, **kwargs
+            Arguments of the call
+        timeout : float, optional
+            Seconds from now after which the call is dropped if it has not
+            started yet (None waits as long as needed). Default is None.
+
+        Returns:
+        --------
+        concurrent.futures.Future
+            Future of the call's result; it raises DeadlineExceededError if
+            the call was dropped
+
+        Raises:
+        -------
+        PoolSaturatedError
+            If every worker and queue slot is taken
+        """
+        with self._lock:
+            if self._queued + self._running >= self.max_workers + self.max_queue:
+                self._counts['rejected'] += 1
+                raise PoolSaturatedError(f"{self._running} tasks running and {self._queued} queued")
+            self._queued += 1
+            self._counts['submitted'] += 1
+
+        submitted_at = time.monotonic()
+        deadline = submitted_at + timeout if timeout is not None else None
+
+        def run():
+            started_at = time.monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._waits.append(started_at - submitted_at)
+                if deadline is not None and started_at > deadline:
+                    self._counts['expired'] += 1
+                    raise DeadlineExceededError(f"Task waited {started_at - submitted_at:.2f} seconds in the queue")
+                self._running += 1
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self._running -= 1
+                    self._counts['failed'] += 1
+                raise
+            with self._lock:
+                self._running -= 1
+                self._counts['completed'] += 1
+            return result
+
+        future = self._executor.submit(run)
+        future.add_done_callback(self._release_cancelled)
+        return future
+
+    def _release_cancelled(self, future):
+        """Free the queue slot of a task that was cancelled before it started."""
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._counts['expired'] += 1
+
+    def run(self, function, *args, timeout=None, **kwargs):
+        """
+        Run a function call on the pool and wait for its result.
+
+        Parameters:
+        -----------
+        function : callable
+            Function to call
+        *args, **kwargs
+            Arguments of the call
+        timeout : float, optional
+            Seconds to wait for the result (None waits as long as needed). Default is None.
+
+        Returns:
+        --------
+        object
+            Result of the call
+
+        Raises:
+        -------
+        PoolSaturatedError
+            If every worker and queue slot is taken
+        DeadlineExceededError
+            If the call does not finish in time; a call that has not started
+            yet is dropped, a running one finishes in the background
+        """
+        future = self.submit(function, *args, timeout=timeout, **kwargs)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceededError(f"Task did not finish within {timeout} seconds")
+
+    def stats(self):
+        """
+        Get the queue depth, task counters and queue wait times of the pool.
+
+        Returns:
+        --------
+        dict
+            Queue depth, running tasks, capacity, task counts and wait times
+            in milliseconds over the most recent tasks
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = dict(self._counts, queue_depth=self._queued, running=self._running,
+                         max_workers=self.max_workers, max_queue=self.max_queue)
+        if waits:
+            stats['wait_ms'] = {
+                'mean': 1000 * sum(waits) / len(waits),
+                'p95': 1000 * waits[min(len(waits) - 1, int(0.95 * len(waits)))],
+                'max': 1000 * waits[-1]
+            }
+        else:
+            stats['wait_ms'] = {'mean': 0.0, 'p95': 0.0, 'max': 0.0}
+        return stats
+
+    def shutdown(self, wait=True):
+        """
+        Stop the pool's threads.
+
+        Parameters:
+        -----------
+        wait : bool, optional
+            Wait for queued and running tasks to finish. Default is True.
+        """
+        self._executor.shutdown(wait=wait)